@@ -1,6 +1,8 @@
 import click, os
 from datetime import datetime, timezone
 from pathlib import Path
+from services import metrics
+from services.recording import RecordingError, record_story
 from services.story_state import StoryState
 
 def _today(date: datetime | None) -> datetime:
@@ -12,9 +14,13 @@ def _today(date: datetime | None) -> datetime:
         return date.astimezone(timezone.utc)
 
 @click.group()
-def devlog():
+@click.option("--metrics-file", type=click.Path(dir_okay=False), envvar="METRICS_FILE", default=None,
+              help="Write run metrics here on exit (.json for JSON, otherwise Prometheus text)")
+@click.pass_context
+def devlog(ctx, metrics_file):
     """Devlog utilities."""
-    pass
+    if metrics_file:
+        ctx.call_on_close(lambda: metrics.dump_if_configured(Path(metrics_file)))
 
 @devlog.command("record")
 @click.option("--story", "story_id", required=True)
@@ -22,55 +28,12 @@ def devlog():
 @click.option("--date", type=click.DateTime(formats=["%Y-%m-%d"]), required=False)
 def record(story_id: str, action: str, date: datetime | None):
     """Start/stop OBS recording and persist story state."""
-    date = _today(date)
-    
-    # Initialize OBSController with error handling
     try:
-        from services.obs_controller import OBSController
-        obs = OBSController()
-    except Exception as e:
-        click.echo(f"[ERR] OBS initialization failed: {e}")
+        message = record_story(story_id, action, _today(date))
+    except RecordingError as e:
+        click.echo(f"[ERR] {e}")
         raise SystemExit(1) from e
-    
-    state = StoryState()
-
-    if action == "start":
-        res = obs.start_recording()
-        if not res.ok:
-            click.echo(f"[ERR] {res.error}")
-            raise SystemExit(1)
-        
-        # Handle state.begin_recording errors with OBS cleanup
-        try:
-            state.begin_recording(date, story_id, assume_utc=True)
-        except Exception as e:
-            click.echo(f"[ERR] Failed to begin recording for story {story_id}: {e}")
-            # Rollback: stop OBS recording to prevent orphaned recording
-            try:
-                cleanup_res = obs.stop_recording()
-                if not cleanup_res.ok:
-                    click.echo(f"[WARN] Failed to cleanup OBS recording: {cleanup_res.error}")
-                else:
-                    click.echo(f"[INFO] OBS recording stopped during cleanup")
-            except Exception as cleanup_error:
-                click.echo(f"[WARN] OBS cleanup failed: {cleanup_error}")
-            raise SystemExit(1) from e
-        
-        click.echo(f"[OK] recording started for {story_id}")
-    else:
-        res = obs.stop_recording()
-        if not res.ok:
-            click.echo(f"[ERR] {res.error}")
-            raise SystemExit(1)
-        
-        # Handle state.end_recording errors
-        try:
-            state.end_recording(date, story_id, assume_utc=True)
-        except (FileNotFoundError, KeyError) as e:
-            click.echo(f"[ERR] Failed to end recording for story {story_id}: {e}")
-            raise SystemExit(1)
-        
-        click.echo(f"[OK] recording stopped for {story_id}")
+    click.echo(f"[OK] {message}")
 
 @devlog.command("bounded")
 @click.option("--id", "story_id", required=True, help="Story ID to record")
@@ -460,7 +423,8 @@ def site_publish(dry_run):
 @click.option("--date", "target_date", help="Date in YYYY-MM-DD format (defaults to yesterday)")
 @click.option("--no-upload", is_flag=True, help="Skip R2 upload")
 @click.option("--days-back", default=1, help="Number of days back to check for missing blogs")
-def blog_auto_generate(target_date: str, no_upload: bool, days_back: int):
+@click.option("--workers", type=int, default=None, help="Dates to build concurrently (default: BACKFILL_WORKERS or 4)")
+def blog_auto_generate(target_date: str, no_upload: bool, days_back: int, workers: int | None):
     """Automatically generate blog posts for missing dates."""
     try:
         from services.auto_blog_generator import generate_daily_blog, generate_missing_blogs
@@ -479,7 +443,7 @@ def blog_auto_generate(target_date: str, no_upload: bool, days_back: int):
         else:
             # Generate for missing dates
             click.echo(f"[INFO] Auto-generating blogs for missing dates (last {days_back} days)")
-            results = generate_missing_blogs(days_back, upload_to_r2=not no_upload)
+            results = generate_missing_blogs(days_back, upload_to_r2=not no_upload, max_workers=workers)
             
             success_count = sum(1 for r in results.values() if r["success"])
             total_count = len(results)
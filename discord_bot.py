@@ -1,4 +1,5 @@
-import os, asyncio, sys
+import os, asyncio, functools, time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import discord
 from discord import app_commands
@@ -9,7 +10,7 @@ from services.outline import generate_outline
 from services.utils import validate_story_id
 from services.blog import BlogDigestBuilder
 from services.notify import notify_blog_published
-import subprocess
+from services.recording import RecordingError, record_story
 import logging
 
 load_dotenv()
@@ -18,6 +19,11 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OBS and story state commands run in-process on a small pool instead of a
+# fresh interpreter per slash command
+RECORD_COMMAND_TIMEOUT = 30
+_command_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="discord_cmd")
+
 
 def validate_and_canonicalize_date(date_str: str) -> str:
     """Validate and canonicalize a date string in YYYY-MM-DD format.
@@ -96,97 +102,39 @@ def _validate_story_id(story_id: str) -> bool:
     # Use shared validation function
     return validate_story_id(story_id)
 
-def _run_cli_command(args: list[str], timeout: int = 30) -> None:
+async def _run_record_command(story_id: str, action: str, date: datetime, timeout: float = RECORD_COMMAND_TIMEOUT) -> str:
     """
-    Run a CLI command with hardened subprocess settings.
+    Start or stop a story recording in-process, off the event loop.
+
+    The worker thread can't be cancelled: a command that times out after
+    reaching OBS may still finish. One still queued at the deadline is
+    dropped without touching OBS.
     
     Args:
-        args: List of command arguments (excluding the Python interpreter)
-        timeout: Timeout in seconds for the subprocess
+        story_id: Validated story ID
+        action: 'start' or 'stop'
+        date: Parsed story date
+        timeout: Seconds to wait for OBS and the state update
+    
+    Returns:
+        Confirmation message
     
     Raises:
-        subprocess.CalledProcessError: If the command fails
-        subprocess.TimeoutExpired: If the command times out
-        ValueError: If args contains invalid types or nested iterables
+        RecordingError: If the command fails
+        asyncio.TimeoutError: If the command doesn't finish in time
     """
-    # Validate args is a sequence and not empty
-    if not isinstance(args, (list, tuple)) or not args:
-        raise ValueError("args must be a non-empty sequence")
-    
-    # Validate and flatten args to ensure no nested iterables
-    try:
-        # Convert all args to strings and ensure they're flat
-        flat_args = []
-        for arg in args:
-            # Check if arg is a string or simple type that can be safely converted
-            if isinstance(arg, (str, int, float, bool)):
-                flat_args.append(str(arg))
-            elif isinstance(arg, (list, tuple, dict, set)):
-                raise ValueError(f"Nested iterables are not allowed: {type(arg).__name__} = {arg}")
-            else:
-                # For other types, try to convert but be cautious
-                flat_args.append(str(arg))
-    except (TypeError, ValueError) as e:
-        raise ValueError(f"All arguments must be convertible to strings: {e}")
-    
-    # Validate module name (first argument should be a valid module)
-    if flat_args and not flat_args[0].startswith("cli."):
-        raise ValueError(f"Invalid module name: {flat_args[0]}. Only 'cli.*' modules are allowed.")
-    
-    # Construct command safely
-    cmd = [sys.executable, "-m"] + flat_args
-    
-    # Create environment that preserves required variables for CLI
-    env = dict(os.environ)  # Start with full process environment
-    
-    # Preserve all OBS_*, R2_*, and DISCORD_* variables
-    # The CLI (cli.devlog/AuthService) needs these runtime variables
-    
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    deadline = time.monotonic() + timeout
     try:
-        logger.info(f"Running CLI command: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
+        return await asyncio.wait_for(
+            loop.run_in_executor(
+                _command_pool, functools.partial(record_story, story_id, action, date, deadline=deadline)
+            ),
             timeout=timeout,
-            shell=False,  # Explicitly avoid shell=True
-            close_fds=True,
-            env=env,
-            capture_output=True,
-            text=True,
-            check=True
         )
-        logger.info(f"CLI command completed successfully: {' '.join(cmd)}")
-        if result.stdout:
-            logger.debug(f"Command stdout: {result.stdout}")
-        if result.stderr:
-            logger.debug(f"Command stderr: {result.stderr}")
-            
-    except subprocess.TimeoutExpired as e:
-        logger.error(f"CLI command timed out after {timeout}s: {' '.join(cmd)}", exc_info=True)
-        # subprocess.run already handles process termination on timeout
-        # No need to manually terminate - just re-raise the exception
-        raise
-    except subprocess.CalledProcessError as e:
-        logger.error(f"CLI command failed with return code {e.returncode}: {' '.join(cmd)}")
-        if e.stdout:
-            logger.error(f"Command stdout: {e.stdout}")
-        if e.stderr:
-            logger.error(f"Command stderr: {e.stderr}")
-        raise
-
-async def _run_cli_command_async(args: list[str], timeout: int = 30) -> None:
-    """
-    Async wrapper for _run_cli_command that runs the blocking operation off the event loop.
-    
-    Args:
-        args: List of command arguments (excluding the Python interpreter)
-        timeout: Timeout in seconds for the subprocess
-    
-    Raises:
-        subprocess.CalledProcessError: If the command fails
-        subprocess.TimeoutExpired: If the command times out
-        ValueError: If args contains invalid types or nested iterables
-    """
-    return await asyncio.to_thread(_run_cli_command, args, timeout)
+    finally:
+        logger.info(f"Record {action} for {story_id} took {(time.perf_counter() - start) * 1000:.0f}ms")
 
 @tree.command(name="story_list", description="List story packets for today (by id/title/status)")
 async def story_list(interaction: discord.Interaction, date: Optional[str] = None):
@@ -246,17 +194,21 @@ async def record_start(interaction: discord.Interaction, story_id: str, date: Op
     
     await interaction.response.defer(ephemeral=True)
     try:
-        # call CLI (keeps logic centralized) - now async
-        await _run_cli_command_async(["cli.devlog", "record", "--story", story_id, "--action", "start", "--date", date_obj.strftime("%Y-%m-%d")])
+        await _run_record_command(story_id, "start", date_obj)
         await interaction.followup.send(f"Recording started for `{story_id}`.", ephemeral=True)
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        error_msg = f"Start failed: {type(e).__name__}"
-        if isinstance(e, subprocess.CalledProcessError):
-            error_msg += f" (exit code: {e.returncode})"
-        elif isinstance(e, subprocess.TimeoutExpired):
-            error_msg += " (timeout)"
+    except RecordingError as e:
         logger.error(f"Record start failed for story {story_id}: {e}")
-        await interaction.followup.send(error_msg, ephemeral=True)
+        await interaction.followup.send(f"Start failed: {e}", ephemeral=True)
+    except asyncio.TimeoutError:
+        logger.error(f"Record start timed out for story {story_id} after {RECORD_COMMAND_TIMEOUT}s")
+        await interaction.followup.send(
+            f"Start timed out after {RECORD_COMMAND_TIMEOUT}s. The command may still complete in the "
+            "background; check OBS and `/story_list` before retrying.",
+            ephemeral=True,
+        )
+    except Exception:
+        logger.exception(f"Unexpected error in record_start for story {story_id}")
+        await interaction.followup.send("Start failed: unexpected error.", ephemeral=True)
 
 @tree.command(name="record_stop", description="Stop recording for a story id")
 async def record_stop(interaction: discord.Interaction, story_id: str, date: Optional[str] = None):
@@ -282,17 +234,21 @@ async def record_stop(interaction: discord.Interaction, story_id: str, date: Opt
     
     await interaction.response.defer(ephemeral=True)
     try:
-        # call CLI (keeps logic centralized) - now async
-        await _run_cli_command_async(["cli.devlog", "record", "--story", story_id, "--action", "stop", "--date", date_obj.strftime("%Y-%m-%d")])
+        await _run_record_command(story_id, "stop", date_obj)
         await interaction.followup.send(f"Recording stopped for `{story_id}`.", ephemeral=True)
-    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-        error_msg = f"Stop failed: {type(e).__name__}"
-        if isinstance(e, subprocess.CalledProcessError):
-            error_msg += f" (exit code: {e.returncode})"
-        elif isinstance(e, subprocess.TimeoutExpired):
-            error_msg += " (timeout)"
+    except RecordingError as e:
         logger.error(f"Record stop failed for story {story_id}: {e}")
-        await interaction.followup.send(error_msg, ephemeral=True)
+        await interaction.followup.send(f"Stop failed: {e}", ephemeral=True)
+    except asyncio.TimeoutError:
+        logger.error(f"Record stop timed out for story {story_id} after {RECORD_COMMAND_TIMEOUT}s")
+        await interaction.followup.send(
+            f"Stop timed out after {RECORD_COMMAND_TIMEOUT}s. The command may still complete in the "
+            "background; check OBS and `/story_list` before retrying.",
+            ephemeral=True,
+        )
+    except Exception:
+        logger.exception(f"Unexpected error in record_stop for story {story_id}")
+        await interaction.followup.send("Stop failed: unexpected error.", ephemeral=True)
 
 @tree.command(name="story_outline", description="Generate quick outline for story id")
 async def story_outline(interaction: discord.Interaction, story_id: str, date: Optional[str] = None):
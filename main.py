@@ -6,6 +6,7 @@ Main CLI entrypoint for the activity fetcher.
 import click
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -14,14 +15,20 @@ from services.twitch import TwitchService
 from services.github import GitHubService
 from services.auth import AuthService
 from services.utils import CacheManager
+from services.sync import load_sync_config, sync_sources
+from services import metrics
 
 # Load environment variables
 load_dotenv()
 
 @click.group()
-def cli():
+@click.option('--metrics-file', type=click.Path(dir_okay=False), envvar='METRICS_FILE', default=None,
+              help='Write run metrics here on exit (.json for JSON, otherwise Prometheus text)')
+@click.pass_context
+def cli(ctx, metrics_file):
     """Activity Fetcher - Fetch and transcribe Twitch clips and GitHub activity."""
-    pass
+    if metrics_file:
+        ctx.call_on_close(lambda: metrics.dump_if_configured(Path(metrics_file)))
 
 @cli.command()
 @click.option('--broadcaster', default=None, help='Twitch broadcaster username or ID')
@@ -82,27 +89,45 @@ def fetch_github(user, repo):
             
         for event in events:
             click.echo(f"Processing event: {event.type} in {event.repo}")
-            github_service.save_event(event)
+        github_service.save_events(events)
             
     except Exception as e:
         click.echo(f"Error fetching GitHub activity: {e}")
 
 @cli.command()
-@click.option('--broadcaster', default=None, help='Twitch broadcaster username or ID')
-@click.option('--broadcaster-id', default=None, help='Twitch broadcaster ID (numeric)')
-@click.option('--user', default=None, help='GitHub username')
-@click.option('--repo', default=None, help='GitHub repository (owner/repo)')
-def sync_all(broadcaster, broadcaster_id, user, repo):
-    """Run both Twitch and GitHub fetchers."""
+@click.option('--broadcaster', multiple=True, help='Twitch broadcaster username or ID (repeatable)')
+@click.option('--broadcaster-id', multiple=True, help='Twitch broadcaster ID (numeric, repeatable)')
+@click.option('--user', multiple=True, help='GitHub username (repeatable)')
+@click.option('--repo', multiple=True, help='GitHub repository (owner/repo, repeatable)')
+@click.option('--workers', default=4, show_default=True, help='Maximum number of sources synced concurrently')
+def sync_all(broadcaster, broadcaster_id, user, repo, workers):
+    """Run Twitch and GitHub fetchers for every configured source concurrently."""
     click.echo("Running full sync...")
     
-    # Run Twitch fetch
-    fetch_twitch.callback(broadcaster, broadcaster_id)
+    # Explicit options win; otherwise TWITCH_BROADCASTERS/GITHUB_USERS/GITHUB_REPOS
+    # (or their single-value counterparts) from the environment are used
+    config = load_sync_config(
+        broadcasters=list(broadcaster) + list(broadcaster_id),
+        github_users=list(user),
+        github_repos=list(repo),
+    )
+    sources = config.sources()
+    if not sources:
+        click.echo("Error: No sources specified. Set TWITCH_BROADCASTERS, GITHUB_USERS or GITHUB_REPOS in .env or use --broadcaster/--user/--repo")
+        return
+    
+    start = time.perf_counter()
+    results = sync_sources(sources, max_workers=workers)
+    elapsed = time.perf_counter() - start
     
-    # Run GitHub fetch
-    fetch_github.callback(user, repo)
+    for result in results:
+        if result.ok:
+            click.echo(f"✅ {result.source.label}: {result.fetched} fetched, {result.saved} saved ({result.duration_s:.2f}s)")
+        else:
+            click.echo(f"❌ {result.source.label}: {result.error} ({result.duration_s:.2f}s)")
     
-    click.echo("Sync completed!")
+    failed = sum(1 for result in results if not result.ok)
+    click.echo(f"Sync completed in {elapsed:.2f}s ({len(results) - failed}/{len(results)} sources succeeded)")
 
 @cli.command()
 def validate_auth():
@@ -241,5 +266,21 @@ def build_latest_digest():
     ctx = click.get_current_context()
     ctx.invoke(build_digest, date=None)
 
+@cli.command(name="run-jobs")
+@click.option('--type', 'job_types', multiple=True,
+              help='Job type to run (repeatable; defaults to every registered type)')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds between polls when idle')
+def run_jobs(job_types, poll_interval):
+    """Run a worker for the persistent job queue (blog approval, final digests)."""
+    from services.job_queue import JobQueue, JobWorker
+
+    queue = JobQueue()
+    worker = JobWorker(queue, job_types=job_types or None, poll_interval=poll_interval)
+    click.echo(f"Job worker {worker.worker_id} consuming {', '.join(worker.job_types)} from {queue.db_path}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        click.echo("Job worker stopped")
+
 if __name__ == '__main__':
     cli()
@@ -98,6 +98,16 @@ class SeenIds(BaseModel):
     last_updated: datetime = Field(default_factory=datetime.now)
 
 
+class PollCursor(BaseModel):
+    """High-water mark for incremental polling of a single API source."""
+    newest_event_id: Optional[str] = None
+    newest_created_at: Optional[datetime] = None
+    # Start of the window the cursor's history covers; an older window needs a backfill
+    covered_since: Optional[datetime] = None
+    etag: Optional[str] = None
+    last_polled: datetime = Field(default_factory=datetime.now)
+
+
 # ============================================================================
 # Digest Pipeline Models - New Clean Architecture
 # ============================================================================
@@ -11,6 +11,9 @@ from datetime import datetime
 from typing import Dict, Any, Optional, Union
 from dotenv import load_dotenv
 
+from services import metrics
+from services.budgets import budget
+
 try:
     import tiktoken
 except ImportError:
@@ -21,6 +24,11 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+AI_REQUEST_SECONDS = metrics.histogram(
+    "ai_request_seconds", "AI request latency by pipeline step and outcome", ("step", "outcome")
+)
+AI_TOKENS = metrics.counter("ai_tokens_total", "AI tokens by pipeline step and direction", ("step", "direction"))
+
 # Model-specific token limits, context windows, and pricing
 MODEL_LIMITS = {
     "openai/llama-3.1-8b-instruct": {
@@ -195,7 +203,24 @@ class CloudflareAIClient:
         return min(requested_tokens, self.model_config["max_output_tokens"])
 
     def generate(self, prompt: str, system: str, max_tokens: Optional[int] = None) -> str:
-        """Generate text using Cloudflare Workers AI with comprehensive logging."""
+        """Generate text using Cloudflare Workers AI with comprehensive logging.
+        
+        Calls share the process-wide "ai" concurrency budget, and their latency
+        and tokens are recorded under the current metrics.ai_step().
+        """
+        with budget("ai"):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = self._generate(prompt, system, max_tokens)
+                outcome = "ok"
+                return result
+            finally:
+                AI_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start, step=metrics.current_ai_step(), outcome=outcome
+                )
+    
+    def _generate(self, prompt: str, system: str, max_tokens: Optional[int] = None) -> str:
         max_tokens = max_tokens or self.default_max_tokens
         
         # Validate token limits before making the request
@@ -300,6 +325,10 @@ class CloudflareAIClient:
             total_tokens = input_tokens + output_tokens
             total_cost = (total_tokens / 1_000_000) * cost_per_million
             
+            step = metrics.current_ai_step()
+            AI_TOKENS.inc(input_tokens, step=step, direction="input")
+            AI_TOKENS.inc(output_tokens, step=step, direction="output")
+            
             # Log comprehensive usage information
             logger.info(
                 f"AI_USAGE - Model: {model_name} ({model_params}) | "
@@ -4,6 +4,8 @@ Authentication service for Twitch, GitHub, Cloudflare R2, and Discord.
 
 import os
 import json
+import logging
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -16,6 +18,11 @@ from pydantic import SecretStr
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Renew Twitch app tokens in the background once they are this close to the expiry buffer
+TWITCH_PROACTIVE_RENEWAL = timedelta(minutes=30)
+
 
 class AuthService:
     """Handles authentication for Twitch, GitHub, Cloudflare R2, and Discord APIs."""
@@ -32,6 +39,13 @@ class AuthService:
         self.twitch_client_id = os.getenv('TWITCH_CLIENT_ID')
         self.twitch_client_secret = os.getenv('TWITCH_CLIENT_SECRET')
         self.github_token = os.getenv('GITHUB_TOKEN')
+        
+        # In-memory token cache so hot loops don't re-read token files on every request
+        self._cached_twitch_token: Optional[TwitchToken] = None
+        self._cached_github_token: Optional[GitHubToken] = None
+        self._token_lock = threading.Lock()
+        # Held while a Twitch refresh is in flight so concurrent callers share one refresh
+        self._twitch_refresh_lock = threading.Lock()
     
     def _secure_atomic_json_write(self, path: Path, data: dict):
         """Securely write JSON data to a file using atomic operations.
@@ -77,17 +91,71 @@ class AuthService:
             raise
     
     def get_twitch_token(self) -> Optional[str]:
-        """Get a valid Twitch access token, refreshing if necessary."""
-        token = self._load_twitch_token()
+        """Get a valid Twitch access token, refreshing if necessary.
+        
+        Tokens are served from memory after the first load. Expired tokens are
+        refreshed once even when several threads ask at the same time, and
+        tokens close to expiry are renewed in the background.
+        """
+        with self._token_lock:
+            token = self._cached_twitch_token
+        
+        if token is None:
+            token = self._load_twitch_token()
+            with self._token_lock:
+                self._cached_twitch_token = token
         
         if token is None or self._is_token_expired(token):
-            token = self._refresh_twitch_token()
+            token = self._refresh_twitch_token_once(token)
+        elif self._needs_proactive_renewal(token):
+            self._start_background_twitch_refresh()
         
         return token.access_token.get_secret_value() if token else None
     
+    def _refresh_twitch_token_once(self, stale: Optional[TwitchToken]) -> Optional[TwitchToken]:
+        """Refresh the Twitch token unless another caller already did (single-flight)."""
+        with self._twitch_refresh_lock:
+            with self._token_lock:
+                current = self._cached_twitch_token
+            if current is not None and current is not stale and not self._is_token_expired(current):
+                return current
+            
+            token = self._refresh_twitch_token()
+            if token is not None:
+                with self._token_lock:
+                    self._cached_twitch_token = token
+            return token
+    
+    def _needs_proactive_renewal(self, token: TwitchToken) -> bool:
+        """Check if the token is close enough to expiry to renew ahead of time."""
+        return datetime.now() >= token.expires_at - timedelta(minutes=5) - TWITCH_PROACTIVE_RENEWAL
+    
+    def _start_background_twitch_refresh(self):
+        """Renew the Twitch token in a daemon thread unless a refresh is already running."""
+        if self._twitch_refresh_lock.locked():
+            return
+        
+        with self._token_lock:
+            stale = self._cached_twitch_token
+        
+        def _renew():
+            try:
+                self._refresh_twitch_token_once(stale)
+            except Exception as e:
+                logger.warning("Background Twitch token renewal failed: %s", e)
+        
+        threading.Thread(target=_renew, name="twitch-token-renewal", daemon=True).start()
+    
     def get_github_token(self) -> Optional[str]:
         """Get a valid GitHub token, checking expiration."""
-        token = self._load_github_token()
+        with self._token_lock:
+            token = self._cached_github_token
+        
+        if token is None or self._is_github_token_expired(token):
+            # The token file may have been updated by setup-github-token since it was cached
+            token = self._load_github_token()
+            with self._token_lock:
+                self._cached_github_token = token
         
         if token is None or self._is_github_token_expired(token):
             # For GitHub fine-grained tokens, we need user to refresh manually
@@ -323,6 +391,8 @@ class AuthService:
             permissions=permissions or {}
         )
         self._save_github_token(github_token)
+        with self._token_lock:
+            self._cached_github_token = github_token
     
     def initialize_github_token_from_env(self):
         """Initialize GitHub token from environment variable."""
@@ -530,3 +600,17 @@ class AuthService:
             "Authorization": f"Bot {credentials.token.get_secret_value()}",
             "Content-Type": "application/json"
         }
+
+
+_shared_auth_service: Optional[AuthService] = None
+_shared_auth_lock = threading.Lock()
+
+
+def get_shared_auth_service() -> AuthService:
+    """Get the process-wide AuthService so all services share one token cache."""
+    global _shared_auth_service
+    if _shared_auth_service is None:
+        with _shared_auth_lock:
+            if _shared_auth_service is None:
+                _shared_auth_service = AuthService()
+    return _shared_auth_service
@@ -2,14 +2,15 @@
 Automatic blog generation service.
 """
 
-import json
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from .blog import BlogDigestBuilder
 from .publisher_r2 import R2Publisher
+from .stage_graph import Stage, StageGraph, StageResult, source_fingerprint
+from services import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -42,8 +43,11 @@ def generate_daily_blog(target_date: Optional[str] = None, upload_to_r2: bool =
     }
     
     try:
-        # Initialize blog builder
+        # Initialize blog builder; publishing happens below (or once per backfill)
         builder = BlogDigestBuilder()
+        builder.upload_on_assemble = False
+        # Videos render in their own stage, alongside AI enrichment
+        builder.render_inline = False
         
         # Check if data exists for this date
         data_dir = builder.data_dir / target_date
@@ -52,23 +56,20 @@ def generate_daily_blog(target_date: Optional[str] = None, upload_to_r2: bool =
             result["error"] = "No data found"
             return result
         
-        # Check if publish package already exists
-        data_dir = builder.data_dir / target_date
-        if data_dir.exists() and (data_dir / f'{target_date}_page.publish.json').exists():
-            logger.info(f"Blog already exists for {target_date}, skipping generation")
-            result["error"] = "Blog already exists"
-            return result
+        pipeline = build_daily_pipeline(builder)
         
-        # Orchestration: Clean stage-based pipeline
-        logger.info(f"Starting clean stage-based pipeline for {target_date}...")
+        # Artifacts from before stage manifests existed count as up to date
+        publish_path = data_dir / f'{target_date}_page.publish.json'
+        if publish_path.exists() and not pipeline.manifest_path(target_date).exists():
+            pipeline.adopt(target_date)
         
-        # Step 1: Ingest sources → Raw Events
-        logger.info("Step 1: Ingesting sources...")
-        raw_events = builder.ingest_sources(target_date)
+        # Orchestration: stage graph, only stale stages rerun
+        logger.info(f"Starting stage-based pipeline for {target_date}...")
         
-        # Step 2: Build normalized digest
-        logger.info("Step 2: Building normalized digest...")
-        normalized_digest = builder.build_normalized_digest(target_date)
+        # Steps 1-2: Ingest sources → Raw Events → Normalized digest
+        ingest_results = pipeline.run(target_date, until="normalized")
+        _raise_for_failed_stage(ingest_results)
+        normalized_digest = ingest_results["normalized"].value
         
         # Check if we have story packets (merged PRs) - always compute for reporting
         # Note: STORY_PACKETS_ENABLED feature flag controls generation, not counting
@@ -87,26 +88,27 @@ def generate_daily_blog(target_date: Optional[str] = None, upload_to_r2: bool =
         
         logger.info(f"Found {len(twitch_clips)} Twitch clips and {len(github_events)} GitHub events, continuing pipeline...")
         
-        # Save normalized digest
-        normalized_path = builder.io.save_normalized_digest(normalized_digest, target_date)
-        logger.info(f"Saved normalized digest: {normalized_path}")
+        # Steps 3-4: Render videos and enhance with AI concurrently, then assemble publish package
+        # Reuse the ingest results so stages downstream of a rerun normalize also rerun
+        stage_results = pipeline.run(target_date, prior=ingest_results)
+        result["stages"] = {name: stage.status for name, stage in stage_results.items()}
+        logger.info("Stage results for %s: %s", target_date,
+                    ", ".join(f"{name}={status}" for name, status in result["stages"].items()))
+        _raise_for_failed_stage(stage_results)
         
-        # Step 3: Enhance with AI → Enriched Digest
-        logger.info("Step 3: Enhancing with AI...")
-        enriched_digest = builder.io.create_enriched_digest(target_date)
-        enriched_path = builder.io.save_enriched_digest(enriched_digest, target_date)
-        logger.info(f"Saved enriched digest: {enriched_path}")
+        if all(stage.status == "hit" for stage in stage_results.values()):
+            logger.info(f"Blog already exists for {target_date} and is up to date, skipping generation")
+            result["error"] = "Blog already exists"
+            return result
         
-        # Step 4: Assemble publish package
-        logger.info("Step 4: Assembling publish package...")
-        publish_package = builder.assemble_publish_package(target_date)
+        publish_package = stage_results["publish"].value
         logger.info(f"Assembled publish package with {len(publish_package.get('stories', []))} stories")
         
         # Count rendered videos
-        rendered_count = sum(1 for packet in normalized_digest.get('story_packets', []) 
+        rendered_count = sum(1 for packet in stage_results["videos"].value
                            if packet.get('video', {}).get('status') == 'rendered')
         result["videos_rendered"] = rendered_count
-        logger.info(f"Videos rendered during story packet generation: {rendered_count}")
+        logger.info(f"Videos rendered for story packets: {rendered_count}")
         
         result["blog_generated"] = True
         
@@ -150,26 +152,144 @@ def generate_daily_blog(target_date: Optional[str] = None, upload_to_r2: bool =
     return result
 
 
-def generate_missing_blogs(days_back: int = 7, upload_to_r2: bool = True) -> Dict[str, Any]:
+def _raise_for_failed_stage(stage_results: Dict[str, StageResult]):
+    """Raise the first stage failure as a RuntimeError."""
+    for name, stage in stage_results.items():
+        if stage.status == "failed":
+            raise RuntimeError(f"Stage {name} failed: {stage.error}")
+
+
+def build_daily_pipeline(builder: BlogDigestBuilder) -> StageGraph:
+    """
+    Build the stage graph for one day's blog.
+    
+    raw → normalized → (videos, enriched) → publish. Each artifact records a
+    fingerprint of its inputs and code in data/<date>/stages.json, so late
+    clips or events rerun only the stages downstream of the raw data.
+    
+    Video rendering and AI enrichment both depend only on the normalized
+    digest and run concurrently; publish joins them, so a day takes as long
+    as the slower branch rather than both back to back.
+    
+    Args:
+        builder: Builder whose data directory and I/O the stages use
+        
+    Returns:
+        StageGraph for the daily pipeline
+    """
+    io = builder.io
+    
+    def day_dir(target_date: str) -> Path:
+        return builder.data_dir / target_date
+    
+    def normalize(target_date: str) -> Dict[str, Any]:
+        digest = builder.build_normalized_digest(target_date)
+        normalized_path = io.save_normalized_digest(digest, target_date)
+        logger.info(f"Saved normalized digest: {normalized_path}")
+        return digest
+    
+    def render_videos(target_date: str) -> List[Dict[str, Any]]:
+        digest = io.load_normalized_digest(target_date)
+        packets = digest.get('story_packets', [])
+        if not builder.story_packets_enabled:
+            return packets
+        
+        changed = False
+        for packet in packets:
+            video = packet.get('video') or {}
+            if video.get('status') == 'rendered' and video.get('path') and Path(video['path']).exists():
+                continue
+            builder._render_video_for_packet_data(packet, target_date)
+            changed = True
+        if changed:
+            io.save_normalized_digest(digest, target_date)
+        return packets
+    
+    def rendered_videos(target_date: str) -> List[Path]:
+        path = day_dir(target_date) / "digest.normalized.json"
+        if not path.exists():
+            return [path]
+        packets = io.load_normalized_digest(target_date).get('story_packets', [])
+        return [Path(p['video']['path']) for p in packets
+                if (p.get('video') or {}).get('status') == 'rendered' and p['video'].get('path')]
+    
+    def enrich(target_date: str) -> Dict[str, Any]:
+        enriched_digest = io.create_enriched_digest(target_date)
+        if enriched_digest is None:
+            raise RuntimeError(f"AI enrichment failed for {target_date}")
+        logger.info(f"Saved enriched digest for {target_date}")
+        return enriched_digest
+    
+    stages = [
+        Stage(
+            name="raw",
+            run=builder.ingest_sources,
+            outputs=lambda d: [day_dir(d) / "raw_events.json"],
+            load=io.load_raw_events,
+            code=("services.blog", "services.digest_io", "services.event_log"),
+        ),
+        Stage(
+            name="normalized",
+            deps=("raw",),
+            run=normalize,
+            outputs=lambda d: [day_dir(d) / "digest.normalized.json"],
+            load=io.load_normalized_digest,
+            code=("services.blog", "services.digest_io", "story_schema"),
+        ),
+        Stage(
+            name="videos",
+            deps=("normalized",),
+            run=render_videos,
+            outputs=rendered_videos,
+            load=lambda d: io.load_normalized_digest(d).get('story_packets', []),
+            code=("tools.renderer_html",),
+        ),
+        Stage(
+            name="enriched",
+            deps=("normalized",),
+            run=enrich,
+            outputs=lambda d: [day_dir(d) / "digest.enriched.json"],
+            load=io.load_enriched_digest,
+            code=("services.digest_io", "services.comprehensive_blog_generator", "services.blog_post_processor"),
+        ),
+        Stage(
+            name="publish",
+            deps=("enriched", "videos"),
+            run=builder.assemble_publish_package,
+            outputs=lambda d: [day_dir(d) / f"{d}_page.publish.json"],
+            load=io.load_publish_package,
+            code=("services.blog", "services.content_generator", "services.serializers.api_v3"),
+        ),
+    ]
+    return StageGraph(
+        stages,
+        manifest_dir=day_dir,
+        sources=lambda d: source_fingerprint(day_dir(d)),
+        write_json=lambda path, data: io.cache.atomic_write_json(path, data, overwrite=True),
+        max_parallel=2,
+    )
+
+
+def generate_missing_blogs(days_back: int = 7, upload_to_r2: bool = True, max_workers: Optional[int] = None) -> Dict[str, Any]:
     """
     Generate blogs for missing dates going back a specified number of days.
     
+    Dates are built concurrently (see services.backfill) and published to R2
+    in a single pass at the end.
+    
     Args:
         days_back: Number of days to check backwards for missing blogs.
         upload_to_r2: Whether to upload the generated blogs to R2.
+        max_workers: Dates built at once (defaults to BACKFILL_WORKERS or 4).
         
     Returns:
         Dictionary with generation results for each date.
     """
-    results = {}
+    from .backfill import recent_dates, run_backfill
     
-    for i in range(1, days_back + 1):
-        target_date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-        logger.info(f"Checking for missing blog on {target_date}")
-        
-        result = generate_daily_blog(target_date, upload_to_r2=upload_to_r2)
-        results[target_date] = result
-        
+    results = run_backfill(recent_dates(days_back), max_workers=max_workers, upload_to_r2=upload_to_r2)
+    
+    for target_date, result in results.items():
         if result["success"]:
             logger.info(f"✅ Generated missing blog for {target_date}")
         elif result["error"] == "Blog already exists":
@@ -190,6 +310,7 @@ if __name__ == "__main__":
         target_date = None
     
     result = generate_daily_blog(target_date)
+    metrics.dump_if_configured()
     
     if result["success"]:
         print(f"✅ Successfully generated blog for {result['date']}")
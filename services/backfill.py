@@ -0,0 +1,222 @@
+"""
+Parallel multi-date blog backfill.
+
+Dates run concurrently, each in its own pipeline. A lease file per date
+keeps two workers (or two processes) from building the same day, AI calls,
+renders and uploads are bounded by the shared budgets in services.budgets,
+and the R2 publish (blogs, feeds and index) happens once at the end instead
+of once per date.
+"""
+
+import logging
+import os
+import socket
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from services import serialization
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = ".backfill.lease"
+LEASE_LOCK_NAME = ".backfill.lease.lock"
+DEFAULT_LEASE_TTL = 6 * 3600
+
+
+class DateLease:
+    """Exclusive, expiring claim on one date's data directory."""
+
+    def __init__(self, date_dir: Path, ttl: float = DEFAULT_LEASE_TTL):
+        self.path = date_dir / LEASE_NAME
+        self.lock_path = date_dir / LEASE_LOCK_NAME
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self.held = False
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize lease changes across threads and processes with a flock on a sidecar file."""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # Releases the lock
+
+    def _record(self) -> bytes:
+        now = time.time()
+        return serialization.dumpb({
+            "token": self.token,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "acquired_at": now,
+            "expires_at": now + self.ttl,
+        }, compact=True)
+
+    def _create(self) -> bool:
+        """Create the lease file if it doesn't exist."""
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._record())
+        return True
+
+    def _replace(self):
+        """Atomically swap our lease in over an existing one (the path never goes missing)."""
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f"{LEASE_NAME}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._record())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _owner(self) -> Optional[Dict[str, Any]]:
+        try:
+            return serialization.load_file(self.path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Half-written lease; treat as expired
+            return {}
+
+    def acquire(self) -> bool:
+        """Take the lease, replacing an expired one. Returns False if another worker holds it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            if self._create():
+                self.held = True
+                return True
+
+            owner = self._owner()
+            if owner is None:
+                # Released since the create attempt
+                self.held = self._create()
+                return self.held
+            if owner.get("expires_at", 0) > time.time():
+                return False
+
+            logger.warning("Taking over expired backfill lease %s (held by %s)", self.path, owner)
+            self._replace()
+            # Without flock (Windows) a concurrent takeover may have replaced ours; the last writer wins
+            owner = self._owner()
+            self.held = bool(owner) and owner.get("token") == self.token
+            return self.held
+
+    def release(self):
+        """Remove the lease if this instance still owns it."""
+        if not self.held:
+            return
+        self.held = False
+        with self._locked():
+            owner = self._owner()
+            if owner and owner.get("token") == self.token:
+                try:
+                    self.path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self) -> "DateLease":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def _generate_with_lease(target_date: str, data_dir: Path, lease_ttl: float) -> Dict[str, Any]:
+    from services.auto_blog_generator import generate_daily_blog
+
+    date_dir = data_dir / target_date
+    if not date_dir.exists():
+        return generate_daily_blog(target_date, upload_to_r2=False)
+
+    with DateLease(date_dir, ttl=lease_ttl) as lease:
+        if not lease.acquire():
+            logger.info("⏭️ %s is being generated by another worker", target_date)
+            return {"date": target_date, "success": False, "error": "Leased by another worker",
+                    "story_count": 0, "videos_rendered": 0, "blog_generated": False, "r2_uploaded": False}
+        return generate_daily_blog(target_date, upload_to_r2=False)
+
+
+def run_backfill(
+    dates: List[str],
+    max_workers: Optional[int] = None,
+    upload_to_r2: bool = True,
+    data_dir: Path = Path("data"),
+    lease_ttl: float = DEFAULT_LEASE_TTL,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Generate blogs for several dates concurrently, then publish once.
+
+    Args:
+        dates: Dates in YYYY-MM-DD format
+        max_workers: Dates built at once (BACKFILL_WORKERS, default 4)
+        upload_to_r2: Publish blogs, feeds and index to R2 after all dates finish
+        data_dir: Data directory holding per-date folders and publish packages
+        lease_ttl: Seconds before an abandoned lease may be taken over
+
+    Returns:
+        Date -> generate_daily_blog result, in input order
+    """
+    if not dates:
+        return {}
+    if max_workers is None:
+        max_workers = int(os.getenv("BACKFILL_WORKERS", "4"))
+    workers = max(1, min(max_workers, len(dates)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as executor:
+        outcomes = list(executor.map(lambda d: _generate_with_lease(d, data_dir, lease_ttl), dates))
+    results = dict(zip(dates, outcomes))
+    logger.info("Built %d dates with %d workers in %.1fs", len(dates), workers, time.perf_counter() - start)
+
+    generated = [d for d, r in results.items() if r.get("blog_generated")]
+    if upload_to_r2 and generated:
+        _publish_once(results, generated, data_dir)
+
+    return results
+
+
+def _publish_once(results: Dict[str, Dict[str, Any]], generated: List[str], data_dir: Path):
+    """Upload every new publish package plus feeds and index in one R2 pass."""
+    from services.publisher_r2 import R2Publisher
+
+    try:
+        upload_results = R2Publisher().publish_blogs(data_dir)
+    except Exception as e:
+        logger.error(f"Error uploading backfill to R2: {e}")
+        for target_date in generated:
+            results[target_date].update(r2_uploaded=False, success=False, error=f"R2 upload error: {e}")
+        return
+
+    for target_date in generated:
+        uploaded = bool(upload_results.get(f"{target_date}/{target_date}_page.publish.json"))
+        results[target_date]["r2_uploaded"] = uploaded
+        results[target_date]["success"] = uploaded
+        if not uploaded:
+            results[target_date]["error"] = "R2 upload failed"
+
+
+def recent_dates(days_back: int) -> List[str]:
+    """Dates from yesterday back to days_back days ago, newest first."""
+    return [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(1, days_back + 1)]
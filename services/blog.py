@@ -10,27 +10,21 @@ import os
 import sys
 import hashlib
 import re
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Dict, Any, Optional, TYPE_CHECKING, TypedDict
 from html import unescape
 import yaml
 from dotenv import load_dotenv
 
-from models import TwitchClip, GitHubEvent
-
-class DateEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle date and datetime objects."""
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
 from story_schema import (
     StoryPacket, FrontmatterInfo, 
-    make_story_packet, pair_with_clip,
+    make_story_packet, pair_with_clip, ClipIndex,
     _extract_why_and_highlights, VideoStatus
 )
+from services import serialization
 from services.publisher import StoryAssets
+from services.story_state import overlay_digest
 from .content_generator import ContentGenerator
 
 if TYPE_CHECKING:
@@ -59,6 +53,10 @@ class BlogDigestBuilder:
         
         # Feature flags
         self.story_packets_enabled = os.getenv("STORY_PACKETS_ENABLED", "false").lower() == "true"
+        # Orchestrators that publish themselves (daily pipeline, backfill) turn this off
+        self.upload_on_assemble = True
+        # The daily pipeline turns this off and renders videos concurrently with AI enrichment
+        self.render_inline = True
         
         # Blog metadata from environment
         self.blog_author = os.getenv("BLOG_AUTHOR", "Unknown Author")
@@ -105,6 +103,7 @@ class BlogDigestBuilder:
         """
         Build a normalized digest for a specific date with story packets.
         First tries to load existing normalized digest, falls back to building from raw data.
+        Recording state from the story state store is merged into the packets.
         
         Args:
             target_date: Date in YYYY-MM-DD format
@@ -122,8 +121,7 @@ class BlogDigestBuilder:
         final_digest_path = self.blogs_dir / target_date / f"FINAL-{target_date}_digest.json"
         if final_digest_path.exists():
             try:
-                with open(final_digest_path, 'r', encoding='utf-8') as f:
-                    digest = json.load(f)
+                digest = serialization.load_file(final_digest_path)
                 logger.info(f"Loaded existing FINAL digest for {target_date}")
                 
                 # Check if digest has enhanced schema.org (unified format)
@@ -138,7 +136,7 @@ class BlogDigestBuilder:
                         enhanced_packets = self.utils.enhance_existing_digest_with_thumbnails(digest, target_date)
                         digest["story_packets"] = enhanced_packets
                     
-                    return digest
+                    return overlay_digest(self.blogs_dir, target_date, digest)
                 else:
                     logger.info(f"Existing FINAL digest for {target_date} missing enhanced schema, rebuilding...")
             except (json.JSONDecodeError, OSError) as e:
@@ -148,8 +146,7 @@ class BlogDigestBuilder:
         pre_cleaned_path = self.blogs_dir / target_date / f"PRE-CLEANED-{target_date}_digest.json"
         if pre_cleaned_path.exists():
             try:
-                with open(pre_cleaned_path, 'r', encoding='utf-8') as f:
-                    digest = json.load(f)
+                digest = serialization.load_file(pre_cleaned_path)
                 logger.info(f"Loaded existing pre-cleaned digest for {target_date}")
                 
                 # Check if digest has enhanced schema.org (unified format)
@@ -164,7 +161,7 @@ class BlogDigestBuilder:
                         enhanced_packets = self.utils.enhance_existing_digest_with_thumbnails(digest, target_date)
                         digest["story_packets"] = enhanced_packets
                     
-                    return digest
+                    return overlay_digest(self.blogs_dir, target_date, digest)
                 else:
                     logger.info(f"Existing digest for {target_date} missing enhanced schema, rebuilding...")
             except (json.JSONDecodeError, OSError) as e:
@@ -176,17 +173,13 @@ class BlogDigestBuilder:
         if not date_path.exists():
             raise FileNotFoundError(f"No data found for date: {target_date}")
         
-        # Load all data for the date
-        twitch_clips = self.io.load_twitch_clips(date_path)
-        github_events = self.io.load_github_events(date_path)
+        # Load all data for the date as dicts (trusted fast path, see DigestIO)
+        clips_data = self.io.load_twitch_clip_dicts(date_path)
+        events_data = self.io.load_github_event_dicts(date_path)
         
-        if not twitch_clips and not github_events:
+        if not clips_data and not events_data:
             raise FileNotFoundError(f"No data files found in {date_path} for {target_date}")
         
-        # Convert to dict format for processing
-        clips_data = [clip.model_dump(mode="json") for clip in twitch_clips]
-        events_data = [event.model_dump(mode="json") for event in github_events]
-        
         # Generate story packets from merged PRs (only if feature flag enabled)
         if self.story_packets_enabled:
             story_packets = self._generate_story_packets(events_data, clips_data, target_date)
@@ -205,7 +198,7 @@ class BlogDigestBuilder:
             "date": target_date,
             "twitch_clips": clips_data,
             "github_events": events_data,
-            "metadata": self._generate_metadata(target_date, twitch_clips, github_events),
+            "metadata": self._generate_metadata(target_date, clips_data, events_data),
             "frontmatter": frontmatter.model_dump(mode="json", by_alias=True)
         }
         
@@ -217,7 +210,7 @@ class BlogDigestBuilder:
         else:
             digest["story_packets"] = []
         
-        return digest
+        return overlay_digest(self.blogs_dir, target_date, digest)
 
     def ingest_sources(self, target_date: str) -> Dict[str, Any]:
         """
@@ -234,13 +227,10 @@ class BlogDigestBuilder:
         if not date_path.exists():
             raise FileNotFoundError(f"No data found for {target_date}")
         
-        twitch_clips = self.io.load_twitch_clips(date_path)
-        github_events = self.io.load_github_events(date_path)
-        
         raw_events = {
             "meta": {"kind": "RawEvents", "version": 1, "generated_at": datetime.now().isoformat()},
-            "twitch": [clip.model_dump(mode="json") for clip in twitch_clips],
-            "github": [event.model_dump(mode="json") for event in github_events]
+            "twitch": self.io.load_twitch_clip_dicts(date_path),
+            "github": self.io.load_github_event_dicts(date_path)
         }
         
         # Save raw events
@@ -406,29 +396,29 @@ class BlogDigestBuilder:
     
 
     
-    def _generate_metadata(self, target_date: str, clips: List[TwitchClip], events: List[GitHubEvent]) -> Dict[str, Any]:
-        """Generate metadata for the digest."""
+    def _generate_metadata(self, target_date: str, clips: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Generate metadata for the digest from clip and event dicts."""
         # Extract keywords from data
         keywords = set()
         
         # Add repo names from GitHub events
         for event in events:
             # Validate repo format before splitting
-            owner, separator, repo_name = event.repo.partition('/')
+            owner, separator, repo_name = event["repo"].partition('/')
             if separator and owner and repo_name:
                 keywords.add(owner)  # owner
                 keywords.add(repo_name)  # repo name
             else:
-                logger.warning(f"Invalid repo format '{event.repo}' for event {event.id}, skipping repo keywords")
+                logger.warning(f"Invalid repo format '{event['repo']}' for event {event['id']}, skipping repo keywords")
         
         # Add languages from Twitch clips
         for clip in clips:
-            if clip.language:
-                keywords.add(clip.language)
+            if clip.get("language"):
+                keywords.add(clip["language"])
         
         # Add event types
         for event in events:
-            keywords.add(event.type)
+            keywords.add(event["type"])
         
         return {
             "total_clips": len(clips),
@@ -484,6 +474,8 @@ class BlogDigestBuilder:
                 unique_clips[clip_id] = clip
         
         deduplicated_clips = list(unique_clips.values())
+        # Parse, tokenize and time-sort the clips once for every PR
+        clip_index = ClipIndex(deduplicated_clips)
         
         # Group PRs by similar titles to handle deduplication
         pr_groups = {}
@@ -500,32 +492,17 @@ class BlogDigestBuilder:
             if len(pr_events) == 1:
                 # Single PR, create normal story packet
                 pr_event = pr_events[0]
-                pairing = pair_with_clip(pr_event, deduplicated_clips)
+                pairing = pair_with_clip(pr_event, deduplicated_clips, index=clip_index)
                 packet = make_story_packet(pr_event, pairing, deduplicated_clips)
                 
-                # Check for existing video file or render if needed
-                video_path = self._find_video_for_story(packet, target_date)
-                if video_path:
-                    packet.video.path = video_path
-                    packet.video.status = VideoStatus.RENDERED
-                else:
-                    # Render video if it doesn't exist
-                    try:
-                        video_path = self._render_video_for_packet(packet, target_date)
-                        if video_path:
-                            packet.video.path = video_path
-                            packet.video.status = VideoStatus.RENDERED
-                    except Exception as e:
-                        logger.exception("Failed to render video for %s", packet.id)
-                        packet.video.status = VideoStatus.FAILED
-                        packet.video.error = str(e)
+                self._attach_video(packet, target_date)
                 
                 story_packets.append(packet)
             else:
                 # Multiple PRs with similar titles - merge into one story
                 # Use the first PR as the base, merge highlights from others
                 base_pr = pr_events[0]
-                pairing = pair_with_clip(base_pr, deduplicated_clips)
+                pairing = pair_with_clip(base_pr, deduplicated_clips, index=clip_index)
                 packet = make_story_packet(base_pr, pairing, deduplicated_clips)
                 
                 # Merge highlights from other PRs
@@ -547,27 +524,34 @@ class BlogDigestBuilder:
                 
                 packet.highlights = unique_highlights[:4]  # Max 4 highlights
                 
-                # Check for existing video file or render if needed
-                video_path = self._find_video_for_story(packet, target_date)
-                if video_path:
-                    packet.video.path = video_path
-                    packet.video.status = VideoStatus.RENDERED
-                else:
-                    # Render video if it doesn't exist
-                    try:
-                        video_path = self._render_video_for_packet(packet, target_date)
-                        if video_path:
-                            packet.video.path = video_path
-                            packet.video.status = VideoStatus.RENDERED
-                    except Exception as e:
-                        logger.exception("Failed to render video for %s", packet.id)
-                        packet.video.status = VideoStatus.FAILED
-                        packet.video.error = str(e)
+                self._attach_video(packet, target_date)
                 
                 story_packets.append(packet)
         
         return story_packets
     
+    def _attach_video(self, packet: StoryPacket, target_date: str) -> None:
+        """Attach an existing video to a packet, rendering it inline if allowed."""
+        video_path = self._find_video_for_story(packet, target_date)
+        if video_path:
+            packet.video.path = video_path
+            packet.video.status = VideoStatus.RENDERED
+            return
+        
+        if not self.render_inline:
+            # Left pending; the pipeline's videos stage renders it in the background
+            return
+        
+        try:
+            video_path = self._render_video_for_packet(packet, target_date)
+            if video_path:
+                packet.video.path = video_path
+                packet.video.status = VideoStatus.RENDERED
+        except Exception as e:
+            logger.exception("Failed to render video for %s", packet.id)
+            packet.video.status = VideoStatus.FAILED
+            packet.video.error = str(e)
+    
     def _render_video_for_packet(self, packet: StoryPacket, target_date: str) -> Optional[str]:
         """Render video for a story packet if it doesn't exist."""
         try:
@@ -621,6 +605,28 @@ class BlogDigestBuilder:
         
         return None
     
+    def _merge_rendered_videos(self, enriched_digest: Dict[str, Any], target_date: str) -> None:
+        """
+        Copy video info recorded in the normalized digest onto the enriched digest.
+        
+        Enrichment may snapshot the normalized digest before its videos finish
+        rendering, so the normalized digest is the source of truth for video state.
+        """
+        try:
+            normalized_digest = self.io.load_normalized_digest(target_date)
+        except (FileNotFoundError, ValueError):
+            return
+        
+        videos = {
+            packet.get("id"): packet["video"]
+            for packet in normalized_digest.get("story_packets", [])
+            if (packet.get("video") or {}).get("status") in ("rendered", "failed")
+        }
+        for packet_data in enriched_digest.get("story_packets", []):
+            video = videos.get(packet_data.get("id"))
+            if video and (packet_data.get("video") or {}).get("status") != "rendered":
+                packet_data["video"] = dict(video)
+    
     def _ensure_videos_rendered(self, enriched_digest: Dict[str, Any], target_date: str) -> None:
         """Ensure all story packets have rendered videos."""
         story_packets = enriched_digest.get("story_packets", [])
@@ -756,8 +762,10 @@ class BlogDigestBuilder:
                 content_gen = ContentGenerator(enriched_digest, self.utils)
                 consolidated_content = content_gen.generate(ai_enabled=True, related_enabled=True)
             
-            # Step 3: Render videos for story packets if they don't exist (only if feature flag enabled)
+            # Step 3: Join videos rendered alongside enrichment, then render any still missing
+            # (only if feature flag enabled)
             if self.story_packets_enabled:
+                self._merge_rendered_videos(enriched_digest, target_date)
                 self._ensure_videos_rendered(enriched_digest, target_date)
             else:
                 logger.info("Story packet video rendering disabled via feature flag")
@@ -783,7 +791,8 @@ class BlogDigestBuilder:
             
             # Step 5: Save and upload
             self.io.save_publish_package(publish_package, target_date)
-            self._upload_to_r2(target_date, publish_package)
+            if self.upload_on_assemble:
+                self._upload_to_r2(target_date, publish_package)
             
             return publish_package
             
@@ -0,0 +1,181 @@
+"""
+Precomputed catalog of publish packages for range queries.
+
+The catalog maps each date to its publish package's size, mtime and summary
+fields (title, summary, tags, ...). It is persisted next to the per-date
+folders (data/blogs.catalog.json) and revalidated against file stats, so a
+range query only re-reads packages that changed since they were catalogued.
+Projections onto summary fields are served from the catalog alone; other
+fields are read one package at a time while streaming, keeping memory
+bounded by the largest single package.
+"""
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from services import serialization
+
+logger = logging.getLogger(__name__)
+
+CATALOG_NAME = "blogs.catalog.json"
+CATALOG_VERSION = 1
+
+# Top-level publish package fields kept in the catalog
+CATALOG_FIELDS = (
+    "url",
+    "datePublished",
+    "dateModified",
+    "wordCount",
+    "timeRequired",
+    "title",
+    "summary",
+    "tags",
+)
+
+_DATE_DIR = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def package_path(data_dir: Path, date: str) -> Path:
+    return data_dir / date / f"{date}_page.publish.json"
+
+
+def project(package: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Keep only the requested top-level fields (all of them if fields is None)."""
+    if fields is None:
+        return package
+    return {field: package[field] for field in fields if field in package}
+
+
+class BlogCatalog:
+    """Date-indexed summaries of the publish packages under a data directory."""
+
+    def __init__(self, data_dir: Path):
+        """
+        Args:
+            data_dir: Directory holding YYYY-MM-DD folders with publish packages
+        """
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / CATALOG_NAME
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = serialization.load_file(self.path)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable blog catalog {self.path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CATALOG_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]):
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + f".{os.getpid()}.tmp")
+        serialization.dump_file(tmp_path, {"version": CATALOG_VERSION, "entries": entries}, compact=True)
+        os.replace(tmp_path, self.path)
+
+    def _dates(self, start: Optional[str], end: Optional[str]) -> List[str]:
+        try:
+            names = [entry.name for entry in os.scandir(self.data_dir) if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+        return sorted(
+            name for name in names
+            if _DATE_DIR.match(name) and (start is None or name >= start) and (end is None or name <= end)
+        )
+
+    def refresh(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Bring the catalog up to date for a date range and return its entries.
+
+        Packages whose size and mtime match the catalog aren't opened; new or
+        changed ones are read once and their summary fields recorded. The
+        catalog file is rewritten only if something changed.
+
+        Args:
+            start: First date (inclusive), or None for the earliest
+            end: Last date (inclusive), or None for the latest
+
+        Returns:
+            Entries with 'date' and 'fields', in date order
+        """
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            entries = self._entries
+            changed = False
+
+            in_range = [d for d in entries if (start is None or d >= start) and (end is None or d <= end)]
+            for date in set(in_range) | set(self._dates(start, end)):
+                path = package_path(self.data_dir, date)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    if entries.pop(date, None) is not None:
+                        changed = True
+                    continue
+
+                entry = entries.get(date)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                try:
+                    package = serialization.load_file(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable publish package {path}: {e}")
+                    continue
+                entries[date] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "fields": project(package, CATALOG_FIELDS),
+                }
+                changed = True
+
+            if changed:
+                self._save(entries)
+            return [
+                {"date": date, "fields": entries[date]["fields"]}
+                for date in sorted(entries)
+                if (start is None or date >= start) and (end is None or date <= end)
+            ]
+
+    def iter_packages(
+        self,
+        entries: List[Dict[str, Any]],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield each entry's package projected onto fields, one at a time.
+
+        Args:
+            entries: Entries from refresh()
+            fields: Top-level fields to keep (None for whole packages)
+
+        Returns:
+            Iterator of {'date': ..., **fields}; packages deleted meanwhile are skipped
+        """
+        from_catalog = fields is not None and all(field in CATALOG_FIELDS for field in fields)
+        for entry in entries:
+            if from_catalog:
+                yield {"date": entry["date"], **project(entry["fields"], fields)}
+                continue
+            try:
+                package = serialization.load_file(package_path(self.data_dir, entry["date"]))
+            except FileNotFoundError:
+                continue
+            yield {"date": entry["date"], **project(package, fields)}
+
+    def iter_ndjson(
+        self,
+        entries: List[Dict[str, Any]],
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[bytes]:
+        """iter_packages() as newline-delimited JSON lines."""
+        for record in self.iter_packages(entries, fields):
+            yield serialization.dumpb(record, compact=True) + b"\n"
@@ -6,7 +6,7 @@ Handles adding specific links, data, formatting, and technical precision.
 import re
 import logging
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import urlparse, quote
 
 logger = logging.getLogger(__name__)
@@ -18,11 +18,15 @@ class BlogPostProcessor:
     DOMAIN_PATTERN = re.compile(
         r'^[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?)*(:[0-9]{1,5})?$'
     )
+    # [PR:1234], [CLIP:abc123] and [EVENT:567890] anchors from the blog generator
+    ANCHOR_PATTERN = re.compile(r'\[(PR|CLIP|EVENT):([^\[\]\s]+)\]')
     
     def __init__(self):
         self.logger = logger
         # Get allowed domains for Twitch embeds from environment
         self.twitch_embed_domains = self._get_twitch_embed_domains()
+        self._parent_params_cache: Optional[Tuple[str, Optional[str]]] = None
+        self.anchor_counts: Dict[str, int] = {}
     
     def _get_twitch_embed_domains(self) -> str:
         """Get allowed domains for Twitch embeds from environment."""
@@ -142,121 +146,126 @@ class BlogPostProcessor:
         return processed_content
     
     def _process_anchor_links(self, content: str, digest: Dict[str, Any]) -> str:
-        """Process anchor format links from comprehensive blog generator."""
-        # Process PR anchors [PR:1234]
-        content = self._process_pr_anchors(content, digest)
-        
-        # Process clip anchors [CLIP:abc123]
-        content = self._process_clip_anchors(content, digest)
-        
-        # Process event anchors [EVENT:567890]
-        content = self._process_event_anchors(content, digest)
+        """
+        Rewrite [PR:1234], [CLIP:abc123] and [EVENT:567890] anchors in one pass.
         
+        Replacements for every PR, clip and event in the digest are built once
+        into an ID map; a single compiled-regex substitution then resolves all
+        anchors, leaving unknown ones untouched. Counts are kept in
+        self.anchor_counts.
+        """
+        replacements = self._build_anchor_replacements(digest)
+        counts = {"PR": 0, "CLIP": 0, "EVENT": 0, "unresolved": 0}
+        
+        def replace(match: re.Match) -> str:
+            replacement = replacements.get((match.group(1), match.group(2)))
+            if replacement is None:
+                counts["unresolved"] += 1
+                return match.group(0)
+            counts[match.group(1)] += 1
+            return replacement
+        
+        content = self.ANCHOR_PATTERN.sub(replace, content)
+        self.anchor_counts = counts
+        if any(counts.values()):
+            self.logger.info(
+                "Processed anchors: %d PR, %d clip, %d event (%d unresolved)",
+                counts["PR"], counts["CLIP"], counts["EVENT"], counts["unresolved"]
+            )
         return content
     
-    def _process_pr_anchors(self, content: str, digest: Dict[str, Any]) -> str:
-        """Process PR anchor format [PR:1234] to proper links."""
-        github_events = digest.get('github_events', [])
-        
-        for event in github_events:
-            if event.get('type') == 'PullRequestEvent' and event.get('details', {}).get('merged', False):
-                pr_number = event.get('details', {}).get('number')
-                pr_title = event.get('details', {}).get('title', '')
-                
+    def _build_anchor_replacements(self, digest: Dict[str, Any]) -> Dict[tuple, str]:
+        """Map (kind, id) to replacement markup; the first item with an ID wins."""
+        replacements: Dict[tuple, str] = {}
+        for key, value in self._pr_anchor_replacements(digest):
+            replacements.setdefault(key, value)
+        for key, value in self._clip_anchor_replacements(digest):
+            replacements.setdefault(key, value)
+        for key, value in self._event_anchor_replacements(digest):
+            replacements.setdefault(key, value)
+        return replacements
+    
+    def _pr_anchor_replacements(self, digest: Dict[str, Any]):
+        """Links for [PR:1234] anchors of merged PRs."""
+        for event in digest.get('github_events', []):
+            details = event.get('details') or {}
+            if event.get('type') == 'PullRequestEvent' and details.get('merged', False):
+                pr_number = details.get('number')
                 if pr_number:
-                    # Look for PR anchor format [PR:1234]
-                    pr_anchor_pattern = rf'\[PR:{pr_number}\]'
-                    pr_link = f'[PR #{pr_number}](https://github.com/paulchrisluke/pcl-labs/pull/{pr_number})'
-                    
-                    if re.search(pr_anchor_pattern, content):
-                        content = re.sub(pr_anchor_pattern, pr_link, content)
-                        self.logger.info(f"Processed PR anchor [PR:{pr_number}] to link: {pr_title}")
-        
-        return content
+                    yield ("PR", str(pr_number)), self._pr_link(pr_number)
     
-    def _process_clip_anchors(self, content: str, digest: Dict[str, Any]) -> str:
-        """Process clip anchor format [CLIP:abc123] to video embeds."""
-        twitch_clips = digest.get('twitch_clips', [])
-        
-        for clip in twitch_clips:
+    def _clip_anchor_replacements(self, digest: Dict[str, Any]):
+        """Video embeds (or plain links) for [CLIP:abc123] anchors."""
+        parent_params = self._get_twitch_parent_params()
+        for clip in digest.get('twitch_clips', []):
             clip_id = clip.get('id', '')
             clip_title = clip.get('title', '')
             clip_url = clip.get('url', '')
+            if not (clip_id and clip_url):
+                continue
             
-            if clip_id and clip_url:
-                # Look for clip anchor format [CLIP:abc123]
-                clip_anchor_pattern = rf'\[CLIP:{re.escape(clip_id)}\]'
-                
-                # Extract clip ID from URL for proper embed
-                embed_clip_id = self._extract_clip_id_from_url(clip_url)
-                
-                if embed_clip_id:
-                    try:
-                        # Validate and escape domains for security
-                        safe_domains = self._validate_and_escape_domains(self.twitch_embed_domains)
-                        # Build parent parameters for Twitch embed (requires repeated &parent= entries)
-                        parent_params = self._build_twitch_parent_params(safe_domains)
-                        video_embed = (
-                            f'<iframe '
-                            f'src="https://clips.twitch.tv/embed?clip={embed_clip_id}{parent_params}" '
-                            f'width="640" height="360" frameborder="0" scrolling="no" allowfullscreen="true">'
-                            f'</iframe>'
-                        )
-                    except ValueError:
-                        self.logger.exception("Invalid Twitch embed domains")
-                        # Fallback to simple link if domain validation fails
-                        clip_link = f'[Clip: {clip_title}]({clip_url})'
-                        content = re.sub(clip_anchor_pattern, clip_link, content)
-                        self.logger.info(f"Processed clip anchor [CLIP:{clip_id}] to link (domain validation failed): {clip_title}")
-                        continue
-                    
-                    if re.search(clip_anchor_pattern, content):
-                        # Replace anchor with video embed
-                        content = re.sub(clip_anchor_pattern, video_embed, content)
-                        self.logger.info(f"Processed clip anchor [CLIP:{clip_id}] to video embed: {clip_title}")
-                else:
-                    # Fallback to simple link if embed fails
-                    clip_link = f'[Clip: {clip_title}]({clip_url})'
-                    content = re.sub(clip_anchor_pattern, clip_link, content)
-                    self.logger.info(f"Processed clip anchor [CLIP:{clip_id}] to link: {clip_title}")
-        
-        return content
+            # Extract clip ID from URL for proper embed
+            embed_clip_id = self._extract_clip_id_from_url(clip_url)
+            if embed_clip_id and parent_params is not None:
+                yield ("CLIP", clip_id), self._twitch_embed(embed_clip_id, parent_params)
+            else:
+                # Fallback to simple link if embed or domain validation fails
+                yield ("CLIP", clip_id), f'[Clip: {clip_title}]({clip_url})'
     
-    def _process_event_anchors(self, content: str, digest: Dict[str, Any]) -> str:
-        """Process event anchor format [EVENT:567890] to proper links."""
-        github_events = digest.get('github_events', [])
-        
-        for event in github_events:
+    def _event_anchor_replacements(self, digest: Dict[str, Any]):
+        """Links for [EVENT:567890] anchors, based on event type."""
+        for event in digest.get('github_events', []):
             event_id = event.get('id', '')
-            event_type = event.get('type', '')
+            if not event_id:
+                continue
             
-            if event_id:
-                # Look for event anchor format [EVENT:567890]
-                event_anchor_pattern = rf'\[EVENT:{event_id}\]'
-                
-                # Create appropriate link based on event type
-                if event_type == 'PullRequestEvent':
-                    pr_number = event.get('details', {}).get('number')
-                    if pr_number:
-                        event_link = f'[PR #{pr_number}](https://github.com/paulchrisluke/pcl-labs/pull/{pr_number})'
-                    else:
-                        event_link = f'[Event {event_id}](https://github.com/paulchrisluke/pcl-labs/events/{event_id})'
-                elif event_type == 'PushEvent':
-                    # Extract commit SHA from event details, with fallback to event_id
-                    commit_sha = event.get('details', {}).get('commit_sha')
-                    if commit_sha:
-                        event_link = f'[Push Event {event_id}](https://github.com/paulchrisluke/pcl-labs/commit/{commit_sha})'
-                    else:
-                        # Fallback to event_id if commit_sha is not available
-                        event_link = f'[Push Event {event_id}](https://github.com/paulchrisluke/pcl-labs/events/{event_id})'
+            event_type = event.get('type', '')
+            details = event.get('details') or {}
+            event_link = f'[Event {event_id}](https://github.com/paulchrisluke/pcl-labs/events/{event_id})'
+            if event_type == 'PullRequestEvent':
+                pr_number = details.get('number')
+                if pr_number:
+                    event_link = self._pr_link(pr_number)
+            elif event_type == 'PushEvent':
+                # Extract commit SHA from event details, with fallback to event_id
+                commit_sha = details.get('commit_sha')
+                if commit_sha:
+                    event_link = f'[Push Event {event_id}](https://github.com/paulchrisluke/pcl-labs/commit/{commit_sha})'
                 else:
-                    event_link = f'[Event {event_id}](https://github.com/paulchrisluke/pcl-labs/events/{event_id})'
-                
-                if re.search(event_anchor_pattern, content):
-                    content = re.sub(event_anchor_pattern, event_link, content)
-                    self.logger.info(f"Processed event anchor [EVENT:{event_id}] to link: {event_type}")
+                    event_link = f'[Push Event {event_id}](https://github.com/paulchrisluke/pcl-labs/events/{event_id})'
+            yield ("EVENT", str(event_id)), event_link
+    
+    def _pr_link(self, pr_number: Any) -> str:
+        return f'[PR #{pr_number}](https://github.com/paulchrisluke/pcl-labs/pull/{pr_number})'
+    
+    def _get_twitch_parent_params(self) -> Optional[str]:
+        """
+        Validated Twitch parent parameters, computed once per set of embed domains.
         
-        return content
+        Returns:
+            Query string with repeated parent parameters, or None if the
+            configured embed domains are invalid
+        """
+        domains = self.twitch_embed_domains
+        if self._parent_params_cache is None or self._parent_params_cache[0] != domains:
+            try:
+                # Validate and escape domains for security
+                safe_domains = self._validate_and_escape_domains(domains)
+                # Twitch requires repeated &parent= entries
+                parent_params = self._build_twitch_parent_params(safe_domains)
+            except ValueError:
+                self.logger.exception("Invalid Twitch embed domains")
+                parent_params = None
+            self._parent_params_cache = (domains, parent_params)
+        return self._parent_params_cache[1]
+    
+    def _twitch_embed(self, clip_id: str, parent_params: str) -> str:
+        return (
+            f'<iframe '
+            f'src="https://clips.twitch.tv/embed?clip={clip_id}{parent_params}" '
+            f'width="640" height="360" frameborder="0" scrolling="no" allowfullscreen="true">'
+            f'</iframe>'
+        )
     
     def _add_pr_links(self, content: str, digest: Dict[str, Any]) -> str:
         """Add specific PR links to the content."""
@@ -297,21 +306,11 @@ class BlogPostProcessor:
                     self.logger.warning(f"Skipping video embed for invalid clip URL: {clip_url}")
                     continue
                 
-                try:
-                    # Validate and escape domains for security
-                    safe_domains = self._validate_and_escape_domains(self.twitch_embed_domains)
-                    # Build parent parameters for Twitch embed (requires repeated &parent= entries)
-                    parent_params = self._build_twitch_parent_params(safe_domains)
-                    video_embed = (
-                        f'<iframe '
-                        f'src="https://clips.twitch.tv/embed?clip={clip_id}{parent_params}" '
-                        f'width="640" height="360" frameborder="0" scrolling="no" allowfullscreen="true">'
-                        f'</iframe>'
-                    )
-                except ValueError:
-                    self.logger.exception("Invalid Twitch embed domains")
+                parent_params = self._get_twitch_parent_params()
+                if parent_params is None:
                     # Skip this clip if domain validation fails
                     continue
+                video_embed = self._twitch_embed(clip_id, parent_params)
                 
                 if re.search(title_pattern, content):
                     # Add video embed after the title reference
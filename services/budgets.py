@@ -0,0 +1,59 @@
+"""
+Process-wide concurrency budgets for expensive shared resources.
+
+Concurrent pipelines (e.g. a multi-date backfill) share one semaphore per
+resource, so the number of in-flight AI calls, video renders (Chromium and
+ffmpeg) and R2 uploads stays bounded no matter how many dates run at once.
+
+Limits come from AI_CONCURRENCY, RENDER_CONCURRENCY and UPLOAD_CONCURRENCY.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+BUDGET_DEFAULTS = {
+    "ai": 2,
+    "render": 1,
+    "upload": 4,
+}
+
+_budgets: Dict[str, threading.BoundedSemaphore] = {}
+_budgets_lock = threading.Lock()
+
+
+def budget_limit(name: str) -> int:
+    """Configured concurrency for a budget, at least 1."""
+    default = BUDGET_DEFAULTS.get(name, 1)
+    value = os.getenv(f"{name.upper()}_CONCURRENCY")
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("Invalid %s_CONCURRENCY value %r, using %d", name.upper(), value, default)
+        return default
+
+
+def get_budget(name: str) -> threading.BoundedSemaphore:
+    """Get the process-wide semaphore for a budget ('ai', 'render', 'upload')."""
+    with _budgets_lock:
+        semaphore = _budgets.get(name)
+        if semaphore is None:
+            semaphore = _budgets[name] = threading.BoundedSemaphore(budget_limit(name))
+        return semaphore
+
+
+@contextmanager
+def budget(name: str) -> Iterator[None]:
+    """Hold one slot of a budget for the duration of the block."""
+    semaphore = get_budget(name)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
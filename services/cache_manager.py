@@ -5,10 +5,11 @@ Handles cache invalidation after content updates.
 
 import logging
 import os
-import httpx
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from services.http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,21 +56,21 @@ class CacheManager:
             
             logger.info(f"Purging {len(urls)} URLs from Cloudflare cache")
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(api_url, headers=headers, json=data)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        logger.info(f"✓ Successfully purged {len(urls)} URLs from cache")
-                        return True
-                    else:
-                        logger.error(f"✗ Cache purge failed: {result.get('errors', [])}")
-                        return False
+            client = get_client(api_url)
+            response = client.post(api_url, headers=headers, json=data, timeout=30.0)
+            
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    logger.info(f"✓ Successfully purged {len(urls)} URLs from cache")
+                    return True
                 else:
-                    logger.error(f"✗ Cache purge HTTP error: {response.status_code} - {response.text}")
+                    logger.error(f"✗ Cache purge failed: {result.get('errors', [])}")
                     return False
-                    
+            else:
+                logger.error(f"✗ Cache purge HTTP error: {response.status_code} - {response.text}")
+                return False
+                
         except Exception as e:
             logger.error(f"✗ Cache purge error: {e}")
             return False
@@ -106,21 +107,21 @@ class CacheManager:
             
             logger.info(f"Purging cache by tags: {tags}")
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(api_url, headers=headers, json=data)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        logger.info(f"✓ Successfully purged cache by tags: {tags}")
-                        return True
-                    else:
-                        logger.error(f"✗ Cache purge by tags failed: {result.get('errors', [])}")
-                        return False
+            client = get_client(api_url)
+            response = client.post(api_url, headers=headers, json=data, timeout=30.0)
+            
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    logger.info(f"✓ Successfully purged cache by tags: {tags}")
+                    return True
                 else:
-                    logger.error(f"✗ Cache purge by tags HTTP error: {response.status_code} - {response.text}")
+                    logger.error(f"✗ Cache purge by tags failed: {result.get('errors', [])}")
                     return False
-                    
+            else:
+                logger.error(f"✗ Cache purge by tags HTTP error: {response.status_code} - {response.text}")
+                return False
+                
         except Exception as e:
             logger.error(f"✗ Cache purge by tags error: {e}")
             return False
@@ -150,21 +151,21 @@ class CacheManager:
             
             logger.warning("Purging entire Cloudflare cache - this may impact performance")
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(api_url, headers=headers, json=data)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success"):
-                        logger.info("✓ Successfully purged entire cache")
-                        return True
-                    else:
-                        logger.error(f"✗ Entire cache purge failed: {result.get('errors', [])}")
-                        return False
+            client = get_client(api_url)
+            response = client.post(api_url, headers=headers, json=data, timeout=30.0)
+            
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("success"):
+                    logger.info("✓ Successfully purged entire cache")
+                    return True
                 else:
-                    logger.error(f"✗ Entire cache purge HTTP error: {response.status_code} - {response.text}")
+                    logger.error(f"✗ Entire cache purge failed: {result.get('errors', [])}")
                     return False
-                    
+            else:
+                logger.error(f"✗ Entire cache purge HTTP error: {response.status_code} - {response.text}")
+                return False
+                
         except Exception as e:
             logger.error(f"✗ Entire cache purge error: {e}")
             return False
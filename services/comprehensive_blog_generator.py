@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Union
 from dotenv import load_dotenv
 
+from services import metrics
 from .ai_client import CloudflareAIClient, AIClientError, TokenLimitExceededError, AIResponseError
 
 # Load environment variables
@@ -230,7 +231,8 @@ class ComprehensiveBlogGenerator:
             system_prompt, user_prompt = self._create_comprehensive_prompt(ai_data, max_tokens)
             
             logger.info(f"Retrying with reduced prompt size - Max tokens: {max_tokens}")
-            result = self.ai_client.generate(user_prompt, system_prompt, max_tokens=max_tokens)
+            with metrics.ai_step("token_limit_fallback"):
+                result = self.ai_client.generate(user_prompt, system_prompt, max_tokens=max_tokens)
             
             # Parse AI response
             parsed_content = self._parse_ai_response(result, date)
@@ -1262,7 +1264,8 @@ RULES:
 - Example: if you have [EVENT:54113400422] and [CLIP:abc123], use them like ["[EVENT:54113400422]", "[CLIP:abc123]"]
 """
         effective_tokens = self.ai_client.get_effective_max_tokens(700)
-        raw = self.ai_client.generate(user, system, max_tokens=effective_tokens)
+        with metrics.ai_step("outline"):
+            raw = self.ai_client.generate(user, system, max_tokens=effective_tokens)
         
         # First, check if the response contains sentinel tags
         extracted_json, has_sentinel_tags = self._extract_result_json_with_validation(raw)
@@ -1474,7 +1477,8 @@ Return JSON only inside <RESULT_JSON>…</RESULT_JSON>:
   }}
 }}
 """
-        raw = self.ai_client.generate(user, system, max_tokens=max_tokens)
+        with metrics.ai_step("sections"):
+            raw = self.ai_client.generate(user, system, max_tokens=max_tokens)
         try:
             js = json.loads(self._extract_result_json(raw))
         except json.JSONDecodeError as e:
@@ -1625,7 +1629,8 @@ Return JSON only inside <RESULT_JSON>…</RESULT_JSON>:
             retry_user = user + f"\n\n{fix_msg}"
             
             try:
-                raw = self.ai_client.generate(retry_user, system, max_tokens=max_tokens)
+                with metrics.ai_step("section_retry"):
+                    raw = self.ai_client.generate(retry_user, system, max_tokens=max_tokens)
                 try:
                     js = json.loads(self._extract_result_json(raw))
                 except json.JSONDecodeError as e:
@@ -1898,7 +1903,8 @@ Return JSON only inside <RESULT_JSON>…</RESULT_JSON>:
 """
         
         effective_tokens = self.ai_client.get_effective_max_tokens(1000)
-        raw = self.ai_client.generate(user, system, max_tokens=effective_tokens)
+        with metrics.ai_step("expand_section"):
+            raw = self.ai_client.generate(user, system, max_tokens=effective_tokens)
         try:
             js = json.loads(self._extract_result_json(raw))
         except json.JSONDecodeError as e:
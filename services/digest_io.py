@@ -2,8 +2,8 @@
 File I/O operations for digest building with new clean architecture.
 """
 
-import json
 import logging
+import os
 import requests
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Literal
@@ -13,38 +13,120 @@ from pydantic import ValidationError
 from models import TwitchClip, GitHubEvent, Meta, RawEvents, NormalizedDigest, EnrichedDigest, PublishPackage
 from .comprehensive_blog_generator import ComprehensiveBlogGenerator
 from .ai_client import AIClientError
+from services import serialization
 from services.utils import CacheManager
+from services.event_log import EventLog
+from services.story_state import overlay_digest
 
 logger = logging.getLogger(__name__)
 
 
+def _trusted_dump(model, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Shape a trusted JSON record like model.model_dump(mode="json") without validating.
+
+    Returns None if a required field is missing, so the caller can fall back
+    to full validation.
+    """
+    dumped = {}
+    for name, field in model.model_fields.items():
+        if name in record:
+            dumped[name] = record[name]
+        elif field.is_required():
+            return None
+        else:
+            dumped[name] = field.get_default(call_default_factory=True)
+    return dumped
+
+
 class DigestIO:
     """Handle file I/O operations for digest building."""
 
-    def __init__(self, data_dir: Path, blogs_dir: Path):
+    def __init__(self, data_dir: Path, blogs_dir: Path, strict_load: Optional[bool] = None):
         self.data_dir = data_dir
         self.blogs_dir = blogs_dir
         self.cache = CacheManager()
+        # Strict mode re-validates records we wrote ourselves; off by default for speed
+        if strict_load is None:
+            strict_load = os.getenv("DIGEST_STRICT_LOAD", "false").lower() == "true"
+        self.strict_load = strict_load
 
     def load_twitch_clips(self, date_path: Path) -> List[TwitchClip]:
         """Load Twitch clips for a given date."""
-        clips = []
-        for fp in sorted(date_path.glob("twitch_clip_*.json")):
-            try:
-                clips.append(TwitchClip(**json.loads(fp.read_text())))
-            except (json.JSONDecodeError, OSError, ValidationError) as e:
-                logger.warning(f"Skipping bad Twitch clip {fp}: {e}")
-        return clips
+        return self._load_records(date_path, "twitch_clip", TwitchClip)
 
     def load_github_events(self, date_path: Path) -> List[GitHubEvent]:
         """Load GitHub events for a given date."""
-        events = []
-        for fp in sorted(date_path.glob("github_event_*.json")):
+        return self._load_records(date_path, "github_event", GitHubEvent)
+
+    def load_twitch_clip_dicts(self, date_path: Path) -> List[Dict[str, Any]]:
+        """Load Twitch clips for a given date as JSON-mode dicts."""
+        return self._load_record_dicts(date_path, "twitch_clip", TwitchClip)
+
+    def load_github_event_dicts(self, date_path: Path) -> List[Dict[str, Any]]:
+        """Load GitHub events for a given date as JSON-mode dicts."""
+        return self._load_record_dicts(date_path, "github_event", GitHubEvent)
+
+    def _load_records(self, date_path: Path, kind: str, model):
+        """Load a day's records as validated models."""
+        items = []
+        for record in self._iter_sources(date_path, kind, model):
+            if isinstance(record, dict):
+                try:
+                    record = model.model_validate(record)
+                except ValidationError as e:
+                    logger.warning(f"Skipping bad {kind} record in {date_path}: {e}")
+                    continue
+            items.append(record)
+        return items
+
+    def _load_record_dicts(self, date_path: Path, kind: str, model) -> List[Dict[str, Any]]:
+        """
+        Load a day's records as dicts shaped like model.model_dump(mode="json").
+
+        Event log records were written from model_dump(mode="json"), so unless
+        strict_load is set they are trusted and only padded with field defaults,
+        skipping the validate -> dump round trip.
+        """
+        items = []
+        for record in self._iter_sources(date_path, kind, model):
+            if isinstance(record, dict) and not self.strict_load:
+                trusted = _trusted_dump(model, record)
+                if trusted is not None:
+                    items.append(trusted)
+                    continue
             try:
-                events.append(GitHubEvent(**json.loads(fp.read_text())))
-            except (json.JSONDecodeError, OSError, ValidationError) as e:
-                logger.warning(f"Skipping bad GitHub event {fp}: {e}")
-        return events
+                if isinstance(record, dict):
+                    record = model.model_validate(record)
+            except ValidationError as e:
+                logger.warning(f"Skipping bad {kind} record in {date_path}: {e}")
+                continue
+            items.append(record.model_dump(mode="json"))
+        return items
+
+    def _iter_sources(self, date_path: Path, kind: str, model):
+        """
+        Yield a day's event log records (as dicts), then legacy one-file-per-item
+        records (as validated models), de-duplicated by ID with the log first.
+        """
+        seen_ids = set()
+        for record in EventLog(date_path).iter_records(kind):
+            record_id = record.get("id")
+            if record_id is None or record_id in seen_ids:
+                continue
+            seen_ids.add(record_id)
+            yield record
+
+        # Data written before the event log existed
+        for fp in sorted(date_path.glob(f"{kind}_*.json")):
+            try:
+                item = model.model_validate_json(fp.read_bytes())
+            except (OSError, ValidationError) as e:
+                logger.warning(f"Skipping bad {kind} file {fp}: {e}")
+                continue
+            if item.id not in seen_ids:
+                seen_ids.add(item.id)
+                yield item
 
     def save_raw_events(self, events: Dict[str, Any], target_date: str) -> Path:
         """Save Raw Events as JSON."""
@@ -56,7 +138,7 @@ class DigestIO:
         if "meta" not in events:
             events["meta"] = {"kind": "RawEvents", "version": 1, "generated_at": datetime.now().isoformat()}
         
-        self.cache.atomic_write_json(path, events, overwrite=True)
+        self.cache.atomic_write_json(path, events, overwrite=True, compact=serialization.compact_artifacts())
         return path
 
     def save_normalized_digest(self, digest: Dict[str, Any], target_date: str) -> Path:
@@ -74,7 +156,7 @@ class DigestIO:
             k: (v.model_dump(mode="json") if hasattr(v, "model_dump") else v)
             for k, v in digest.items()
         }
-        self.cache.atomic_write_json(path, serializable, overwrite=True)
+        self.cache.atomic_write_json(path, serializable, overwrite=True, compact=serialization.compact_artifacts())
         return path
 
     def save_enriched_digest(self, digest: Dict[str, Any], target_date: str) -> Path:
@@ -92,7 +174,7 @@ class DigestIO:
             k: (v.model_dump(mode="json") if hasattr(v, "model_dump") else v)
             for k, v in digest.items()
         }
-        self.cache.atomic_write_json(path, serializable, overwrite=True)
+        self.cache.atomic_write_json(path, serializable, overwrite=True, compact=serialization.compact_artifacts())
         return path
 
     def save_publish_package(self, package: Dict[str, Any], target_date: str) -> Path:
@@ -137,7 +219,7 @@ class DigestIO:
         if not path.exists():
             raise FileNotFoundError(f"Raw events not found: {path}")
         
-        data = json.loads(path.read_text())
+        data = serialization.load_file(path)
         self._validate_meta_kind(data, "RawEvents")
         return data
 
@@ -147,7 +229,7 @@ class DigestIO:
         if not path.exists():
             raise FileNotFoundError(f"Normalized digest not found: {path}")
         
-        data = json.loads(path.read_text())
+        data = serialization.load_file(path)
         self._validate_meta_kind(data, "NormalizedDigest")
         return data
 
@@ -157,7 +239,7 @@ class DigestIO:
         if not path.exists():
             raise FileNotFoundError(f"Enriched digest not found: {path}")
         
-        data = json.loads(path.read_text())
+        data = serialization.load_file(path)
         self._validate_meta_kind(data, "EnrichedDigest")
         return data
 
@@ -167,15 +249,15 @@ class DigestIO:
         if not path.exists():
             raise FileNotFoundError(f"Publish package not found: {path}")
         
-        data = json.loads(path.read_text())
+        data = serialization.load_file(path)
         self._validate_meta_kind(data, "PublishPackage")
         return data
 
     def create_enriched_digest(self, target_date: str) -> Optional[Dict[str, Any]]:
         """Enhance normalized digest with AI and save enriched version."""
         try:
-            # Load normalized digest
-            digest = self.load_normalized_digest(target_date)
+            # Load normalized digest, with current recording state merged into its packets
+            digest = overlay_digest(self.blogs_dir, target_date, self.load_normalized_digest(target_date))
             
             # Enhance with AI using ComprehensiveBlogGenerator
             generator = ComprehensiveBlogGenerator()
@@ -302,8 +384,7 @@ class DigestIO:
         if not path.exists():
             raise FileNotFoundError(f"Digest file not found: {path}")
         
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return serialization.load_file(path)
 
     def save_digest(self, data: Dict[str, Any], target_date: str, kind: str = "normalized") -> Path:
         """
@@ -0,0 +1,314 @@
+"""
+Append-only per-day NDJSON log for fetched Twitch clips and GitHub events.
+
+Each data/YYYY-MM-DD directory holds one log per kind (clips.ndjson and
+events.ndjson) instead of one JSON file per item. Writes append a whole batch
+with a single fsync, a small offset index maps record IDs to byte ranges for
+deduplication and point lookups, and loads are a single sequential read.
+
+The index (<log>.idx) is append-only too: each batch adds one line with its
+record offsets and the log size after the batch. It is only rewritten when
+it has to be rebuilt from the log.
+
+Set EVENT_LOG_COMPRESSION=zstd (requires the optional `zstandard` package)
+to compress new batches; each batch is written as its own zstd frame.
+"""
+
+import io
+import logging
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services import serialization
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+LOG_FILES = {
+    "twitch_clip": "clips.ndjson",
+    "github_event": "events.ndjson",
+}
+ZSTD_SUFFIX = ".zst"
+INDEX_SUFFIX = ".idx"
+
+# One lock per log file so concurrent writers in this process don't interleave batches
+_file_locks: Dict[str, threading.Lock] = {}
+_file_locks_guard = threading.Lock()
+# Log path -> (index size, log size, ids), so appends don't re-parse an unchanged index
+_index_cache: Dict[str, Tuple[int, int, Dict[str, List[int]]]] = {}
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    key = str(path.resolve())
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = threading.Lock()
+        return lock
+
+
+def compression_enabled() -> bool:
+    """Check whether new batches should be zstd compressed."""
+    if os.getenv("EVENT_LOG_COMPRESSION", "").lower() != "zstd":
+        return False
+    if zstandard is None:
+        logger.warning("EVENT_LOG_COMPRESSION=zstd but the zstandard package is not installed; writing plain NDJSON")
+        return False
+    return True
+
+
+class EventLog:
+    """Per-day append-only record store."""
+
+    def __init__(self, date_dir: Path):
+        self.date_dir = date_dir
+
+    def _log_path(self, kind: str, compressed: bool) -> Path:
+        if kind not in LOG_FILES:
+            raise ValueError(f"Unknown event log kind: {kind}")
+        name = LOG_FILES[kind] + (ZSTD_SUFFIX if compressed else "")
+        return self.date_dir / name
+
+    def active_path(self, kind: str) -> Path:
+        """Log file that new batches of a kind are appended to."""
+        return self._log_path(kind, compression_enabled())
+
+    def _existing_paths(self, kind: str) -> List[Path]:
+        """Plain and compressed logs for a kind that exist on disk."""
+        return [p for p in (self._log_path(kind, False), self._log_path(kind, True)) if p.exists()]
+
+    @staticmethod
+    def _index_path(log_path: Path) -> Path:
+        return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+    def _read_index(self, log_path: Path) -> Optional[Dict[str, List[int]]]:
+        """Merge the index's batch lines; None if it is missing, unreadable or behind the log."""
+        index_path = self._index_path(log_path)
+        try:
+            index_size = index_path.stat().st_size
+            log_size = log_path.stat().st_size
+        except FileNotFoundError:
+            return None
+
+        cached = _index_cache.get(str(log_path))
+        if cached is not None and cached[:2] == (index_size, log_size):
+            return cached[2]
+
+        ids: Dict[str, List[int]] = {}
+        size = None
+        try:
+            with open(index_path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        entry = serialization.loads(line)
+                        ids.update(entry["ids"])
+                        size = entry["size"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Rebuilding unreadable event log index %s: %s", index_path, e)
+            return None
+        if size != log_size:
+            return None
+        _index_cache[str(log_path)] = (index_size, log_size, ids)
+        return ids
+
+    def _load_index(self, log_path: Path) -> Dict[str, List[int]]:
+        """Load the ID -> [offset, length] index, rebuilding it if missing or stale."""
+        ids = self._read_index(log_path)
+        return ids if ids is not None else self._rebuild_index(log_path)
+
+    def _write_index(self, log_path: Path, ids: Dict[str, List[int]], append: bool):
+        """Append one batch's entries to the index, or replace it with ids (lock must be held)."""
+        index_path = self._index_path(log_path)
+        line = serialization.dumpb({"size": log_path.stat().st_size, "ids": ids}, compact=True) + b"\n"
+        if append:
+            with open(index_path, "ab") as f:
+                f.write(line)
+                index_size = f.tell()
+            # Extend the cached index unless another process appended to it meanwhile
+            cached = _index_cache.get(str(log_path))
+            if cached is not None and cached[0] + len(line) == index_size:
+                cached[2].update(ids)
+                _index_cache[str(log_path)] = (index_size, log_path.stat().st_size, cached[2])
+                return
+        else:
+            # Unique temp name: another process may be rewriting the same index
+            tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(line)
+                os.replace(tmp_path, index_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        _index_cache.pop(str(log_path), None)
+
+    def _rebuild_index(self, log_path: Path) -> Dict[str, List[int]]:
+        """Scan a log to rebuild its index."""
+        ids: Dict[str, List[int]] = {}
+        if not log_path.exists():
+            return ids
+
+        if log_path.suffix == ZSTD_SUFFIX:
+            # Frame boundaries aren't recoverable cheaply; point lookups fall back to a full scan
+            size = log_path.stat().st_size
+            for record in self._iter_file(log_path):
+                if "id" in record:
+                    ids[str(record["id"])] = [0, size]
+            return ids
+
+        offset = 0
+        with open(log_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        record = serialization.loads(line)
+                        ids[str(record["id"])] = [offset, len(line)]
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                offset += len(line)
+        return ids
+
+    def append(self, kind: str, records: List[Dict[str, Any]], fsync: bool = True) -> int:
+        """
+        Append a batch of records with one write and one fsync.
+
+        Records whose ID is already in the log are skipped, so re-saving is
+        idempotent.
+
+        Args:
+            kind: 'twitch_clip' or 'github_event'
+            records: JSON-serializable dicts, each with an 'id' key
+            fsync: Flush to disk before returning; callers that group-commit
+                (CacheManager.batch) flush later
+
+        Returns:
+            Number of records written
+        """
+        if not records:
+            return 0
+
+        compressed = compression_enabled()
+        log_path = self._log_path(kind, compressed)
+        self.date_dir.mkdir(parents=True, exist_ok=True)
+
+        # Other logs of this kind (plain vs compressed) are checked under their own locks
+        known = set()
+        for path in self._existing_paths(kind):
+            if path != log_path:
+                with _lock_for(path):
+                    known.update(self._load_index(path))
+
+        with _lock_for(log_path):
+            ids = self._read_index(log_path) if log_path.exists() else None
+            # A current index gets one line for this batch; a rebuilt or new one is written whole
+            append_index = ids is not None
+            if ids is None:
+                ids = self._rebuild_index(log_path)
+            known.update(ids)
+
+            lines = []
+            batch_ids = []
+            for record in records:
+                record_id = str(record["id"])
+                if record_id in known:
+                    continue
+                known.add(record_id)
+                line = serialization.dumpb(record, compact=True) + b"\n"
+                lines.append(line)
+                batch_ids.append(record_id)
+
+            if not lines:
+                return 0
+
+            batch_index: Dict[str, List[int]] = {}
+            with open(log_path, "ab") as f:
+                offset = f.tell()
+                if compressed:
+                    frame = zstandard.ZstdCompressor().compress(b"".join(lines))
+                    f.write(frame)
+                    for record_id in batch_ids:
+                        batch_index[record_id] = [offset, len(frame)]
+                else:
+                    for record_id, line in zip(batch_ids, lines):
+                        batch_index[record_id] = [offset, len(line)]
+                        offset += len(line)
+                    f.write(b"".join(lines))
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+
+            if append_index:
+                self._write_index(log_path, batch_index, append=True)
+            else:
+                ids.update(batch_index)
+                self._write_index(log_path, ids, append=False)
+
+        logger.debug("Appended %d %s records to %s", len(lines), kind, log_path)
+        return len(lines)
+
+    def _iter_file(self, log_path: Path) -> Iterator[Dict[str, Any]]:
+        """Stream records from one log file, skipping unreadable lines."""
+        if log_path.suffix == ZSTD_SUFFIX:
+            if zstandard is None:
+                logger.warning("Skipping compressed event log %s: zstandard is not installed", log_path)
+                return
+            with open(log_path, "rb") as raw:
+                reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+                stream = io.BufferedReader(reader)
+                yield from self._iter_lines(stream, log_path)
+        else:
+            with open(log_path, "rb") as stream:
+                yield from self._iter_lines(stream, log_path)
+
+    @staticmethod
+    def _iter_lines(stream, log_path: Path) -> Iterator[Dict[str, Any]]:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield serialization.loads(line)
+            except ValueError as e:
+                # A torn final line after a crash must not hide the rest of the day
+                logger.warning("Skipping bad record at %s:%d: %s", log_path, line_no, e)
+
+    def iter_records(self, kind: str) -> Iterator[Dict[str, Any]]:
+        """Stream every record of a kind for the day in append order."""
+        for log_path in self._existing_paths(kind):
+            yield from self._iter_file(log_path)
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a single record by ID using the offset index."""
+        for log_path in self._existing_paths(kind):
+            entry = self._load_index(log_path).get(str(record_id))
+            if not entry:
+                continue
+            offset, length = entry
+            with open(log_path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(length)
+            if log_path.suffix == ZSTD_SUFFIX:
+                if zstandard is None:
+                    continue
+                reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(chunk), read_across_frames=True)
+                chunk = reader.read()
+            for line in chunk.splitlines():
+                try:
+                    record = serialization.loads(line)
+                except ValueError:
+                    continue
+                if str(record.get("id")) == str(record_id):
+                    return record
+        return None
+
+    def contains(self, kind: str, record_id: str) -> bool:
+        """Check whether a record ID is already stored for the day."""
+        return any(str(record_id) in self._load_index(path) for path in self._existing_paths(kind))
@@ -3,99 +3,39 @@ GitHub API service for fetching user and repository activity.
 """
 
 import os
-import time
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 import httpx
 
 logger = logging.getLogger(__name__)
 
-from models import GitHubEvent
-from services.auth import AuthService
-from services.utils import CacheManager, generate_filename, sanitize_filename
+from models import GitHubEvent, PollCursor
+from services.auth import get_shared_auth_service
+from services.http_client import get_client
+from services.rate_limiter import get_rate_limiter, send_with_rate_limit
+from services.utils import CacheManager
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
 
 
 class GitHubService:
     """Handles GitHub API interactions and activity processing."""
     
     def __init__(self):
-        self.auth_service = AuthService()
+        self.auth_service = get_shared_auth_service()
         self.cache_manager = CacheManager()
         self.base_url = "https://api.github.com"
+        self.rate_limiter = get_rate_limiter("github")
+        # Cursors from the last fetch per source, committed by save_events()
+        self.pending_cursors: Dict[str, PollCursor] = {}
     
     def fetch_user_activity(self, username: str, days_back: int = 7) -> List[GitHubEvent]:
         """Fetch recent activity for a GitHub user."""
-        headers = self.auth_service.get_github_headers()
-        
-        # Calculate date range
-        since_dt = datetime.utcnow() - timedelta(days=days_back)
-        since_date = since_dt.isoformat() + "Z"
-        
-        events = []
-        
         try:
-            with httpx.Client(timeout=httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0), http2=True) as client:
-                # Get user events
-                response = client.get(
-                    f"{self.base_url}/users/{username}/events",
-                    headers=headers,
-                    params={"per_page": 100}
-                )
-                
-                # Handle non-2xx status codes and surface 429 retry hints
-                if response.status_code == 429:
-                    logger.error("GitHub API rate limit exceeded. Consider reducing request frequency.")
-                    response.raise_for_status()
-                elif response.status_code >= 400:
-                    logger.error("GitHub API HTTP %d error: %s", response.status_code, response.text)
-                    response.raise_for_status()
-                data = response.json()
-                events_data = data
-                
-                # Follow pagination
-                while 'next' in (response.links or {}):
-                    next_url = response.links['next']['url']
-                    response = client.get(next_url, headers=headers)
-                    response.raise_for_status()
-                    page = response.json()
-                    events_data.extend(page)
-                
-                # Preemptive throttling using X-RateLimit-Remaining
-                ratelimit_remaining = response.headers.get("X-RateLimit-Remaining")
-                if ratelimit_remaining is not None:
-                    try:
-                        remaining = int(ratelimit_remaining)
-                        if remaining <= 5:
-                            reset = response.headers.get("X-RateLimit-Reset")
-                            delay = 1.0
-                            if reset:
-                                try:
-                                    # GitHub returns epoch seconds
-                                    delay = max(1.0, float(reset) - time.time())
-                                except (ValueError, TypeError):
-                                    pass
-                            logger.info("Rate limit remaining: %d, sleeping %.2fs (preemptive)", remaining, delay)
-                            time.sleep(delay)
-                    except (ValueError, TypeError):
-                        pass  # Ignore invalid header values
-                
-                for event_data in events_data:
-                    # Filter by date
-                    event_date = datetime.fromisoformat(
-                        event_data["created_at"].replace("Z", "+00:00")
-                    )
-                    if event_date < since_dt.replace(tzinfo=event_date.tzinfo):
-                        continue
-                    
-                    event = self._parse_event_data(event_data)
-                    
-                    # Check if we've already processed this event
-                    if not self.cache_manager.is_seen(event.id, "github_event"):
-                        events.append(event)
-                
-                return events
-                
+            return self._fetch_and_stage(f"users/{username}", days_back)
         except httpx.HTTPStatusError as e:
             raise RuntimeError(f"GitHub API error: {e.response.text}")
         except Exception as e:
@@ -103,80 +43,134 @@ class GitHubService:
     
     def fetch_repo_activity(self, repo: str, days_back: int = 7) -> List[GitHubEvent]:
         """Fetch recent activity for a GitHub repository."""
+        try:
+            return self._fetch_and_stage(f"repos/{repo}", days_back)
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(f"GitHub API error: {e.response.text}")
+        except Exception as e:
+            raise RuntimeError(f"Error fetching repo activity: {e}")
+    
+    def _fetch_and_stage(self, resource: str, days_back: int) -> List[GitHubEvent]:
+        """Fetch events and hold the new cursor until save_events() persists them."""
+        events, source, cursor = self._fetch_events(resource, days_back)
+        if cursor is not None:
+            self.pending_cursors[source] = cursor
+        return events
+    
+    def _fetch_events(self, resource: str, days_back: int) -> Tuple[List[GitHubEvent], str, Optional[PollCursor]]:
+        """
+        Incrementally fetch unseen events for a user or repository.
+        
+        A per-source cursor keeps the newest event ID/timestamp and the ETag of
+        the first page. Unchanged feeds are answered with a 304 (which GitHub
+        does not count against the rate limit), and pagination stops as soon as
+        a page reaches the cursor or the days_back window. A window reaching
+        further back than the cursor covers ignores it and backfills.
+        
+        The cursor is returned rather than saved: it must only be committed
+        once the events are persisted, or a failed save would skip them.
+        
+        Args:
+            resource: API resource path, e.g. "users/octocat" or "repos/owner/name"
+            days_back: Number of days of activity to consider
+            
+        Returns:
+            (events, source, cursor): events not yet marked as seen (newest
+            first), the cursor key and the cursor to commit (None if unchanged)
+        """
         headers = self.auth_service.get_github_headers()
+        since_dt = datetime.now(timezone.utc) - timedelta(days=days_back)
+        
+        source = f"github:{resource}"
+        cursor = self.cache_manager.get_cursor(source)
+        if cursor and not self._cursor_covers(cursor, since_dt):
+            logger.info("Backfilling %s from %s (before the stored cursor's window)", resource, since_dt.date())
+            cursor = None
+        request_headers = dict(headers)
+        if cursor and cursor.etag:
+            request_headers["If-None-Match"] = cursor.etag
         
-        # Calculate date range
-        since_dt = datetime.utcnow() - timedelta(days=days_back)
-        since_date = since_dt.isoformat() + "Z"
+        # Events at or before the stored high-water mark were already processed
+        stop_at = since_dt
+        if cursor and cursor.newest_created_at:
+            stop_at = max(stop_at, _as_utc(cursor.newest_created_at))
         
         events = []
         
-        try:
-            with httpx.Client(timeout=httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0), http2=True) as client:
-                # Get repository events
-                response = client.get(
-                    f"{self.base_url}/repos/{repo}/events",
-                    headers=headers,
-                    params={"per_page": 100}
+        client = get_client(self.base_url)
+        response = send_with_rate_limit(
+            self.rate_limiter,
+            lambda: client.get(
+                f"{self.base_url}/{resource}/events",
+                headers=request_headers,
+                params={"per_page": 100}
+            )
+        )
+        
+        if response.status_code == 304:
+            logger.info("No new GitHub activity for %s (304 Not Modified)", resource)
+            cursor.last_polled = datetime.now()
+            self.cache_manager.save_cursor(source, cursor)
+            return events, source, None
+        
+        self._raise_for_status(response, resource)
+        first_page_etag = response.headers.get("ETag")
+        newest_event = None
+        
+        while True:
+            reached_cursor = False
+            for event_data in response.json():
+                event_date = datetime.fromisoformat(
+                    event_data["created_at"].replace("Z", "+00:00")
                 )
+                if newest_event is None:
+                    newest_event = (str(event_data["id"]), event_date)
                 
-                # Handle non-2xx status codes and surface 429 retry hints
-                if response.status_code == 429:
-                    logger.error("GitHub API rate limit exceeded for repo activity. Consider reducing request frequency.")
-                    response.raise_for_status()
-                elif response.status_code >= 400:
-                    logger.error("GitHub API HTTP %d error for repo activity: %s", response.status_code, response.text)
-                    response.raise_for_status()
-                data = response.json()
-                events_data = data
-                
-                # Follow pagination
-                while 'next' in (response.links or {}):
-                    next_url = response.links['next']['url']
-                    response = client.get(next_url, headers=headers)
-                    response.raise_for_status()
-                    page = response.json()
-                    events_data.extend(page)
-                
-                # Preemptive throttling using X-RateLimit-Remaining
-                ratelimit_remaining = response.headers.get("X-RateLimit-Remaining")
-                if ratelimit_remaining is not None:
-                    try:
-                        remaining = int(ratelimit_remaining)
-                        if remaining <= 5:
-                            reset = response.headers.get("X-RateLimit-Reset")
-                            delay = 1.0
-                            if reset:
-                                try:
-                                    # GitHub returns epoch seconds
-                                    delay = max(1.0, float(reset) - time.time())
-                                except (ValueError, TypeError):
-                                    pass
-                            logger.info("Rate limit remaining: %d, sleeping %.2fs (preemptive)", remaining, delay)
-                            time.sleep(delay)
-                    except (ValueError, TypeError):
-                        pass  # Ignore invalid header values
+                if cursor and str(event_data["id"]) == cursor.newest_event_id:
+                    reached_cursor = True
+                    break
+                if event_date < stop_at:
+                    # Feed is newest-first, so nothing older can be relevant
+                    reached_cursor = True
+                    break
                 
-                for event_data in events_data:
-                    # Filter by date
-                    event_date = datetime.fromisoformat(
-                        event_data["created_at"].replace("Z", "+00:00")
-                    )
-                    if event_date < since_dt.replace(tzinfo=event_date.tzinfo):
-                        continue
-                    
-                    event = self._parse_event_data(event_data)
-                    
-                    # Check if we've already processed this event
-                    if not self.cache_manager.is_seen(event.id, "github_event"):
-                        events.append(event)
-                
-                return events
+                event = self._parse_event_data(event_data)
                 
-        except httpx.HTTPStatusError as e:
-            raise RuntimeError(f"GitHub API error: {e.response.text}")
-        except Exception as e:
-            raise RuntimeError(f"Error fetching repo activity: {e}")
+                # Check if we've already processed this event
+                if not self.cache_manager.is_seen(event.id, "github_event"):
+                    events.append(event)
+            
+            if reached_cursor or 'next' not in (response.links or {}):
+                break
+            next_url = response.links['next']['url']
+            response = send_with_rate_limit(self.rate_limiter, lambda: client.get(next_url, headers=headers))
+            self._raise_for_status(response, resource)
+    
+        new_cursor = PollCursor(etag=first_page_etag, covered_since=since_dt)
+        if cursor:
+            new_cursor.covered_since = min(since_dt, _as_utc(cursor.covered_since))
+        if newest_event:
+            new_cursor.newest_event_id, new_cursor.newest_created_at = newest_event
+        elif cursor:
+            new_cursor.newest_event_id = cursor.newest_event_id
+            new_cursor.newest_created_at = cursor.newest_created_at
+        
+        logger.info("Fetched %d new GitHub events for %s", len(events), resource)
+        return events, source, new_cursor
+    
+    @staticmethod
+    def _cursor_covers(cursor: PollCursor, since_dt: datetime) -> bool:
+        """Whether a cursor's history reaches back to the requested window start."""
+        return cursor.covered_since is not None and _as_utc(cursor.covered_since) <= since_dt
+    
+    def _raise_for_status(self, response: httpx.Response, resource: str):
+        """Log and raise for non-2xx responses, surfacing rate limit hints."""
+        if response.status_code == 429:
+            logger.error("GitHub API rate limit exceeded for %s. Consider reducing request frequency.", resource)
+            response.raise_for_status()
+        elif response.status_code >= 400:
+            logger.error("GitHub API HTTP %d error for %s: %s", response.status_code, resource, response.text)
+            response.raise_for_status()
     
     def _parse_event_data(self, event_data: dict) -> GitHubEvent:
         """Parse GitHub API event data into GitHubEvent model."""
@@ -264,44 +258,70 @@ class GitHubService:
         )
     
     def save_event(self, event: GitHubEvent) -> bool:
-        """Save GitHub event to JSON file."""
-        try:
-            # Check if already processed
+        """Append a GitHub event to its day's event log."""
+        return self.save_events([event]) == 1
+    
+    def save_events(self, events: List[GitHubEvent]) -> int:
+        """
+        Append GitHub events to the per-day event logs in one batch per day.
+        
+        Polling cursors from the preceding fetches are committed in the same
+        batch, and only if every day's events were saved.
+        
+        Args:
+            events: Events to save; already-seen events are skipped
+            
+        Returns:
+            Number of events saved or already processed
+        """
+        saved = 0
+        failed = False
+        by_day: Dict[str, List[GitHubEvent]] = {}
+        for event in events:
             if self.cache_manager.is_seen(event.id, "github_event"):
                 logger.info("Event %s already processed, skipping", event.id)
-                return True
-            
-            logger.info("Processing event: %s in %s", event.type, event.repo)
-            
-            # Generate filename
-            safe_repo = sanitize_filename(event.repo)
-            filename = generate_filename("github_event", f"{event.id}_{safe_repo}")
-            
-            # Convert to dict for JSON serialization
-            event_data = event.model_dump()
-            
-            # Save to data directory
-            self.cache_manager.save_json(filename, event_data, event.created_at)
-            
-            # Mark as seen
-            self.cache_manager.mark_seen(event.id, "github_event")
-            
-            logger.info("Successfully processed event: %s", event.type)
-            return True
+                saved += 1
+                continue
+            by_day.setdefault(event.created_at.strftime("%Y-%m-%d"), []).append(event)
+        
+        # One group commit for all days instead of an fsync per log and seen-ID write
+        with self.cache_manager.batch():
+            for day_events in by_day.values():
+                try:
+                    self.cache_manager.append_records(
+                        "github_event",
+                        [event.model_dump(mode="json") for event in day_events],
+                        day_events[0].created_at
+                    )
+                    self.cache_manager.mark_seen_many([event.id for event in day_events], "github_event")
+                    saved += len(day_events)
+                    logger.info("Saved %d events for %s", len(day_events), day_events[0].created_at.date())
+                except Exception:
+                    failed = True
+                    logger.exception("Error saving %d events for %s", len(day_events), day_events[0].created_at.date())
             
-        except Exception as e:
-            logger.exception("Error processing event %s", event.id)
-            return False
+            if failed:
+                # Keep the old cursors so the unsaved events are fetched again
+                self.pending_cursors.clear()
+            else:
+                for source, cursor in self.pending_cursors.items():
+                    self.cache_manager.save_cursor(source, cursor)
+                self.pending_cursors.clear()
+        
+        return saved
     
     def get_user_info(self, username: str) -> Optional[dict]:
         """Get GitHub user information."""
         headers = self.auth_service.get_github_headers()
         
         try:
-            with httpx.Client(timeout=httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0), http2=True) as client:
-                response = client.get(f"{self.base_url}/users/{username}", headers=headers)
-                response.raise_for_status()
-                return response.json()
+            client = get_client(self.base_url)
+            response = send_with_rate_limit(
+                self.rate_limiter,
+                lambda: client.get(f"{self.base_url}/users/{username}", headers=headers)
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.exception("Error getting user info for %s", username)
             return None
@@ -311,10 +331,13 @@ class GitHubService:
         headers = self.auth_service.get_github_headers()
         
         try:
-            with httpx.Client(timeout=httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0), http2=True) as client:
-                response = client.get(f"{self.base_url}/repos/{repo}", headers=headers)
-                response.raise_for_status()
-                return response.json()
+            client = get_client(self.base_url)
+            response = send_with_rate_limit(
+                self.rate_limiter,
+                lambda: client.get(f"{self.base_url}/repos/{repo}", headers=headers)
+            )
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.exception("Error getting repo info for %s", repo)
             return None
@@ -0,0 +1,90 @@
+"""
+Process-wide registry of pooled HTTP clients.
+
+Services used to open a new httpx.Client per call, paying a TCP/TLS handshake
+for every request. Clients handed out here are shared per scheme/host, keep
+connections alive between calls, and use HTTP/2 when the optional `h2`
+package is installed.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+_clients: Dict[Tuple[str, str, bool], httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def _origin(url: str) -> Tuple[str, str]:
+    """Return the (scheme, host[:port]) pair a client is pooled under."""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    if not parts.netloc:
+        raise ValueError(f"Cannot determine host from URL: {url}")
+    return parts.scheme or "https", parts.netloc.lower()
+
+
+def get_client(url: str, http2: bool = True) -> httpx.Client:
+    """
+    Get the shared client for the host of a URL.
+
+    The returned client must not be closed or used as a context manager by
+    callers. Per-request timeouts can still be passed to individual calls.
+
+    Args:
+        url: Any URL (or bare host) on the target host
+        http2: Request HTTP/2 if the `h2` package is available
+
+    Returns:
+        A pooled httpx.Client bound to the host
+    """
+    scheme, host = _origin(url)
+    use_http2 = http2 and HTTP2_AVAILABLE
+    key = (scheme, host, use_http2)
+
+    client = _clients.get(key)
+    if client is not None and not client.is_closed:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(
+                base_url=f"{scheme}://{host}",
+                timeout=DEFAULT_TIMEOUT,
+                limits=DEFAULT_LIMITS,
+                http2=use_http2,
+            )
+            _clients[key] = client
+            logger.debug("Opened pooled HTTP client for %s://%s (http2=%s)", scheme, host, use_http2)
+        return client
+
+
+def close_all():
+    """Close every pooled client (registered to run at interpreter exit)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning("Failed to close HTTP client: %s", e)
+
+
+atexit.register(close_all)
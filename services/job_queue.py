@@ -0,0 +1,520 @@
+"""
+SQLite-backed job queue for long-running webhook operations.
+
+Blog approval and final-digest creation are enqueued by the webhook server
+and executed by workers: threads embedded in the server, or a separate
+process started with `python main.py run-jobs`. Jobs are rows in a SQLite
+database (JOB_QUEUE_DB, default data/jobs.sqlite3), so they survive restarts
+and can be inspected while they run.
+
+- Idempotency: a job enqueued with a key (e.g. "blog_approval:2025-01-15")
+  is deduplicated against a queued or running job with the same key.
+- Concurrency: at most JOB_CONCURRENCY_<TYPE> jobs of a type run at once
+  across every worker sharing the database.
+- Recovery: running jobs heartbeat; a job whose heartbeat is older than
+  JOB_STALE_SECONDS (its worker died) is requeued, or failed once it has
+  used all of its attempts. Only the worker that claimed a job can record
+  its outcome.
+- Retries: failed jobs are retried with exponential backoff up to
+  JOB_MAX_ATTEMPTS attempts.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services import metrics, serialization
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+DEFAULT_DB_PATH = Path("data") / "jobs.sqlite3"
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_STALE_SECONDS = 300.0
+RETRY_BACKOFF_SECONDS = 30.0
+
+JOB_CONCURRENCY_DEFAULTS = {
+    "blog_approval": 1,
+    "final_digest": 1,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    idempotency_key TEXT,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    run_after REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key
+    ON jobs (idempotency_key) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status_type ON jobs (status, type, run_after);
+"""
+
+JOB_SECONDS = metrics.histogram("job_seconds", "Background job run time by type and outcome", ("type", "outcome"))
+
+ProgressFn = Callable[[float, Optional[str]], None]
+Handler = Callable[[Dict[str, Any], ProgressFn], Any]
+
+
+def job_concurrency(job_type: str) -> int:
+    """Configured concurrency for a job type (JOB_CONCURRENCY_<TYPE>), at least 1."""
+    default = JOB_CONCURRENCY_DEFAULTS.get(job_type, 1)
+    name = f"JOB_CONCURRENCY_{job_type.upper()}"
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        logger.warning("Invalid %s value %r, using %d", name, value, default)
+        return default
+
+
+@dataclass
+class Job:
+    """A row of the jobs table."""
+    id: str
+    type: str
+    idempotency_key: Optional[str]
+    status: str
+    payload: Dict[str, Any]
+    result: Any
+    error: Optional[str]
+    progress: float
+    message: Optional[str]
+    attempts: int
+    max_attempts: int
+    worker: Optional[str]
+    run_after: float
+    created_at: float
+    updated_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["payload"] = serialization.loads(data["payload"])
+        data["result"] = serialization.loads(data["result"]) if data["result"] is not None else None
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class JobQueue:
+    """Persistent job queue shared by the webhook server and worker processes."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite database file (defaults to JOB_QUEUE_DB or data/jobs.sqlite3)
+        """
+        self.db_path = Path(db_path or os.getenv("JOB_QUEUE_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation keeps the queue safe to share across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database lock up front."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Tuple[Job, bool]:
+        """
+        Add a job unless one with the same idempotency key is queued or running.
+
+        Args:
+            job_type: Handler name, e.g. 'blog_approval'
+            payload: JSON-serializable handler arguments
+            key: Idempotency key, e.g. 'blog_approval:2025-01-15'
+            max_attempts: Attempts before the job fails (defaults to JOB_MAX_ATTEMPTS or 3)
+
+        Returns:
+            (job, created): the new job, or the existing active job and False
+        """
+        if max_attempts is None:
+            max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS)))
+        now = time.time()
+        with self._transaction() as conn:
+            if key is not None:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE idempotency_key = ? AND status IN (?, ?)",
+                    (key, *ACTIVE_STATUSES),
+                ).fetchone()
+                if row is not None:
+                    return Job.from_row(row), False
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, type, idempotency_key, status, payload, max_attempts,"
+                " run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, job_type, key, QUEUED, serialization.dumps(payload or {}, compact=True),
+                 max(1, max_attempts), now, now, now),
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        logger.info("Enqueued %s job %s (key=%s)", job_type, job_id, key)
+        return Job.from_row(row), True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """Most recently created jobs, optionally filtered by status and type."""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if job_type:
+            clauses.append("type = ?")
+            params.append(job_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def depths(self) -> Dict[Tuple[str, str], int]:
+        """Number of queued and running jobs, keyed by (type, status)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT type, status, COUNT(*) FROM jobs WHERE status IN (?, ?) GROUP BY type, status",
+                ACTIVE_STATUSES,
+            ).fetchall()
+        return {(job_type, status): count for job_type, status, count in rows}
+
+    def claim(self, worker: str, job_types: Iterable[str]) -> Optional[Job]:
+        """
+        Atomically take the oldest runnable job whose type is below its concurrency limit.
+
+        Args:
+            worker: Identifier recorded on the job
+            job_types: Types this worker can execute
+
+        Returns:
+            The claimed job, now running, or None
+        """
+        job_types = list(job_types)
+        if not job_types:
+            return None
+        now = time.time()
+        with self._transaction() as conn:
+            running = dict(conn.execute(
+                "SELECT type, COUNT(*) FROM jobs WHERE status = ? GROUP BY type", (RUNNING,)
+            ).fetchall())
+            available = [t for t in job_types if running.get(t, 0) < job_concurrency(t)]
+            if not available:
+                return None
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE status = ? AND run_after <= ?"
+                f" AND type IN ({', '.join('?' * len(available))})"
+                f" ORDER BY run_after, created_at LIMIT 1",
+                (QUEUED, now, *available),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, error = NULL,"
+                " started_at = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"]),
+            )
+            claimed = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return Job.from_row(claimed)
+
+    def heartbeat(self, job_ids: Iterable[str]):
+        """Mark running jobs as alive so they aren't requeued as stale."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE status = ? AND id IN ({', '.join('?' * len(job_ids))})",
+                (time.time(), RUNNING, *job_ids),
+            )
+
+    def set_progress(self, job_id: str, progress: float, message: Optional[str] = None):
+        """Record progress (0-1) and an optional status message for a running job."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = COALESCE(?, message), updated_at = ?"
+                " WHERE id = ? AND status = ?",
+                (min(max(progress, 0.0), 1.0), message, time.time(), job_id, RUNNING),
+            )
+
+    def complete(self, job_id: str, worker: str, result: Any = None) -> bool:
+        """
+        Record a job's result, if the worker still owns the running job.
+
+        Args:
+            job_id: Job to complete
+            worker: Worker that claimed the job
+            result: JSON-serializable handler result
+
+        Returns:
+            False if the job was requeued or taken over by another worker meanwhile
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, progress = 1, finished_at = ?, updated_at = ?"
+                " WHERE id = ? AND status = ? AND worker = ?",
+                (SUCCEEDED, serialization.dumps(result, compact=True), now, now, job_id, RUNNING, worker),
+            )
+        if not cursor.rowcount:
+            logger.warning("Job %s is no longer owned by %s; result discarded", job_id, worker)
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """
+        Record a failed attempt, retrying with backoff while attempts remain.
+
+        Args:
+            job_id: Job that failed
+            worker: Worker that claimed the job
+            error: Failure message
+
+        Returns:
+            False if the job was requeued or taken over by another worker meanwhile
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND worker = ?",
+                (job_id, RUNNING, worker),
+            ).fetchone()
+            if row is None:
+                logger.warning("Job %s is no longer owned by %s; failure discarded", job_id, worker)
+                return False
+            if row["attempts"] < row["max_attempts"]:
+                retry_at = now + RETRY_BACKOFF_SECONDS * 2 ** (row["attempts"] - 1)
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, worker = NULL, run_after = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (QUEUED, error, retry_at, now, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                    (FAILED, error, now, now, job_id),
+                )
+        return True
+
+    def requeue_stale(self, stale_after: Optional[float] = None) -> int:
+        """
+        Requeue running jobs whose worker stopped heartbeating.
+
+        A stale job that has used all of its attempts is failed instead, so a
+        job that keeps killing its worker isn't retried forever.
+
+        Returns:
+            Number of jobs requeued
+        """
+        if stale_after is None:
+            stale_after = float(os.getenv("JOB_STALE_SECONDS", str(DEFAULT_STALE_SECONDS)))
+        now = time.time()
+        with self._transaction() as conn:
+            failed = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, updated_at = ?"
+                " WHERE status = ? AND updated_at < ? AND attempts >= max_attempts",
+                (FAILED, "Worker stopped heartbeating", now, now, RUNNING, now - stale_after),
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, updated_at = ?, run_after = ?"
+                " WHERE status = ? AND updated_at < ?",
+                (QUEUED, now, now, RUNNING, now - stale_after),
+            ).rowcount
+        if failed:
+            logger.warning("Failed %d stale job(s) with no attempts left", failed)
+        if requeued:
+            logger.warning("Requeued %d stale job(s)", requeued)
+        return requeued
+
+_handlers: Dict[str, Handler] = {}
+_handlers_lock = threading.Lock()
+
+
+def register_handler(job_type: str, handler: Handler):
+    """Register the function that executes jobs of a type."""
+    with _handlers_lock:
+        _handlers[job_type] = handler
+
+
+def job_handler(job_type: str) -> Callable[[Handler], Handler]:
+    """Decorator form of register_handler."""
+    def decorator(handler: Handler) -> Handler:
+        register_handler(job_type, handler)
+        return handler
+    return decorator
+
+
+def get_handler(job_type: str) -> Optional[Handler]:
+    with _handlers_lock:
+        return _handlers.get(job_type)
+
+
+def handler_types() -> List[str]:
+    with _handlers_lock:
+        return sorted(_handlers)
+
+
+class JobWorker:
+    """Claims jobs from a queue and runs them on a thread pool."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        job_types: Optional[Iterable[str]] = None,
+        poll_interval: float = 1.0,
+        stale_after: Optional[float] = None,
+    ):
+        """
+        Args:
+            queue: Queue to consume
+            job_types: Types to run (defaults to every registered handler)
+            poll_interval: Seconds between polls when idle
+            stale_after: Heartbeat age before a running job is requeued (JOB_STALE_SECONDS)
+        """
+        self.queue = queue
+        self.job_types = list(job_types) if job_types is not None else handler_types()
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.capacity = max(1, sum(job_concurrency(t) for t in self.job_types))
+
+    def execute(self, job: Job) -> bool:
+        """Run one claimed job and record its outcome. Returns True on success."""
+        handler = get_handler(job.type)
+        if handler is None:
+            self.queue.fail(job.id, self.worker_id, f"No handler registered for job type '{job.type}'")
+            return False
+
+        def progress(value: float, message: Optional[str] = None):
+            self.queue.set_progress(job.id, value, message)
+
+        logger.info("Running %s job %s (attempt %d/%d)", job.type, job.id, job.attempts, job.max_attempts)
+        start = time.perf_counter()
+        try:
+            result = handler(job.payload, progress)
+        except Exception as e:
+            JOB_SECONDS.observe(time.perf_counter() - start, type=job.type, outcome="error")
+            logger.error(f"Job {job.id} ({job.type}) failed: {e}")
+            self.queue.fail(job.id, self.worker_id, str(e))
+            return False
+        JOB_SECONDS.observe(time.perf_counter() - start, type=job.type, outcome="ok")
+        return self.queue.complete(job.id, self.worker_id, result)
+
+    def run_once(self) -> bool:
+        """Claim and run a single job inline. Returns False if nothing was runnable."""
+        job = self.queue.claim(self.worker_id, self.job_types)
+        if job is None:
+            return False
+        self.execute(job)
+        return True
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Process jobs until stop_event is set, keeping up to capacity jobs in flight."""
+        stop_event = stop_event or threading.Event()
+        self.queue.requeue_stale(self.stale_after)
+        logger.info("Job worker %s running %s (capacity %d)", self.worker_id, self.job_types, self.capacity)
+
+        in_flight: Dict[Future, str] = {}
+        last_recovery = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.capacity, thread_name_prefix="jobs") as executor:
+            while not stop_event.is_set():
+                self.queue.heartbeat(in_flight.values())
+                if time.monotonic() - last_recovery > self.poll_interval * 30:
+                    self.queue.requeue_stale(self.stale_after)
+                    last_recovery = time.monotonic()
+
+                while len(in_flight) < self.capacity:
+                    job = self.queue.claim(self.worker_id, self.job_types)
+                    if job is None:
+                        break
+                    in_flight[executor.submit(self.execute, job)] = job.id
+
+                if in_flight:
+                    done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        in_flight.pop(future)
+                else:
+                    stop_event.wait(self.poll_interval)
+
+
+@job_handler("final_digest")
+def _final_digest_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from services.blog import BlogDigestBuilder
+
+    date = payload["date"]
+    progress(0.1, "Creating FINAL digest")
+    if BlogDigestBuilder().create_final_digest(date) is None:
+        raise RuntimeError(f"Failed to create FINAL digest for {date}")
+    return {"date": date, "final_digest": True}
+
+
+@job_handler("blog_approval")
+def _blog_approval_job(payload: Dict[str, Any], progress: ProgressFn) -> Dict[str, Any]:
+    from services.notify import notify_blog_published
+
+    result = _final_digest_job(payload, progress)
+    progress(0.8, "Sending published notification")
+    try:
+        result["notified"] = bool(notify_blog_published(payload["date"]))
+    except Exception as e:
+        # The blog is published; a missed notification shouldn't retry the whole job
+        logger.error(f"Error sending blog published notification for {payload['date']}: {e}")
+        result["notified"] = False
+    return result
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from pathlib import Path
 
 from .blog_status import BlogStatusChecker, format_draft_approval_message
+from .http_client import get_client
 
 logger = logging.getLogger(__name__)
 
@@ -155,25 +156,25 @@ def _send_discord_webhook(webhook_url: str, content: str) -> bool:
     # Send each chunk sequentially
     try:
         timeout = httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0)
-        with httpx.Client(timeout=timeout) as client:
-            for i, chunk in enumerate(chunks):
-                payload = {
-                    "content": chunk,
-                    "allowed_mentions": {"parse": []}  # Prevent mass pings
-                }
-                
-                response = client.post(webhook_url, json=payload)
-                
-                # Check for non-2xx responses
-                if response.status_code < 200 or response.status_code >= 300:
-                    logger.error(f"Discord webhook failed with status {response.status_code}: {response.text}")
-                    return False
-                
-                logger.info(f"Discord notification chunk {i+1}/{len(chunks)} sent successfully")
+        client = get_client(webhook_url)
+        for i, chunk in enumerate(chunks):
+            payload = {
+                "content": chunk,
+                "allowed_mentions": {"parse": []}  # Prevent mass pings
+            }
+            
+            response = client.post(webhook_url, json=payload, timeout=timeout)
             
-            logger.info(f"All {len(chunks)} Discord notification chunks sent successfully")
-            return True
+            # Check for non-2xx responses
+            if response.status_code < 200 or response.status_code >= 300:
+                logger.error(f"Discord webhook failed with status {response.status_code}: {response.text}")
+                return False
             
+            logger.info(f"Discord notification chunk {i+1}/{len(chunks)} sent successfully")
+        
+        logger.info(f"All {len(chunks)} Discord notification chunks sent successfully")
+        return True
+        
     except httpx.HTTPStatusError as e:
         logger.error(f"Discord webhook failed: {e.response.text}")
         return False
@@ -309,16 +310,16 @@ def _send_discord_webhook_with_payload(webhook_url: str, payload: Dict) -> bool:
     """
     try:
         timeout = httpx.Timeout(connect=10.0, read=20.0, write=10.0, pool=30.0)
-        with httpx.Client(timeout=timeout) as client:
-            response = client.post(webhook_url, json=payload)
-            
-            if response.status_code < 200 or response.status_code >= 300:
-                logger.error(f"Discord webhook failed with status {response.status_code}: {response.text}")
-                return False
-            
-            logger.info("Discord notification with payload sent successfully")
-            return True
-            
+        client = get_client(webhook_url)
+        response = client.post(webhook_url, json=payload, timeout=timeout)
+        
+        if response.status_code < 200 or response.status_code >= 300:
+            logger.error(f"Discord webhook failed with status {response.status_code}: {response.text}")
+            return False
+        
+        logger.info("Discord notification with payload sent successfully")
+        return True
+        
     except httpx.HTTPStatusError as e:
         logger.error(f"Discord webhook failed: {e.response.text}")
         return False
@@ -6,14 +6,10 @@ from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
 from services.auth import AuthService
+from services.obs_session import ReqClient, get_session
 
 load_dotenv()
 
-try:
-    from obsws_python import ReqClient  # type: ignore
-except Exception:  # pragma: no cover
-    ReqClient = None
-
 @dataclass
 class ObsResult:
     ok: bool
@@ -36,6 +32,7 @@ class OBSController:
         self.target_scene = self.credentials.scene
         self.dry_run = self.credentials.dry_run
         self.ws = None
+        self.session = None
 
     def _connect(self) -> ObsResult:
         if self.dry_run:
@@ -43,18 +40,16 @@ class OBSController:
         if ReqClient is None:
             return ObsResult(ok=False, error="obsws-python library not installed")
         try:
-            self.ws = ReqClient(host=self.host, port=self.port, password=self.password)
+            # Shared per OBS instance: no handshake when the session is already connected
+            self.session = get_session(self.host, self.port, self.password)
+            self.ws = self.session.connect()
             return ObsResult(ok=True)
         except Exception as e:
             return ObsResult(ok=False, error=f"OBS connect failed: {e}")
 
     def _disconnect(self) -> None:
-        if self.ws:
-            try:
-                self.ws.disconnect()
-            except Exception:
-                pass
-            self.ws = None
+        # The session stays open for the next command; only drop our reference
+        self.ws = None
 
     def start_recording(self) -> ObsResult:
         """Start recording only. Never stop streaming, never close OBS."""
@@ -63,11 +58,9 @@ class OBSController:
             return conn
         try:
             if not self.dry_run:
-                # Try to get recording status, but don't fail if it doesn't work
+                # Recording state comes from RecordStateChanged events when subscribed
                 try:
-                    rec_status = self.ws.get_record_status()
-                    # Check if recording is already active (v5 API uses outputActive)
-                    if hasattr(rec_status, 'outputActive') and rec_status.outputActive:
+                    if self.session.is_recording():
                         return ObsResult(ok=True, info={"noop": "already_recording", "started_by_us": False})
                 except Exception:
                     # Recording status check failed, continue anyway
@@ -76,13 +69,14 @@ class OBSController:
                 # optional scene switch
                 if self.target_scene:
                     try:
-                        self.ws.set_current_program_scene(self.target_scene)
+                        self.session.call("set_current_program_scene", self.target_scene)
                     except Exception:
                         # scene may not exist; ignore
                         pass
                 
                 # Start recording
-                self.ws.start_record()
+                self.session.call("start_record")
+                self.session.mark_recording(True)
                 return ObsResult(ok=True, info={"started_by_us": True})
             return ObsResult(ok=True)
         except Exception as e:
@@ -96,18 +90,16 @@ class OBSController:
             return conn
         try:
             if not self.dry_run:
-                # Try to get recording status, but don't fail if it doesn't work
                 try:
-                    rec_status = self.ws.get_record_status()
-                    # Check if recording is not active (v5 API uses outputActive)
-                    if hasattr(rec_status, 'outputActive') and not rec_status.outputActive:
+                    if not self.session.is_recording():
                         return ObsResult(ok=True, info={"noop": "not_recording"})
                 except Exception:
                     # Recording status check failed, continue anyway
                     pass
                 
                 # Stop recording
-                self.ws.stop_record()
+                self.session.call("stop_record")
+                self.session.mark_recording(False)
                 return ObsResult(ok=True)
             return ObsResult(ok=True)
         except Exception as e:
@@ -0,0 +1,205 @@
+"""
+Process-wide OBS websocket sessions.
+
+OBSController used to open, authenticate and close a ReqClient for every
+start/stop and poll GetRecordStatus each time. Sessions handed out here stay
+connected between commands (reconnecting once when the socket has dropped)
+and subscribe to RecordStateChanged events, so the recording state is known
+without a status request.
+"""
+
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from obsws_python import EventClient, ReqClient, Subs  # type: ignore
+    from obsws_python.error import OBSSDKRequestError  # type: ignore
+except ImportError:  # pragma: no cover
+    EventClient = ReqClient = Subs = None
+
+    class OBSSDKRequestError(Exception):
+        pass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5.0
+
+# RecordStateChanged outputState values that mean a recording is (about to be) running
+_RECORDING_STATES = {
+    "OBS_WEBSOCKET_OUTPUT_STARTING",
+    "OBS_WEBSOCKET_OUTPUT_STARTED",
+    "OBS_WEBSOCKET_OUTPUT_PAUSED",
+    "OBS_WEBSOCKET_OUTPUT_RESUMED",
+}
+_STOPPED_STATES = {"OBS_WEBSOCKET_OUTPUT_STOPPING", "OBS_WEBSOCKET_OUTPUT_STOPPED"}
+
+
+class OBSSession:
+    """
+    Long-lived request connection plus event subscription for one OBS instance.
+
+    Requests are serialized with a lock (one websocket, one request in flight).
+    The cached recording state is only trusted while the event subscription
+    is alive; otherwise it is read from OBS again.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: float = DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self._client = None
+        self._events = None
+        self._recording: Optional[bool] = None
+        self._lock = threading.RLock()
+
+    def _subscribed(self) -> bool:
+        worker = getattr(self._events, "worker", None)
+        return self._events is not None and (worker is None or worker.is_alive())
+
+    def _ensure_connected(self):
+        """Open the request and event connections if needed (lock must be held)."""
+        if ReqClient is None:
+            raise RuntimeError("obsws-python library not installed")
+        if self._client is None:
+            self._client = ReqClient(host=self.host, port=self.port, password=self.password, timeout=self.timeout)
+            self._recording = None
+            logger.info("Connected to OBS at %s:%s", self.host, self.port)
+        if not self._subscribed():
+            if self._events is not None:
+                try:
+                    self._events.disconnect()
+                except Exception:
+                    pass
+            self._events = None
+            self._recording = None
+            try:
+                events = EventClient(host=self.host, port=self.port, password=self.password,
+                                     timeout=self.timeout, subs=Subs.OUTPUTS)
+                events.callback.register(self.on_record_state_changed)
+                self._events = events
+            except Exception as e:
+                # Commands still work; recording state is just polled instead of cached
+                logger.warning("OBS event subscription failed: %s", e)
+        return self._client
+
+    def connect(self):
+        """
+        Get the connected request client, connecting if needed.
+
+        Returns:
+            The shared ReqClient (callers must not disconnect it)
+        """
+        with self._lock:
+            return self._ensure_connected()
+
+    def call(self, method: str, *args: Any) -> Any:
+        """
+        Send a request, reconnecting and retrying once if the connection dropped.
+
+        Args:
+            method: ReqClient method name (e.g. 'start_record')
+            *args: Request arguments
+
+        Returns:
+            The request's response
+        """
+        with self._lock:
+            for attempt in range(2):
+                client = self._ensure_connected()
+                try:
+                    return getattr(client, method)(*args)
+                except OBSSDKRequestError:
+                    # OBS answered; the connection is fine
+                    raise
+                except Exception as e:
+                    self._reset()
+                    if attempt:
+                        raise
+                    logger.info("OBS connection lost (%s), reconnecting", e)
+
+    def is_recording(self) -> bool:
+        """Current recording state, from events when subscribed, otherwise polled."""
+        with self._lock:
+            self._ensure_connected()
+            if self._recording is not None and self._subscribed():
+                return self._recording
+            status = self.call("get_record_status")
+            self._recording = bool(getattr(status, "output_active", False))
+            return self._recording
+
+    def mark_recording(self, recording: bool):
+        """Record the state a successful start/stop request moved OBS to."""
+        with self._lock:
+            self._recording = recording
+
+    def on_record_state_changed(self, data):
+        """RecordStateChanged callback (runs on the event client's thread)."""
+        state = getattr(data, "output_state", None)
+        if state in _RECORDING_STATES:
+            recording = True
+        elif state in _STOPPED_STATES:
+            recording = False
+        else:
+            recording = bool(getattr(data, "output_active", False))
+        self._recording = recording
+        logger.debug("OBS record state changed: %s", state)
+
+    def _reset(self):
+        """Drop both connections (lock must be held)."""
+        client, events = self._client, self._events
+        self._client = self._events = None
+        self._recording = None
+        for conn in (client, events):
+            if conn is None:
+                continue
+            try:
+                conn.disconnect()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            self._reset()
+
+
+_sessions: Dict[Tuple[str, int, str], OBSSession] = {}
+_lock = threading.Lock()
+
+
+def get_session(host: str, port: int, password: str) -> OBSSession:
+    """
+    Get the shared session for an OBS instance.
+
+    Args:
+        host: OBS websocket host
+        port: OBS websocket port
+        password: OBS websocket password
+
+    Returns:
+        The process-wide OBSSession (connected lazily on first use)
+    """
+    key = (host, port, password)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = OBSSession(host, port, password)
+        return session
+
+
+def close_all():
+    """Close every OBS session (registered to run at interpreter exit)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+
+    for session in sessions:
+        try:
+            session.close()
+        except Exception as e:
+            logger.warning("Failed to close OBS session: %s", e)
+
+
+atexit.register(close_all)
@@ -6,6 +6,7 @@ import os
 import logging
 import shutil
 import re
+import time
 from pathlib import Path
 from typing import Optional, Dict, List, TypedDict
 from datetime import datetime
@@ -13,10 +14,14 @@ import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 
+from services import metrics
 from services.auth import AuthService
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_SECONDS = metrics.histogram("upload_seconds", "R2 upload latency by outcome", ("outcome",))
+UPLOAD_BYTES = metrics.counter("upload_bytes_total", "Bytes uploaded to R2")
+
 # Load environment variables
 load_dotenv()
 
@@ -207,6 +212,8 @@ class Publisher:
     
     def _upload_to_r2(self, local_path: str, r2_key: str) -> None:
         """Upload file to R2 bucket using S3-compatible API."""
+        start = time.perf_counter()
+        outcome = "error"
         try:
             with open(local_path, 'rb') as f:
                 self.s3_client.upload_fileobj(
@@ -215,12 +222,16 @@ class Publisher:
                     r2_key,
                     ExtraArgs={'ContentType': 'video/mp4'}
                 )
+            outcome = "ok"
+            UPLOAD_BYTES.inc(os.path.getsize(local_path))
         except (ClientError, NoCredentialsError) as e:
             logger.error(f"Failed to upload {local_path} to R2 key {r2_key}: {e}")
             raise RuntimeError(f"Failed to upload to R2: {e}")
         except Exception as e:
             logger.error(f"Unexpected error uploading {local_path} to R2 key {r2_key}: {e}")
             raise RuntimeError(f"Failed to upload to R2: {e}")
+        finally:
+            UPLOAD_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
     
     def get_asset_url(self, date: str, story_id: str, asset_type: str = "video") -> Optional[str]:
         """
@@ -4,22 +4,16 @@ Handles idempotent uploads with MD5/ETag comparison, feed generation, and cache
 """
 
 import hashlib
-import json
 import logging
 import os
-from datetime import datetime, date
+import time
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 import boto3
 from botocore.exceptions import ClientError
 
-class DateEncoder(json.JSONEncoder):
-    """Custom JSON encoder to handle date and datetime objects."""
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
-
+from services import metrics, serialization
+from services.budgets import budget
 from services.auth import AuthService
 from services.feeds import FeedGenerator
 from services.related import RelatedPostsService
@@ -28,6 +22,21 @@ from services.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_SECONDS = metrics.histogram("upload_seconds", "R2 upload latency by outcome", ("outcome",))
+UPLOAD_BYTES = metrics.counter("upload_bytes_total", "Bytes uploaded to R2")
+
+
+def _body_size(body: Any) -> int:
+    """Size of a put_object Body (bytes, str or a seekable file)."""
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    try:
+        return os.fstat(body.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
 
 class R2Publisher:
     """Handles publishing static site files and blog JSON to R2 with idempotency."""
@@ -81,14 +90,29 @@ class R2Publisher:
         try:
             response = self.s3_client.head_object(Bucket=self.bucket, Key=r2_key)
             etag = response.get('ETag', '').strip('"')  # Remove quotes from ETag
+            metrics.record_cache("r2_upload", etag == local_md5)
             return etag == local_md5
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code')
             if error_code in ('404', 'NotFound', 'NoSuchKey'):
+                metrics.record_cache("r2_upload", False)
                 return False  # File doesn't exist, should upload
             logger.warning(f"Error checking R2 object {r2_key}: {e}", exc_info=True)
             return False  # On error, proceed with upload
     
+    def _put_object(self, **kwargs):
+        """Upload an object within the process-wide upload concurrency budget."""
+        with budget("upload"):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                response = self.s3_client.put_object(**kwargs)
+                outcome = "ok"
+            finally:
+                UPLOAD_SECONDS.observe(time.perf_counter() - start, outcome=outcome)
+            UPLOAD_BYTES.inc(_body_size(kwargs.get("Body")))
+            return response
+    
     def _headers_for(self, file_path: Path) -> Dict[str, str]:
         """Get appropriate headers for file type."""
         suffix = file_path.suffix.lower()
@@ -156,7 +180,7 @@ class R2Publisher:
                 
                 # Upload file
                 with open(file_path, 'rb') as f:
-                    self.s3_client.put_object(
+                    self._put_object(
                         Bucket=self.bucket,
                         Key=r2_key,
                         Body=f,
@@ -192,8 +216,7 @@ class R2Publisher:
         
         for file_path in api_v3_files:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    blog_data = json.load(f)
+                blog_data = serialization.load_file(file_path)
                 all_blogs_data.append(blog_data)
             except Exception as e:
                 logger.warning(f"Failed to load blog data from {file_path}: {e}")
@@ -213,8 +236,7 @@ class R2Publisher:
                 r2_key = f"blogs/{date_dir}/{date_dir}_page.publish.json"
                 
                 # Load blog data for enhancement
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    blog_data = json.load(f)
+                blog_data = serialization.load_file(file_path)
                 
                 # Enhance with related posts
                 blog_data = self._enhance_with_related_posts(blog_data, all_blogs_data)
@@ -223,8 +245,7 @@ class R2Publisher:
                 blog_data = self._enhance_with_thumbnails(blog_data, file_path.parent)
                 
                 # Write enhanced data back to file
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(blog_data, f, indent=2, ensure_ascii=False, cls=DateEncoder)
+                serialization.dump_file(file_path, blog_data)
                 
                 local_md5 = self._hash_md5(file_path)
                 
@@ -235,7 +256,7 @@ class R2Publisher:
                 
                 # Upload enhanced file
                 with open(file_path, 'rb') as f:
-                    self.s3_client.put_object(
+                    self._put_object(
                         Bucket=self.bucket,
                         Key=r2_key,
                         Body=f,
@@ -286,8 +307,7 @@ class R2Publisher:
             
             # Write blogs index
             blogs_index_file = feeds_dir / "blogs-index.json"
-            with open(blogs_index_file, 'w', encoding='utf-8') as f:
-                json.dump(blogs_index, f, indent=2, ensure_ascii=False, cls=DateEncoder)
+            serialization.dump_file(blogs_index_file, blogs_index)
             
             # Upload feeds to R2
             feed_files = [
@@ -305,7 +325,7 @@ class R2Publisher:
                         continue
                     
                     with open(file_path, 'rb') as f:
-                        self.s3_client.put_object(
+                        self._put_object(
                             Bucket=self.bucket,
                             Key=r2_key,
                             Body=f,
@@ -429,7 +449,7 @@ class R2Publisher:
                     
                     # Upload to R2
                     with open(asset_file, 'rb') as f:
-                        self.s3_client.put_object(
+                        self._put_object(
                             Bucket=self.bucket,
                             Key=r2_key,
                             Body=f,
@@ -481,7 +501,7 @@ class R2Publisher:
                     
                     # Upload to R2
                     with open(video_file, 'rb') as f:
-                        self.s3_client.put_object(
+                        self._put_object(
                             Bucket=self.bucket,
                             Key=r2_key,
                             Body=f,
@@ -0,0 +1,273 @@
+"""
+Token-bucket rate limiting shared by every request path to an API provider.
+
+Each provider gets one limiter per process. Budgets start from conservative
+defaults and are corrected from the `Ratelimit-*` (Twitch) and
+`X-RateLimit-*` (GitHub) response headers, so concurrent fetchers pace
+themselves instead of discovering the limit through 429 responses.
+
+SlidingWindowLimiter covers the inbound side: per-client limits (e.g. per IP)
+in fixed memory.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# provider -> (requests per window, window seconds)
+PROVIDER_DEFAULTS = {
+    "twitch": (800, 60.0),
+    "github": (5000, 3600.0),
+}
+
+
+class RateLimiter:
+    """Thread-safe token bucket that learns its budget from response headers."""
+
+    def __init__(self, name: str, limit: int, window: float):
+        self.name = name
+        self.capacity = float(limit)
+        self.window = window
+        self.refill_rate = self.capacity / window
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add tokens accrued since the last update (lock must be held)."""
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self._updated_at = now
+
+    def _try_acquire(self) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            0.0 if a token was taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.refill_rate
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent."""
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            logger.debug("%s rate limiter waiting %.2fs", self.name, wait)
+            time.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Adjust the bucket from provider rate limit headers."""
+        limit = _header_number(headers, "Ratelimit-Limit", "X-RateLimit-Limit")
+        remaining = _header_number(headers, "Ratelimit-Remaining", "X-RateLimit-Remaining")
+        reset = _header_number(headers, "Ratelimit-Reset", "X-RateLimit-Reset")
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit and limit > 0:
+                self.capacity = limit
+                self.refill_rate = limit / self.window
+            if remaining is not None:
+                # The server's count wins - other processes may share the same budget
+                self.tokens = min(self.tokens, max(0.0, remaining))
+                if remaining <= 0 and reset is not None:
+                    # Budget exhausted: hold everyone until the provider resets it
+                    self.blocked_until = max(self.blocked_until, now + max(0.0, reset - time.time()))
+
+    def block_for(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = 0.0
+            self._updated_at = now
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class SlidingWindowLimiter:
+    """
+    Per-key sliding-window counter with a bounded, LRU-evicted key table.
+
+    Each key keeps only the request counts of the current and previous
+    fixed windows; the sliding count is the current count plus the previous
+    count weighted by how much of the previous window still overlaps. Checks
+    are O(1), and at most max_keys keys are tracked: idle keys expire as the
+    table is touched and, under pressure, the least recently seen key is
+    evicted (that client starts over with a fresh budget).
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            limit: Requests allowed per key in any window-long span
+            window: Window length in seconds
+            max_keys: Maximum keys tracked at once
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.limit = limit
+        self.window = window
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        # key -> [current window index, current count, previous count]
+        self._entries: "OrderedDict[Hashable, List[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire_idle(self, window_index: int):
+        """Drop keys not seen for two windows from the LRU end (lock must be held)."""
+        for _ in range(2):
+            if not self._entries:
+                return
+            oldest = next(iter(self._entries.values()))
+            if window_index - oldest[0] < 2:
+                return
+            self._entries.popitem(last=False)
+
+    def hit(self, key: Hashable) -> Tuple[bool, float]:
+        """
+        Count a request for key if it is within the limit.
+
+        Returns:
+            (allowed, retry_after): retry_after is 0 when allowed, otherwise
+            seconds until the sliding count drops below the limit
+        """
+        now = self._clock()
+        window_index = int(now // self.window)
+        elapsed = now - window_index * self.window
+
+        with self._lock:
+            self._expire_idle(window_index)
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_keys:
+                    self._entries.popitem(last=False)
+                entry = self._entries[key] = [window_index, 0, 0]
+            else:
+                self._entries.move_to_end(key)
+                if entry[0] != window_index:
+                    # Roll forward; a gap of more than one window clears the history
+                    entry[2] = entry[1] if window_index - entry[0] == 1 else 0
+                    entry[0], entry[1] = window_index, 0
+
+            _, current, previous = entry
+            overlap = 1.0 - elapsed / self.window
+            if current + previous * overlap < self.limit:
+                entry[1] += 1
+                return True, 0.0
+
+        remaining = self.window - elapsed
+        if current >= self.limit:
+            # This window alone is full: wait for it to become the previous window and slide out
+            retry_after = remaining + self.window * (1.0 - self.limit / current)
+        else:
+            # Wait until enough of the previous window has slid out (at most until the next window)
+            retry_after = min(self.window * (current + previous - self.limit) / previous - elapsed, remaining)
+        return False, max(retry_after, 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _header_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    """Read the first parseable numeric header from names."""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            logger.warning("Invalid %s header value: %s", name, value)
+    return None
+
+
+def retry_delay(response: httpx.Response, attempt: int, base_backoff: float = 1.0, max_backoff: float = 30.0) -> float:
+    """
+    Work out how long to wait after a 429 response.
+
+    Honors Retry-After first, then the rate limit reset timestamp, and falls
+    back to exponential backoff with jitter.
+    """
+    retry_after = _header_number(response.headers, "Retry-After")
+    if retry_after is not None:
+        return max(0.0, retry_after)
+
+    reset = _header_number(response.headers, "Ratelimit-Reset", "X-RateLimit-Reset")
+    if reset is not None:
+        return max(0.0, reset - time.time())
+
+    backoff = min(max_backoff, base_backoff * (2 ** attempt))
+    return backoff * random.uniform(0.9, 1.1)
+
+
+def send_with_rate_limit(
+    limiter: RateLimiter,
+    send: Callable[[], httpx.Response],
+    max_attempts: int = 3,
+) -> httpx.Response:
+    """
+    Send a request through a limiter, retrying 429 responses.
+
+    Args:
+        limiter: Limiter for the provider being called
+        send: Zero-argument callable performing the request
+        max_attempts: Maximum number of attempts on 429
+
+    Returns:
+        The last response (callers still check its status code)
+    """
+    for attempt in range(max_attempts):
+        limiter.acquire()
+        response = send()
+        limiter.update_from_headers(response.headers)
+        if response.status_code != 429:
+            return response
+
+        delay = retry_delay(response, attempt)
+        logger.info("%s rate limited (attempt %d/%d), backing off %.2fs",
+                    limiter.name, attempt + 1, max_attempts, delay)
+        limiter.block_for(delay)
+
+    logger.error("%s rate limit exceeded after %d attempts", limiter.name, max_attempts)
+    return response
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Get the process-wide limiter for a provider (e.g. 'twitch', 'github')."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limit, window = PROVIDER_DEFAULTS.get(provider, (60, 60.0))
+            limiter = RateLimiter(provider, limit, window)
+            _limiters[provider] = limiter
+        return limiter
@@ -0,0 +1,104 @@
+"""
+Story recording control shared by the devlog CLI and the Discord bot.
+
+Starts or stops the OBS recording and records it in the story state, so
+callers that already have an interpreter running (the bot) don't need to
+spawn `python -m cli.devlog record` for it.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from services.story_state import StoryState
+
+logger = logging.getLogger(__name__)
+
+RECORD_ACTIONS = ("start", "stop")
+
+
+class RecordingError(RuntimeError):
+    """A record command failed; the message is safe to show to the user."""
+
+
+def record_story(
+    story_id: str,
+    action: str,
+    date: datetime,
+    obs=None,
+    state: Optional[StoryState] = None,
+    deadline: Optional[float] = None,
+) -> str:
+    """
+    Start or stop OBS recording for a story and persist the story state.
+
+    Starting rolls the OBS recording back if the story state can't be
+    updated, so a failed command never leaves an orphaned recording.
+
+    A caller that stops waiting can't cancel the thread running this, so
+    the deadline is checked before OBS is touched: a command that sat in a
+    queue past its caller's timeout is dropped instead of running late.
+
+    Args:
+        story_id: Validated story identifier
+        action: 'start' or 'stop'
+        date: Timezone-aware story date
+        obs: OBS controller to use (a new OBSController by default)
+        state: Story state store to use (a new StoryState by default)
+        deadline: time.monotonic() value after which OBS must not be touched
+
+    Returns:
+        Confirmation message
+
+    Raises:
+        RecordingError: If OBS or the story state update fails, or the
+            deadline passed before OBS was reached
+    """
+    if action not in RECORD_ACTIONS:
+        raise ValueError(f"Invalid action: {action}")
+
+    if obs is None:
+        try:
+            from services.obs_controller import OBSController
+            obs = OBSController()
+        except Exception as e:
+            raise RecordingError(f"OBS initialization failed: {e}") from e
+    state = state or StoryState()
+
+    if deadline is not None and time.monotonic() > deadline:
+        raise RecordingError(f"Timed out waiting to run record {action}; OBS was not touched")
+
+    if action == "start":
+        try:
+            res = obs.start_recording()
+        except Exception as e:
+            raise RecordingError(f"OBS start failed: {e}") from e
+        if not res.ok:
+            raise RecordingError(res.error)
+        try:
+            state.begin_recording(date, story_id, assume_utc=True)
+        except Exception as e:
+            # Rollback: stop OBS recording to prevent orphaned recording
+            try:
+                cleanup_res = obs.stop_recording()
+                if not cleanup_res.ok:
+                    logger.warning(f"Failed to cleanup OBS recording: {cleanup_res.error}")
+                else:
+                    logger.info("OBS recording stopped during cleanup")
+            except Exception as cleanup_error:
+                logger.warning(f"OBS cleanup failed: {cleanup_error}")
+            raise RecordingError(f"Failed to begin recording for story {story_id}: {e}") from e
+        return f"recording started for {story_id}"
+
+    try:
+        res = obs.stop_recording()
+    except Exception as e:
+        raise RecordingError(f"OBS stop failed: {e}") from e
+    if not res.ok:
+        raise RecordingError(res.error)
+    try:
+        state.end_recording(date, story_id, assume_utc=True)
+    except Exception as e:
+        raise RecordingError(f"Failed to end recording for story {story_id}: {e}") from e
+    return f"recording stopped for {story_id}"
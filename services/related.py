@@ -14,6 +14,9 @@ from pathlib import Path
 from typing import List, Tuple, Dict, Any, Optional
 from collections import Counter
 
+from services.http_client import get_client
+from services.rate_limiter import get_rate_limiter, send_with_rate_limit
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,6 +40,8 @@ class RelatedPostsService:
         self.blogs_dir = Path("blogs")
         self.cache_dir = Path("blogs/.cache/m5")
         self.github_api_base = "https://api.github.com"
+        # Shares the GitHub budget with the event fetchers
+        self.rate_limiter = get_rate_limiter("github")
     
     def find_related_posts(
         self, 
@@ -214,67 +219,71 @@ class RelatedPostsService:
             api_url = f"{self.github_api_base}/repos/{repo}/contents/blogs"
             logger.info(f"Fetching remote posts from {api_url}")
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(api_url, headers=headers)
-                
-                if response.status_code == 404:
-                    logger.info(f"No blogs directory found in {repo}")
-                    return posts
-                elif response.status_code != 200:
-                    logger.warning(f"Failed to fetch blogs directory from {repo}: HTTP {response.status_code}")
-                    return posts
-                
-                contents = response.json()
-                
-                # Process each date directory
-                for item in contents:
-                    if item["type"] == "dir":
-                        date_str = item["name"]
-                        
-                        # Validate date format
-                        try:
-                            datetime.strptime(date_str, "%Y-%m-%d")
-                        except ValueError:
-                            logger.debug(f"Skipping non-date directory: {date_str}")
-                            continue
-                        
-                        # Look for pre-cleaned digest in this date directory
-                        digest_url = f"{api_url}/{date_str}/PRE-CLEANED-{date_str}_digest.json"
+            client = get_client(self.github_api_base)
+            response = send_with_rate_limit(
+                self.rate_limiter, lambda: client.get(api_url, headers=headers, timeout=30.0)
+            )
+            
+            if response.status_code == 404:
+                logger.info(f"No blogs directory found in {repo}")
+                return posts
+            elif response.status_code != 200:
+                logger.warning(f"Failed to fetch blogs directory from {repo}: HTTP {response.status_code}")
+                return posts
+            
+            contents = response.json()
+            
+            # Process each date directory
+            for item in contents:
+                if item["type"] == "dir":
+                    date_str = item["name"]
+                    
+                    # Validate date format
+                    try:
+                        datetime.strptime(date_str, "%Y-%m-%d")
+                    except ValueError:
+                        logger.debug(f"Skipping non-date directory: {date_str}")
+                        continue
+                    
+                    # Look for pre-cleaned digest in this date directory
+                    digest_url = f"{api_url}/{date_str}/PRE-CLEANED-{date_str}_digest.json"
+                    
+                    try:
+                        digest_response = send_with_rate_limit(
+                            self.rate_limiter, lambda: client.get(digest_url, headers=headers, timeout=30.0)
+                        )
+                        if digest_response.status_code == 200:
+                            # Parse the raw JSON content from the response
+                            try:
+                                digest = digest_response.json()
+                                
+                                # Extract post information
+                                if "frontmatter" in digest:
+                                    frontmatter = digest["frontmatter"]
+                                    post_info = {
+                                        "date": digest["date"],
+                                        "title": frontmatter.get("title", ""),
+                                        "tags": frontmatter.get("tags", []),
+                                        "description": frontmatter.get("description", ""),
+                                        "path": f"/blog/{digest['date']}",
+                                        "digest": digest  # Store full digest for image extraction
+                                    }
+                                    posts.append(post_info)
+                                    logger.info(f"Found remote post: {date_str} - {post_info['title']}")
+                                else:
+                                    logger.debug(f"Skipping digest {date_str} - not v2 or missing frontmatter")
+                            except json.JSONDecodeError as e:
+                                logger.debug(f"Failed to parse digest JSON for {date_str}: {e}")
+                                continue
+                        elif digest_response.status_code == 404:
+                            logger.debug(f"No digest found for {date_str}")
+                        else:
+                            logger.debug(f"Failed to fetch digest for {date_str}: HTTP {digest_response.status_code}")
+                                
+                    except Exception as e:
+                        logger.debug(f"Could not fetch digest for {date_str}: {e}")
+                        continue
                         
-                        try:
-                            digest_response = client.get(digest_url, headers=headers)
-                            if digest_response.status_code == 200:
-                                # Parse the raw JSON content from the response
-                                try:
-                                    digest = digest_response.json()
-                                    
-                                    # Extract post information
-                                    if "frontmatter" in digest:
-                                        frontmatter = digest["frontmatter"]
-                                        post_info = {
-                                            "date": digest["date"],
-                                            "title": frontmatter.get("title", ""),
-                                            "tags": frontmatter.get("tags", []),
-                                            "description": frontmatter.get("description", ""),
-                                            "path": f"/blog/{digest['date']}",
-                                            "digest": digest  # Store full digest for image extraction
-                                        }
-                                        posts.append(post_info)
-                                        logger.info(f"Found remote post: {date_str} - {post_info['title']}")
-                                    else:
-                                        logger.debug(f"Skipping digest {date_str} - not v2 or missing frontmatter")
-                                except json.JSONDecodeError as e:
-                                    logger.debug(f"Failed to parse digest JSON for {date_str}: {e}")
-                                    continue
-                            elif digest_response.status_code == 404:
-                                logger.debug(f"No digest found for {date_str}")
-                            else:
-                                logger.debug(f"Failed to fetch digest for {date_str}: HTTP {digest_response.status_code}")
-                                    
-                        except Exception as e:
-                            logger.debug(f"Could not fetch digest for {date_str}: {e}")
-                            continue
-                            
         except httpx.HTTPStatusError as e:
             logger.warning(f"HTTP error fetching remote posts from {repo}: {e.response.status_code}")
         except httpx.RequestError as e:
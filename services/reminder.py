@@ -1,14 +1,19 @@
 from __future__ import annotations
-import os, json
+import os, heapq, threading
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 import schedule, time
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import zoneinfo
 
+from . import serialization
 from .blog_status import BlogStatusChecker, format_daily_rollup_message, format_weekly_backlog_message, format_missing_reminder_message
+from .story_state import StoryState
 
 DATA_DIR = Path("blogs")
+REMINDER_INDEX_NAME = "reminder.index.json"
+REMINDER_INDEX_VERSION = 1
+EXPLAINER_DUE_AFTER = timedelta(hours=24)
 
 
 def _check_timezone_is_utc() -> bool:
@@ -134,42 +139,199 @@ def missing_blog_reminder() -> None:
         message = format_missing_reminder_message(yesterday)
         _post_discord(message)
 
+def _explainer_due(packet: Dict[str, Any]) -> Optional[float]:
+    """Timestamp a required, missing explainer becomes overdue, or None if it isn't pending."""
+    exp = packet.get("explainer", {})
+    req = exp.get("required", False)
+    status = exp.get("status", "missing")
+    merged_at = packet.get("merged_at")
+    if not (req and status == "missing" and merged_at):
+        return None
+    try:
+        merged_dt = datetime.fromisoformat(merged_at.replace("Z","+00:00"))
+        # Ensure merged_dt is timezone-aware and in UTC
+        if merged_dt.tzinfo is None:
+            merged_dt = merged_dt.replace(tzinfo=timezone.utc)
+        else:
+            merged_dt = merged_dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+    return (merged_dt + EXPLAINER_DUE_AFTER).timestamp()
+
+
+class ReminderIndex:
+    """
+    Incremental index of story packets still waiting for an explainer.
+
+    Remembers each PRE-CLEANED digest's mtime and size so only new or changed
+    digests are parsed, follows recording state through the story state
+    store's change feed, and keeps pending explainers in a heap by due time.
+    Each story is reminded about once. The index is persisted to
+    reminder.index.json in the data directory so restarts don't re-notify.
+    """
+
+    def __init__(self, data_dir: Path, state: Optional[StoryState] = None):
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / REMINDER_INDEX_NAME
+        self.state = state or StoryState(str(self.data_dir))
+        # digest path -> {"mtime_ns", "size", "date", "stories": [pending story IDs]}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # "date/story_id" -> {"due", "id", "title"}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._notified: set = set()
+        self._watermark = 0.0
+        self._heap: List[Tuple[float, str]] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        self._loaded = True
+        try:
+            data = serialization.load_file(self.path)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: rebuilding unreadable reminder index {self.path}: {e}")
+            return
+        if data.get("version") != REMINDER_INDEX_VERSION:
+            return
+        self._files = data.get("files", {})
+        self._pending = data.get("pending", {})
+        self._notified = set(data.get("notified", []))
+        self._watermark = data.get("watermark", 0.0)
+        self._heap = [(entry["due"], key) for key, entry in self._pending.items()]
+        heapq.heapify(self._heap)
+
+    def _save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        serialization.dump_file(tmp_path, {
+            "version": REMINDER_INDEX_VERSION,
+            "watermark": self._watermark,
+            "files": self._files,
+            "pending": self._pending,
+            "notified": sorted(self._notified),
+        }, compact=True)
+        os.replace(tmp_path, self.path)
+
+    def _forget_file(self, key: str):
+        entry = self._files.pop(key, None)
+        if entry:
+            for story_id in entry["stories"]:
+                self._pending.pop(f"{entry['date']}/{story_id}", None)
+
+    def _index_digest(self, date_str: str, digest_path: Path, stat: os.stat_result):
+        key = str(digest_path)
+        self._forget_file(key)
+        stories: List[str] = []
+        try:
+            digest = serialization.load_file(digest_path)
+            # Recording state lives in the story state store, not the digest file
+            digest = self.state.overlay(datetime.strptime(date_str, "%Y-%m-%d"), digest)
+        except Exception as e:
+            print(f"Warning: skipping digest {digest_path}: {e}")
+            digest = {}
+        for p in digest.get("story_packets", []):
+            due = _explainer_due(p)
+            story_key = f"{date_str}/{p.get('id')}"
+            if due is None or story_key in self._notified:
+                continue
+            self._pending[story_key] = {"due": due, "id": p.get("id"), "title": p.get("title_human", "Story")}
+            heapq.heappush(self._heap, (due, story_key))
+            stories.append(p.get("id"))
+        self._files[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "date": date_str, "stories": stories}
+
+    def _scan_digests(self) -> bool:
+        """Parse new or changed digests and forget deleted ones (only stats unchanged files)."""
+        changed = False
+        seen = set()
+        for day_dir in self.data_dir.iterdir():
+            if not day_dir.is_dir():
+                continue
+            # Look for PRE-CLEANED digests in the YYYY-MM-DD subdirectories
+            for digest_path in day_dir.glob("PRE-CLEANED-*digest.json"):
+                key = str(digest_path)
+                seen.add(key)
+                try:
+                    stat = digest_path.stat()
+                except FileNotFoundError:
+                    continue
+                entry = self._files.get(key)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    continue
+                self._index_digest(day_dir.name, digest_path, stat)
+                changed = True
+        for key in set(self._files) - seen:
+            self._forget_file(key)
+            changed = True
+        return changed
+
+    def _apply_state_changes(self) -> bool:
+        """Drop pending stories whose recording started since the last tick."""
+        rows = self.state.changed_since(self._watermark)
+        for row in rows:
+            self._watermark = max(self._watermark, row["updated_at"])
+            if row["explainer"].get("status", "missing") != "missing":
+                self._pending.pop(f"{row['date']}/{row['story_id']}", None)
+        return bool(rows)
+
+    def tick(self, now: Optional[datetime] = None, notify: Optional[Callable[[str], None]] = None) -> int:
+        """
+        Bring the index up to date and send reminders that have come due.
+
+        Args:
+            now: Current time (defaults to now, UTC)
+            notify: Message sender (defaults to the Discord webhook)
+
+        Returns:
+            Number of reminders sent
+        """
+        notify = notify or _post_discord
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            changed = self._scan_digests()
+            changed = self._apply_state_changes() or changed
+
+            due = []
+            while self._heap and self._heap[0][0] <= now_ts:
+                due_at, story_key = heapq.heappop(self._heap)
+                entry = self._pending.get(story_key)
+                # Heap entries are never removed in place; skip stale ones
+                if entry is None or entry["due"] != due_at:
+                    continue
+                del self._pending[story_key]
+                self._notified.add(story_key)
+                due.append(entry)
+
+            if changed or due:
+                self._save()
+
+        for entry in due:
+            notify(f"⏰ Reminder: `{entry['id']}` **{entry['title']}** still needs an explainer. Try `/record_start {entry['id']}`.")
+        return len(due)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Pending explainers, soonest due first."""
+        with self._lock:
+            return sorted(self._pending.values(), key=lambda entry: entry["due"])
+
+
+_reminder_index: Optional[ReminderIndex] = None
+
+
 def scan_and_notify() -> None:
     """Legacy story-level scanning - kept for backward compatibility."""
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-    
+    global _reminder_index
+
     # Guard against missing data directory
     if not DATA_DIR.exists():
         return
-    
-    for day_dir in DATA_DIR.iterdir():
-        if not day_dir.is_dir():
-            continue
-        # Look for PRE-CLEANED digests in the YYYY-MM-DD subdirectories
-        for digest_path in sorted(day_dir.glob("PRE-CLEANED-*digest.json")):
-            try:
-                obj = json.loads(digest_path.read_text())
-            except Exception:
-                continue
-            for p in obj.get("story_packets", []):
-                exp = p.get("explainer", {})
-                req = exp.get("required", False)
-                status = exp.get("status", "missing")
-                merged_at = p.get("merged_at")
-                if not (req and status == "missing" and merged_at):
-                    continue
-                try:
-                    merged_dt = datetime.fromisoformat(merged_at.replace("Z","+00:00"))
-                    # Ensure merged_dt is timezone-aware and in UTC
-                    if merged_dt.tzinfo is None:
-                        merged_dt = merged_dt.replace(tzinfo=timezone.utc)
-                    else:
-                        merged_dt = merged_dt.astimezone(timezone.utc)
-                except Exception:
-                    continue
-                if merged_dt < cutoff:
-                    _post_discord(f"⏰ Reminder: `{p.get('id')}` **{p.get('title_human','Story')}** still needs an explainer. Try `/record_start {p.get('id')}`.")
-                    
+
+    if _reminder_index is None or _reminder_index.data_dir != DATA_DIR:
+        _reminder_index = ReminderIndex(DATA_DIR)
+    _reminder_index.tick()
+
 def auto_generate_daily_blog():
     """Automatically generate daily blog post."""
     try:
@@ -0,0 +1,134 @@
+"""
+In-memory conditional-GET cache for blog API responses.
+
+Entries are keyed by (endpoint, date) and tagged with a fingerprint of the
+source files' sizes and mtimes, so a response is reused only while the files
+it was built from are unchanged. Each entry carries a strong ETag (a hash of
+the exact response bytes) and a Last-Modified time, and a matching
+If-None-Match is answered with 304 straight from the cache.
+
+The cache is a bounded LRU sized by BLOG_API_CACHE_SIZE (default 128).
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 128
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized response body and its validators."""
+    fingerprint: str
+    body: bytes
+    etag: str
+    last_modified: Optional[str]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against this entry's ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+def stat_fingerprint(paths: Iterable[Path]) -> Tuple[str, Optional[float]]:
+    """
+    Fingerprint files (or directories) by size and mtime without reading them.
+
+    Missing paths are part of the fingerprint, so creating one invalidates it.
+
+    Returns:
+        (fingerprint, newest mtime or None if no path exists)
+    """
+    digest = hashlib.sha256()
+    newest = None
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest.update(f"{path}:missing\n".encode("utf-8"))
+            continue
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+        newest = stat.st_mtime if newest is None else max(newest, stat.st_mtime)
+    return digest.hexdigest()[:32], newest
+
+
+class ResponseCache:
+    """Thread-safe bounded LRU of CachedResponse entries."""
+
+    def __init__(self, max_entries: Optional[int] = None, name: str = "blog_api"):
+        """
+        Args:
+            max_entries: Maximum entries kept (defaults to BLOG_API_CACHE_SIZE or 128)
+            name: Cache label for the cache_requests_total metric
+        """
+        self.name = name
+        if max_entries is None:
+            max_entries = int(os.getenv("BLOG_API_CACHE_SIZE", str(DEFAULT_CACHE_SIZE)))
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, fingerprint: str) -> Optional[CachedResponse]:
+        """Return the entry for key if it was built from the same sources."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.fingerprint != fingerprint:
+                self.misses += 1
+                metrics.record_cache(self.name, False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            metrics.record_cache(self.name, True)
+            return entry
+
+    def put(self, key: Hashable, fingerprint: str, body: bytes, last_modified: Optional[float]) -> CachedResponse:
+        """
+        Store a response body, evicting the least recently used entry if full.
+
+        Returns:
+            The new entry (also returned when caching is disabled)
+        """
+        entry = CachedResponse(
+            fingerprint=fingerprint,
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            last_modified=formatdate(last_modified, usegmt=True) if last_modified is not None else None,
+        )
+        if self.max_entries == 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,110 @@
+"""
+Central JSON serialization for digests, packages and cached data.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths share one default hook for datetimes, pydantic models
+and other non-JSON types, and produce the same text for the same data.
+
+Set JSON_COMPACT_ARTIFACTS=true to write internal artifacts (raw events,
+normalized digests, seen IDs, poll cursors) without indentation.
+"""
+
+import json
+import os
+from datetime import date, datetime, time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def default(obj: Any) -> Any:
+    """Convert objects the JSON encoders don't handle natively."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    return str(obj)
+
+
+def compact_artifacts() -> bool:
+    """Check whether internal artifacts should be written without indentation."""
+    return os.getenv("JSON_COMPACT_ARTIFACTS", "false").lower() == "true"
+
+
+def dumpb(obj: Any, compact: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: Data to serialize
+        compact: Omit indentation and whitespace (otherwise indent=2)
+        sort_keys: Sort object keys
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    return _stdlib_dumps(obj, compact, sort_keys).encode("utf-8")
+
+
+def dumps(obj: Any, compact: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to a JSON string. See dumpb for arguments."""
+    if orjson is not None:
+        return dumpb(obj, compact=compact, sort_keys=sort_keys).decode("utf-8")
+    return _stdlib_dumps(obj, compact, sort_keys)
+
+
+def _stdlib_dumps(obj: Any, compact: bool, sort_keys: bool) -> str:
+    if compact:
+        return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=sort_keys, separators=(",", ":"))
+    return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=sort_keys, indent=2)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Parse JSON text or bytes.
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON
+    """
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: Path) -> Any:
+    """Read and parse a JSON file in one pass."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_file(path: Path, obj: Any, compact: bool = False):
+    """Serialize obj to path (not atomic; use CacheManager.atomic_write_json for that)."""
+    with open(path, "wb") as f:
+        f.write(dumpb(obj, compact=compact))
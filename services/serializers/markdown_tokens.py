@@ -0,0 +1,214 @@
+"""
+Minimal markdown token stream for the API v3 formatting passes.
+
+A post is parsed once into lines of inline nodes. Fenced code, inline code
+and links from the source are opaque nodes; every other character lives in
+text nodes. Formatting passes only ever rewrite text nodes, and the nodes
+they create (links, code, emphasis, headers) are opaque too, so a later pass
+can never rewrite inside an earlier one's output. The post is rendered back
+to markdown once at the end.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Pattern, Tuple
+
+TEXT = "text"
+
+# Fenced code, then markdown links, then inline code; leftmost match wins
+_PROTECTED_PATTERN = re.compile(
+    r'(?P<fence>```[\s\S]*?```|~~~[\s\S]*?~~~)'
+    r'|(?P<link>\[[^\]]*\]\([^)]+\))'
+    r'|(?P<code>`[^`]+`)'
+)
+
+# Stands in for each character of an opaque node in a line's text view
+OPAQUE = "\ufffc"
+
+
+@dataclass(frozen=True)
+class MdNode:
+    """An inline node: 'text' is rewritable, every other kind is rendered verbatim."""
+    kind: str
+    raw: str
+
+    @property
+    def is_text(self) -> bool:
+        return self.kind == TEXT
+
+
+Line = List[MdNode]
+
+
+def parse(content: str) -> List[Line]:
+    """
+    Tokenize markdown into lines of nodes.
+
+    Escaped newlines ("\\n") in text become real newlines, runs of three or
+    more newlines collapse to a blank line, and the post is stripped. Opaque
+    nodes are left untouched, and a multi-line fenced block stays one node.
+    """
+    nodes: List[MdNode] = []
+    position = 0
+    for match in _PROTECTED_PATTERN.finditer(content):
+        if match.start() > position:
+            nodes.append(MdNode(TEXT, content[position:match.start()]))
+        nodes.append(MdNode(match.lastgroup, match.group(0)))
+        position = match.end()
+    if position < len(content):
+        nodes.append(MdNode(TEXT, content[position:]))
+
+    nodes = [
+        MdNode(TEXT, re.sub(r'\n{3,}', '\n\n', node.raw.replace('\\n', '\n'))) if node.is_text else node
+        for node in nodes
+    ]
+    if nodes and nodes[0].is_text:
+        nodes[0] = MdNode(TEXT, nodes[0].raw.lstrip())
+    if nodes and nodes[-1].is_text:
+        nodes[-1] = MdNode(TEXT, nodes[-1].raw.rstrip())
+
+    lines: List[Line] = [[]]
+    for node in nodes:
+        if not node.is_text:
+            lines[-1].append(node)
+            continue
+        parts = node.raw.split('\n')
+        for index, part in enumerate(parts):
+            if index:
+                lines.append([])
+            if part:
+                lines[-1].append(MdNode(TEXT, part))
+    return lines
+
+
+def render(lines: List[Line]) -> str:
+    """Render lines of nodes back to markdown."""
+    return '\n'.join(''.join(node.raw for node in line) for line in lines)
+
+
+def text_line(text: str, kind: str = TEXT) -> Line:
+    """A line holding a single node (empty text gives a blank line)."""
+    return [MdNode(kind, text)] if text else []
+
+
+def view(line: Line) -> str:
+    """
+    A line's text with each opaque character replaced by OPAQUE.
+
+    Offsets in the view equal offsets in the rendered line, so block-level
+    passes can regex-match the view and slice the nodes at the match.
+    """
+    return ''.join(node.raw if node.is_text else OPAQUE * len(node.raw) for node in line)
+
+
+def slice_line(line: Line, start: int, end: Optional[int] = None) -> Line:
+    """
+    Nodes covering [start, end) of a line's rendered text.
+
+    Text nodes are cut at the boundaries; opaque nodes are kept whole if
+    they start inside the range (boundaries should fall on text).
+    """
+    result: Line = []
+    offset = 0
+    for node in line:
+        node_start, node_end = offset, offset + len(node.raw)
+        offset = node_end
+        if node_end <= start or (end is not None and node_start >= end):
+            continue
+        if not node.is_text:
+            if node_start >= start:
+                result.append(node)
+            continue
+        cut = node.raw[max(start - node_start, 0):(end - node_start) if end is not None else None]
+        if cut:
+            result.append(MdNode(TEXT, cut))
+    return result
+
+
+def strip_line(line: Line) -> Line:
+    """Strip whitespace from the text at either end of a line."""
+    line = list(line)
+    if line and line[0].is_text:
+        line[0] = MdNode(TEXT, line[0].raw.lstrip())
+    if line and line[-1].is_text:
+        line[-1] = MdNode(TEXT, line[-1].raw.rstrip())
+    return [node for node in line if node.raw]
+
+
+def rewrite_text(lines: List[Line], pattern: Pattern, replace: Callable[[re.Match], Optional[MdNode]]) -> List[Line]:
+    """
+    Replace pattern matches inside text nodes with the nodes replace returns.
+
+    Args:
+        lines: Parsed lines
+        pattern: Compiled pattern to search for in text nodes
+        replace: Returns the node for a match, or None to leave it as text
+
+    Returns:
+        New lines; opaque nodes are never searched
+    """
+    result: List[Line] = []
+    for line in lines:
+        new_line: Line = []
+        for node in line:
+            if not node.is_text:
+                new_line.append(node)
+                continue
+            position = 0
+            for match in pattern.finditer(node.raw):
+                replacement = replace(match)
+                if replacement is None:
+                    continue
+                if match.start() > position:
+                    new_line.append(MdNode(TEXT, node.raw[position:match.start()]))
+                new_line.append(replacement)
+                position = match.end()
+            if position < len(node.raw):
+                new_line.append(MdNode(TEXT, node.raw[position:]))
+        result.append(new_line)
+    return result
+
+
+def split_lines(
+    lines: List[Line],
+    pattern: Pattern,
+    build: Callable[[Line, re.Match], Optional[Tuple[List[Line], Line]]],
+) -> List[Line]:
+    """
+    Restructure lines around block-level matches of pattern in their text view.
+
+    Args:
+        lines: Parsed lines
+        pattern: Compiled pattern searched in each line's view()
+        build: For a line and a match, returns (lines to emit, remainder of the
+            line to keep scanning), or None to leave the match alone
+
+    Returns:
+        New lines
+    """
+    result: List[Line] = []
+    for line in lines:
+        position = 0
+        while True:
+            match = pattern.search(view(line), position)
+            built = build(line, match) if match else None
+            if built is None:
+                if match:
+                    position = match.end()
+                    continue
+                result.append(line)
+                break
+            emitted, line = built
+            result.extend(emitted)
+            position = 0
+            if not line:
+                break
+    return result
+
+
+def terms_pattern(terms: List[str]) -> Optional[Pattern]:
+    """Case-insensitive whole-word alternation of terms, longest first."""
+    terms = sorted({term for term in terms if term}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\b', re.IGNORECASE)
@@ -0,0 +1,335 @@
+"""
+Stage graph for the daily blog pipeline.
+
+Each stage declares the stages it depends on, the files it produces and the
+modules that make up its code. A stage's fingerprint covers its inputs (the
+raw source files for root stages, dependency fingerprints otherwise) and a
+hash of that code, and is recorded in a per-day manifest when the stage
+finishes. On the next run a stage is a cache hit when its fingerprint is
+unchanged and its outputs still exist; otherwise it reruns, and so does
+everything downstream of it.
+
+Independent stages (e.g. video rendering and AI enrichment, which both only
+need the normalized digest) run concurrently when max_parallel > 1, so a run
+takes as long as its slowest branch rather than the sum of them.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services import metrics, serialization
+from services.event_log import LOG_FILES, ZSTD_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "stages.json"
+
+# Bump to invalidate every stage regardless of code changes
+PIPELINE_VERSION = "1"
+
+STAGE_SECONDS = metrics.histogram("pipeline_stage_seconds", "Pipeline stage run time", ("stage", "status"))
+STAGE_RUNS = metrics.counter("pipeline_stage_runs_total", "Pipeline stage outcomes (hit, ran, failed, skipped)",
+                             ("stage", "status"))
+
+
+@dataclass
+class Stage:
+    """One node of the stage graph."""
+    name: str
+    run: Callable[[str], Any]
+    deps: Tuple[str, ...] = ()
+    outputs: Callable[[str], List[Path]] = lambda target_date: []
+    load: Optional[Callable[[str], Any]] = None  # Returns the artifact on a cache hit
+    code: Tuple[str, ...] = ()  # Module names hashed into the code version
+
+
+@dataclass
+class StageResult:
+    """Outcome of one stage in a run."""
+    name: str
+    status: str  # 'hit', 'ran', 'failed' or 'skipped'
+    fingerprint: str = ""
+    duration_s: float = 0.0
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("hit", "ran")
+
+
+@lru_cache(maxsize=None)
+def code_version(modules: Tuple[str, ...]) -> str:
+    """Hash the source files of the given modules."""
+    digest = hashlib.sha256(PIPELINE_VERSION.encode("utf-8"))
+    for module in sorted(modules):
+        try:
+            spec = importlib.util.find_spec(module)
+        except (ImportError, ValueError):
+            spec = None
+        origin = getattr(spec, "origin", None) if spec else None
+        digest.update(module.encode("utf-8"))
+        if origin and Path(origin).is_file():
+            digest.update(Path(origin).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def source_fingerprint(date_dir: Path) -> str:
+    """
+    Fingerprint a day's fetched clips and events by file name, size and mtime.
+
+    Covers the per-day event logs and legacy one-file-per-item JSON files, so
+    a late-arriving clip or event changes the fingerprint.
+    """
+    digest = hashlib.sha256()
+    if date_dir.exists():
+        names = list(LOG_FILES.values()) + [name + ZSTD_SUFFIX for name in LOG_FILES.values()]
+        paths = [date_dir / name for name in names if (date_dir / name).exists()]
+        paths += sorted(date_dir.glob("twitch_clip_*.json")) + sorted(date_dir.glob("github_event_*.json"))
+        for path in paths:
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class StageGraph:
+    """Runs stages in dependency order, skipping those whose fingerprint is unchanged."""
+
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        manifest_dir: Callable[[str], Path],
+        sources: Callable[[str], str],
+        write_json: Optional[Callable[[Path, Dict[str, Any]], Any]] = None,
+        max_parallel: int = 1,
+    ):
+        """
+        Args:
+            stages: Stages in any order; dependencies must be present
+            manifest_dir: Maps a date to the directory holding its manifest
+            sources: Maps a date to the fingerprint of its raw inputs
+            write_json: Atomic JSON writer for the manifest (defaults to a plain write)
+            max_parallel: Stages allowed to run at once once their dependencies finish
+        """
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in stages}
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+        self.order = self._topological_order()
+        self.manifest_dir = manifest_dir
+        self.sources = sources
+        self.write_json = write_json or serialization.dump_file
+        self.max_parallel = max(1, max_parallel)
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Stage graph has a cycle through {name}")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def ancestors(self, name: str) -> List[str]:
+        """A stage and everything it depends on, in run order."""
+        needed = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current not in needed:
+                needed.add(current)
+                pending.extend(self.stages[current].deps)
+        return [stage for stage in self.order if stage in needed]
+
+    def manifest_path(self, target_date: str) -> Path:
+        return self.manifest_dir(target_date) / MANIFEST_NAME
+
+    def load_manifest(self, target_date: str) -> Dict[str, Any]:
+        """Load the per-day manifest, treating unreadable files as empty."""
+        path = self.manifest_path(target_date)
+        if not path.exists():
+            return {}
+        try:
+            return serialization.load_file(path).get("stages", {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Ignoring unreadable stage manifest %s: %s", path, e)
+            return {}
+
+    def _save_manifest(self, target_date: str, entries: Dict[str, Any]):
+        path = self.manifest_path(target_date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.write_json(path, {"date": target_date, "stages": entries})
+
+    def fingerprints(self, target_date: str) -> Dict[str, str]:
+        """Compute every stage's current fingerprint without running anything."""
+        computed: Dict[str, str] = {}
+        source_fp = None
+        for name in self.order:
+            stage = self.stages[name]
+            if stage.deps:
+                inputs = {dep: computed[dep] for dep in stage.deps}
+            else:
+                if source_fp is None:
+                    source_fp = self.sources(target_date)
+                inputs = {"sources": source_fp}
+            payload = serialization.dumpb(
+                {"stage": name, "code": code_version(stage.code), "inputs": inputs},
+                compact=True, sort_keys=True
+            )
+            computed[name] = hashlib.sha256(payload).hexdigest()[:16]
+        return computed
+
+    def is_fresh(self, name: str, target_date: str, fingerprint: str, manifest: Dict[str, Any]) -> bool:
+        """Check whether a stage's recorded run matches its fingerprint and outputs exist."""
+        entry = manifest.get(name) or {}
+        if entry.get("fingerprint") != fingerprint:
+            return False
+        return all(path.exists() for path in self.stages[name].outputs(target_date))
+
+    def adopt(self, target_date: str, names: Optional[Iterable[str]] = None):
+        """
+        Record current fingerprints for stages whose outputs already exist.
+
+        Used for artifacts produced before the manifest existed, so they are
+        not rebuilt just because they lack a recorded fingerprint.
+        """
+        fingerprints = self.fingerprints(target_date)
+        manifest = self.load_manifest(target_date)
+        for name in names or self.order:
+            if all(path.exists() for path in self.stages[name].outputs(target_date)):
+                manifest[name] = {
+                    "fingerprint": fingerprints[name],
+                    "completed_at": datetime.now().isoformat(),
+                    "adopted": True,
+                }
+        self._save_manifest(target_date, manifest)
+
+    def run(
+        self,
+        target_date: str,
+        until: Optional[str] = None,
+        force: Iterable[str] = (),
+        prior: Optional[Dict[str, StageResult]] = None,
+    ) -> Dict[str, StageResult]:
+        """
+        Run stale stages for a date in dependency order.
+
+        A stage starts as soon as all of its dependencies have finished, so
+        independent stages overlap when max_parallel > 1.
+
+        Args:
+            target_date: Date in YYYY-MM-DD format
+            until: Only run this stage and its dependencies
+            force: Stage names to rerun even if fresh (dependents follow)
+            prior: Results of an earlier run for the same date (e.g. with until);
+                those stages aren't run again, and dependents of stages that
+                ran there rerun here
+
+        Returns:
+            Stage name -> StageResult, in run order. Stages after a failure
+            are reported as 'skipped'.
+        """
+        names = self.ancestors(until) if until else list(self.order)
+        fingerprints = self.fingerprints(target_date)
+        manifest = self.load_manifest(target_date)
+        forced = set(force)
+        results: Dict[str, StageResult] = {name: result for name, result in (prior or {}).items() if name in names}
+        reused = set(results)
+        pending = [name for name in names if name not in reused]
+        running: Dict[Future, StageResult] = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="stage") \
+            if self.max_parallel > 1 else None
+        try:
+            while pending or running:
+                # Start every stage whose dependencies have all finished
+                for name in [n for n in pending if all(dep in results for dep in self.stages[n].deps)]:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    fingerprint = fingerprints[name]
+                    result = StageResult(name=name, status="ran", fingerprint=fingerprint)
+
+                    if any(not results[dep].ok for dep in stage.deps):
+                        result.status = "skipped"
+                        results[name] = result
+                        continue
+
+                    upstream_ran = any(results[dep].status == "ran" for dep in stage.deps)
+                    if name not in forced and not upstream_ran and self.is_fresh(name, target_date, fingerprint, manifest):
+                        result.status = "hit"
+                        if stage.load is not None:
+                            result.value = stage.load(target_date)
+                        logger.info("Stage %s for %s: cache hit", name, target_date)
+                        results[name] = result
+                        continue
+
+                    if executor is None:
+                        self._execute(stage, target_date, result)
+                        self._record(target_date, manifest, result)
+                        results[name] = result
+                    else:
+                        running[executor.submit(self._execute, stage, target_date, result)] = result
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = running.pop(future)
+                    self._record(target_date, manifest, result)
+                    results[result.name] = result
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        for result in results.values():
+            if result.name in reused:
+                continue
+            STAGE_RUNS.inc(stage=result.name, status=result.status)
+            if result.status in ("ran", "failed"):
+                STAGE_SECONDS.observe(result.duration_s, stage=result.name, status=result.status)
+            if result.status != "skipped":
+                metrics.record_cache("stage_graph", result.status == "hit")
+        return {name: results[name] for name in names}
+
+    def _execute(self, stage: Stage, target_date: str, result: StageResult):
+        """Run one stage, recording its value or failure on the result."""
+        start = time.perf_counter()
+        try:
+            result.value = stage.run(target_date)
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+            logger.exception("Stage %s failed for %s", stage.name, target_date)
+        finally:
+            result.duration_s = time.perf_counter() - start
+
+    def _record(self, target_date: str, manifest: Dict[str, Any], result: StageResult):
+        """Persist a finished stage's fingerprint (coordinator thread only)."""
+        if result.status != "ran":
+            return
+        manifest[result.name] = {
+            "fingerprint": result.fingerprint,
+            "completed_at": datetime.now().isoformat(),
+            "duration_s": round(result.duration_s, 3),
+        }
+        self._save_manifest(target_date, manifest)
+        logger.info("Stage %s for %s: ran in %.2fs", result.name, target_date, result.duration_s)
@@ -1,18 +1,108 @@
+"""
+Recording state for story packets.
+
+Explainer and video state used to be written into the PRE-CLEANED digest:
+every update globbed for the digest, loaded it, changed one packet and
+rewrote the whole file, and concurrent webhook and bot updates could
+overwrite each other. State now lives in a SQLite table next to the digests
+(story_state.sqlite3), one row per (date, story). Updates are single-row
+transactions, so simultaneous recordings don't lose writes, and every reader
+of a digest (the bot, reminders, the blog builder and API, the renderer)
+overlays the rows onto its packets with StoryState.overlay or overlay_digest.
+
+The renderer still records rendered videos in the digest file itself; once a
+packet's video is rendered, the file's video section wins over the row.
+"""
+
 from __future__ import annotations
-import json, os
+import copy
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from services import serialization
+
+DB_NAME = "story_state.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS story_state (
+    date TEXT NOT NULL,
+    story_id TEXT NOT NULL,
+    explainer TEXT NOT NULL DEFAULT '{}',
+    video TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (date, story_id)
+);
+CREATE INDEX IF NOT EXISTS story_state_updated ON story_state (updated_at);
+"""
+
+# Databases whose schema has been created in this process
+_initialized: set = set()
+# Digest path -> ((mtime_ns, size), packets by story ID)
+_packet_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+
+def _merge_packet(packet: Dict[str, Any], explainer: Dict[str, Any], video: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay stored state onto a digest packet (returns a new packet)."""
+    merged = copy.deepcopy(packet)
+    if explainer:
+        merged["explainer"] = {**(merged.get("explainer") or {}), **explainer}
+    file_video = merged.get("video") or {}
+    if video and file_video.get("status") != "rendered":
+        merged["video"] = {**file_video, **video}
+    return merged
+
+
+def overlay_digest(data_dir: Path, date_str: str, digest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge stored recording state into a digest read straight from disk.
+
+    Args:
+        data_dir: Directory holding the per-date digests and story_state.sqlite3
+        date_str: Digest date in YYYY-MM-DD format
+        digest: Loaded digest (its packets are replaced)
+
+    Returns:
+        The same digest
+    """
+    if not digest.get("story_packets"):
+        return digest
+    return StoryState(str(data_dir)).overlay(datetime.strptime(date_str, "%Y-%m-%d"), digest)
+
 
 class StoryState:
     """
-    Mutates v2 digest: story_packets[*].explainer.status & video placeholders.
+    Tracks story_packets[*].explainer.status & video placeholders per story.
     """
 
     def __init__(self, data_dir: str = "blogs") -> None:
         self.data_dir = Path(data_dir)
+        self.db_path = self.data_dir / DB_NAME
 
-    def _load_digest(self, date: datetime) -> tuple[Dict[str, Any], Path]:
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation keeps the store safe to share across threads and processes
+        key = str(self.db_path.resolve())
+        if key not in _initialized:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            if key not in _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                with _lock:
+                    _initialized.add(key)
+            yield conn
+        finally:
+            conn.close()
+
+    def _digest_path(self, date: datetime) -> Path:
         # Convert datetime to YYYY-MM-DD format for file paths
         date_str = date.strftime("%Y-%m-%d")
         # Locate PRE-CLEANED digest for date
@@ -20,24 +110,138 @@ class StoryState:
         candidates = sorted(dir_path.glob("PRE-CLEANED-*digest.json"))
         if not candidates:
             raise FileNotFoundError(f"No digest found for {date_str}")
-        file_path = candidates[-1]
-        with open(file_path, "r") as f:
-            return json.load(f), file_path
+        return candidates[-1]
+
+    def _load_digest(self, date: datetime) -> tuple[Dict[str, Any], Path]:
+        file_path = self._digest_path(date)
+        return serialization.load_file(file_path), file_path
 
     def load_digest(self, date: datetime) -> tuple[Dict[str, Any], Path]:
-        """Public method to load a digest for read-only access."""
-        return self._load_digest(date)
+        """Load a digest for read-only access, with stored recording state merged in."""
+        digest, file_path = self._load_digest(date)
+        return self.overlay(date, digest), file_path
 
-    def _save_digest(self, date: datetime, digest: Dict[str, Any], file_path: Path) -> None:
-        # Convert datetime to YYYY-MM-DD format for file paths
+    def overlay(self, date: datetime, digest: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge stored recording state into a digest's story packets.
+
+        Args:
+            date: Digest date
+            digest: Digest loaded from disk (its packets are replaced)
+
+        Returns:
+            The same digest
+        """
+        rows = self._rows(date.strftime("%Y-%m-%d"))
+        if rows:
+            digest["story_packets"] = [
+                _merge_packet(p, *rows[p["id"]]) if p.get("id") in rows else p
+                for p in digest.get("story_packets", [])
+            ]
+        return digest
+
+    def _rows(self, date_str: str) -> Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]]:
+        if not self.db_path.exists():
+            return {}
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT story_id, explainer, video FROM story_state WHERE date = ?", (date_str,)
+            ).fetchall()
+        return {
+            row["story_id"]: (serialization.loads(row["explainer"]), serialization.loads(row["video"]))
+            for row in rows
+        }
+
+    def changed_since(self, since: float) -> List[Dict[str, Any]]:
+        """
+        Rows updated after a timestamp, oldest first.
+
+        Args:
+            since: Unix timestamp (exclusive)
+
+        Returns:
+            Dicts with date, story_id, explainer, video and updated_at
+        """
+        if not self.db_path.exists():
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM story_state WHERE updated_at > ? ORDER BY updated_at", (since,)
+            ).fetchall()
+        return [
+            {**dict(row), "explainer": serialization.loads(row["explainer"]), "video": serialization.loads(row["video"])}
+            for row in rows
+        ]
+
+    def _packet(self, date: datetime, story_id: str) -> Dict[str, Any]:
+        """Digest packet for a story, re-reading the digest only when it changed on disk."""
+        file_path = self._digest_path(date)
+        stat = file_path.stat()
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        cached = _packet_cache.get(file_path)
+        if cached is None or cached[0] != stat_key:
+            digest = serialization.load_file(file_path)
+            packets = {p.get("id"): p for p in digest.get("story_packets", [])}
+            with _lock:
+                _packet_cache[file_path] = (stat_key, packets)
+        else:
+            packets = cached[1]
+        packet = packets.get(story_id)
+        if packet is None:
+            raise KeyError(f"Story {story_id} not found")
+        return packet
+
+    def _update(
+        self,
+        date: datetime,
+        story_id: str,
+        explainer: Dict[str, Any],
+        video: Optional[Dict[str, Any]] = None,
+        video_from_explainer: Tuple[str, ...] = (),
+    ) -> Dict[str, Any]:
+        """
+        Apply explainer/video field updates to one story's row.
+
+        Args:
+            date: Normalized story date
+            story_id: Identifier for the story
+            explainer: Explainer fields to set
+            video: Video fields to set
+            video_from_explainer: Video fields copied from the merged explainer
+                (read inside the same transaction)
+
+        Returns:
+            Updated story packet (digest packet with stored state merged in)
+        """
+        packet = self._packet(date, story_id)
         date_str = date.strftime("%Y-%m-%d")
-        dir_path = self.data_dir / date_str
-        dir_path.mkdir(parents=True, exist_ok=True)
-        # Write atomically to avoid partial/corrupt JSON on crash
-        temp_path = file_path.with_suffix('.tmp')
-        with open(temp_path, "w") as f:
-            json.dump(digest, f, indent=2)
-        temp_path.replace(file_path)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT explainer, video FROM story_state WHERE date = ? AND story_id = ?",
+                    (date_str, story_id),
+                ).fetchone()
+                stored_explainer = serialization.loads(row["explainer"]) if row else {}
+                stored_video = serialization.loads(row["video"]) if row else {}
+                stored_explainer.update(explainer)
+                stored_video.update(video or {})
+                if video_from_explainer:
+                    merged_explainer = {**(packet.get("explainer") or {}), **stored_explainer}
+                    for field in video_from_explainer:
+                        stored_video[field] = merged_explainer.get(field)
+                conn.execute(
+                    "INSERT INTO story_state (date, story_id, explainer, video, updated_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (date, story_id) DO UPDATE SET"
+                    " explainer = excluded.explainer, video = excluded.video, updated_at = excluded.updated_at",
+                    (date_str, story_id, serialization.dumps(stored_explainer),
+                     serialization.dumps(stored_video), time.time()),
+                )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return _merge_packet(packet, stored_explainer, stored_video)
 
     def _normalize_date(self, date: datetime, assume_utc: bool = False) -> datetime:
         """
@@ -84,16 +288,9 @@ class StoryState:
         """
         # Normalize date to UTC first
         normalized_date = self._normalize_date(date, assume_utc)
-        digest, file_path = self._load_digest(normalized_date)
-        packet = self._find_story(digest, story_id)
         # Use current UTC time for started_at, not the story date
         now = datetime.now(timezone.utc).isoformat()
-        # Ensure explainer dict exists
-        packet.setdefault("explainer", {})
-        packet["explainer"]["status"] = "recording"
-        packet["explainer"]["started_at"] = now
-        self._save_digest(normalized_date, digest, file_path)
-        return packet
+        return self._update(normalized_date, story_id, {"status": "recording", "started_at": now})
 
     def end_recording(self, date: datetime, story_id: str, raw_path: Optional[str]=None, assume_utc: bool = False) -> Dict[str, Any]:
         """
@@ -114,21 +311,12 @@ class StoryState:
         """
         # Normalize date to UTC first
         normalized_date = self._normalize_date(date, assume_utc)
-        digest, file_path = self._load_digest(normalized_date)
-        packet = self._find_story(digest, story_id)
         # Use current UTC time for completed_at, not the story date
         now = datetime.now(timezone.utc).isoformat()
-        # Ensure explainer dict exists
-        packet.setdefault("explainer", {})
-        packet["explainer"]["status"] = "recorded"
-        packet["explainer"]["completed_at"] = now
-        # Ensure video dict exists
-        packet.setdefault("video", {})
-        packet["video"]["status"] = "pending"
+        video = {"status": "pending"}
         if raw_path:
-            packet["video"]["raw_recording_path"] = raw_path
-        self._save_digest(normalized_date, digest, file_path)
-        return packet
+            video["raw_recording_path"] = raw_path
+        return self._update(normalized_date, story_id, {"status": "recorded", "completed_at": now}, video)
 
     def complete_bounded_recording(self, date: datetime, story_id: str, duration: int, assume_utc: bool = False) -> Dict[str, Any]:
         """
@@ -153,48 +341,25 @@ class StoryState:
         
         # Normalize date to UTC first
         normalized_date = self._normalize_date(date, assume_utc)
-        digest, file_path = self._load_digest(normalized_date)
-        packet = self._find_story(digest, story_id)
         
         # Use current UTC time for ended_at
         now = datetime.now(timezone.utc).isoformat()
         
-        # Ensure explainer dict exists and update status
-        packet.setdefault("explainer", {})
-        packet["explainer"]["status"] = "recorded"
-        packet["explainer"]["completed_at"] = now
-        
-        # Ensure video dict exists and update status
-        packet.setdefault("video", {})
-        packet["video"]["status"] = "recorded"
-        packet["video"]["duration_s"] = duration
-        packet["video"]["started_at"] = packet["explainer"].get("started_at")
-        packet["video"]["ended_at"] = now
-        
-        self._save_digest(normalized_date, digest, file_path)
-        return packet
+        return self._update(
+            normalized_date,
+            story_id,
+            {"status": "recorded", "completed_at": now},
+            {"status": "recorded", "duration_s": duration, "ended_at": now},
+            video_from_explainer=("started_at",),
+        )
 
     def fail_recording(self, date: datetime, story_id: str, reason: str | None = None, assume_utc: bool = False) -> Dict[str, Any]:
         """
         Mark a recording as failed without flipping to recorded/completed.
         """
         normalized_date = self._normalize_date(date, assume_utc)
-        digest, file_path = self._load_digest(normalized_date)
-        packet = self._find_story(digest, story_id)
         now = datetime.now(timezone.utc).isoformat()
-        packet.setdefault("explainer", {})
-        packet["explainer"]["status"] = "failed"
-        packet["explainer"]["failed_at"] = now
+        explainer = {"status": "failed", "failed_at": now}
         if reason:
-            packet["explainer"]["failure_reason"] = reason
-        packet.setdefault("video", {})
-        packet["video"]["status"] = "failed"
-        self._save_digest(normalized_date, digest, file_path)
-        return packet
-
-    @staticmethod
-    def _find_story(digest: Dict[str, Any], story_id: str) -> Dict[str, Any]:
-        for p in digest.get("story_packets", []):
-            if p.get("id") == story_id:
-                return p
-        raise KeyError(f"Story {story_id} not found")
+            explainer["failure_reason"] = reason
+        return self._update(normalized_date, story_id, explainer, {"status": "failed"})
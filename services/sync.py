@@ -0,0 +1,181 @@
+"""
+Concurrent multi-source sync for Twitch broadcasters and GitHub users/repos.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from services.utils import CacheManager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncSource:
+    """A single source to sync: a Twitch broadcaster, GitHub user or GitHub repo."""
+    kind: str  # 'twitch', 'github_user' or 'github_repo'
+    name: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}:{self.name}"
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing one source."""
+    source: SyncSource
+    fetched: int = 0
+    saved: int = 0
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class SyncConfig:
+    """Sources to sync in one run."""
+    broadcasters: List[str] = field(default_factory=list)
+    github_users: List[str] = field(default_factory=list)
+    github_repos: List[str] = field(default_factory=list)
+
+    def sources(self) -> List[SyncSource]:
+        """Expand the config into de-duplicated sources, preserving order."""
+        sources = []
+        seen = set()
+        for kind, names in (
+            ("twitch", self.broadcasters),
+            ("github_user", self.github_users),
+            ("github_repo", self.github_repos),
+        ):
+            for name in names:
+                name = name.strip()
+                if name and (kind, name) not in seen:
+                    seen.add((kind, name))
+                    sources.append(SyncSource(kind, name))
+        return sources
+
+
+def _split_env(*names: str) -> List[str]:
+    """Read the first set environment variable as a comma-separated list."""
+    for name in names:
+        value = os.getenv(name)
+        if value:
+            return [item.strip() for item in value.split(",") if item.strip()]
+    return []
+
+
+def load_sync_config(
+    broadcasters: Optional[List[str]] = None,
+    github_users: Optional[List[str]] = None,
+    github_repos: Optional[List[str]] = None,
+) -> SyncConfig:
+    """
+    Build a sync config from explicit values, falling back to the environment.
+
+    TWITCH_BROADCASTERS, GITHUB_USERS and GITHUB_REPOS take comma-separated
+    lists; the single-value TWITCH_BROADCASTER_ID, GITHUB_USER and GITHUB_REPO
+    are used when the list variables are not set.
+    """
+    return SyncConfig(
+        broadcasters=list(broadcasters or []) or _split_env("TWITCH_BROADCASTERS", "TWITCH_BROADCASTER_ID"),
+        github_users=list(github_users or []) or _split_env("GITHUB_USERS", "GITHUB_USER"),
+        github_repos=list(github_repos or []) or _split_env("GITHUB_REPOS", "GITHUB_REPO"),
+    )
+
+
+def _sync_twitch(source: SyncSource, cache_manager: CacheManager, result: SyncResult):
+    """Fetch and process clips for one broadcaster."""
+    from services.twitch import TwitchService
+
+    service = TwitchService()
+    service.cache_manager = cache_manager
+
+    if source.name.isdigit():
+        clips = service.fetch_clips_by_broadcaster_id(source.name)
+    else:
+        clips = service.fetch_clips_by_username(source.name)
+
+    result.fetched = len(clips)
+    for clip in clips:
+        if service.process_clip(clip):
+            result.saved += 1
+
+
+def _sync_github(source: SyncSource, cache_manager: CacheManager, result: SyncResult):
+    """Fetch and save events for one GitHub user or repository."""
+    from services.github import GitHubService
+
+    service = GitHubService()
+    service.cache_manager = cache_manager
+
+    if source.kind == "github_user":
+        events = service.fetch_user_activity(source.name)
+    else:
+        events = service.fetch_repo_activity(source.name)
+
+    result.fetched = len(events)
+    result.saved = service.save_events(events)
+
+
+def sync_source(source: SyncSource, cache_manager: CacheManager) -> SyncResult:
+    """
+    Sync one source, capturing failures so other sources are unaffected.
+
+    Args:
+        source: Source to sync
+        cache_manager: Cache shared across sources for seen-ID bookkeeping
+
+    Returns:
+        SyncResult with counts, timing and any error message
+    """
+    result = SyncResult(source=source)
+    start = time.perf_counter()
+    try:
+        if source.kind == "twitch":
+            _sync_twitch(source, cache_manager, result)
+        elif source.kind in ("github_user", "github_repo"):
+            _sync_github(source, cache_manager, result)
+        else:
+            raise ValueError(f"Unknown source kind: {source.kind}")
+    except Exception as e:
+        logger.exception("Sync failed for %s", source.label)
+        result.error = str(e)
+    finally:
+        result.duration_s = time.perf_counter() - start
+
+    logger.info("Synced %s: %d fetched, %d saved in %.2fs%s",
+                source.label, result.fetched, result.saved, result.duration_s,
+                f" (error: {result.error})" if result.error else "")
+    return result
+
+
+def sync_sources(sources: List[SyncSource], max_workers: int = 4) -> List[SyncResult]:
+    """
+    Sync several sources concurrently.
+
+    Each source runs in its own worker with its own service instances; only
+    the seen-ID cache is shared. Total time tracks the slowest source rather
+    than the sum of all of them.
+
+    Args:
+        sources: Sources to sync
+        max_workers: Maximum number of sources synced at once
+
+    Returns:
+        One SyncResult per source, in input order
+    """
+    if not sources:
+        return []
+
+    cache_manager = CacheManager()
+    workers = max(1, min(max_workers, len(sources)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync") as executor:
+        return list(executor.map(lambda source: sync_source(source, cache_manager), sources))
@@ -3,19 +3,91 @@ Transcription service using ffmpeg, yt-dlp, and Cloudflare Workers AI Whisper AP
 """
 
 import os
+import math
 import subprocess
 import tempfile
 import logging
+import warnings
+import wave
+from array import array
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import httpx
 import yt_dlp
 from httpx import Timeout
 
+from services.http_client import get_client
 from services.utils import CacheManager
 
+try:
+    with warnings.catch_warnings():
+        # Deprecated in 3.11 and removed in 3.13 (the audioop-lts package restores it)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:  # pragma: no cover
+    audioop = None
+
 logger = logging.getLogger(__name__)
 
+# Voice-activity pre-pass tuning (frames are analysed on the 16 kHz mono PCM from extract_audio)
+VAD_FRAME_MS = 30
+VAD_DEFAULT_THRESHOLD_DB = -40.0
+VAD_DEFAULT_PADDING_MS = 200
+VAD_DEFAULT_MIN_SILENCE_MS = 500
+
+
+def detect_speech_segments(
+    samples: array,
+    sample_rate: int,
+    threshold_db: float = VAD_DEFAULT_THRESHOLD_DB,
+    padding_ms: int = VAD_DEFAULT_PADDING_MS,
+    min_silence_ms: int = VAD_DEFAULT_MIN_SILENCE_MS,
+) -> List[tuple[int, int]]:
+    """
+    Find speech regions in 16-bit PCM samples using frame energy.
+    
+    Args:
+        samples: Signed 16-bit mono samples
+        sample_rate: Sample rate in Hz
+        threshold_db: Frame RMS level (dBFS) above which a frame counts as speech
+        padding_ms: Audio kept on either side of each speech region
+        min_silence_ms: Shorter gaps between speech regions are kept intact
+        
+    Returns:
+        Sorted, non-overlapping (start_sample, end_sample) ranges
+    """
+    total = len(samples)
+    frame_len = max(1, sample_rate * VAD_FRAME_MS // 1000)
+    threshold_rms = 32768.0 * 10 ** (threshold_db / 20.0)
+    # audioop computes each frame's RMS in C straight from the PCM buffer
+    width = samples.itemsize
+    pcm = memoryview(samples).cast("B") if audioop is not None else None
+    
+    voiced = []
+    for start in range(0, total, frame_len):
+        if pcm is not None:
+            rms = audioop.rms(pcm[start * width:(start + frame_len) * width], width)
+        else:
+            frame = samples[start:start + frame_len]
+            rms = math.sqrt(sum(x * x for x in frame) / len(frame))
+        if rms >= threshold_rms:
+            end = min(start + frame_len, total)
+            if voiced and start - voiced[-1][1] < sample_rate * min_silence_ms // 1000:
+                voiced[-1] = (voiced[-1][0], end)
+            else:
+                voiced.append((start, end))
+    
+    # Pad each region and merge any that now overlap
+    pad = sample_rate * padding_ms // 1000
+    segments: List[tuple[int, int]] = []
+    for start, end in voiced:
+        start, end = max(0, start - pad), min(total, end + pad)
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], max(end, segments[-1][1]))
+        else:
+            segments.append((start, end))
+    return segments
+
 
 class TranscriptionService:
     """Handles video to audio conversion and transcription."""
@@ -27,6 +99,25 @@ class TranscriptionService:
         
         if not self.cloudflare_account_id or not self.cloudflare_api_token:
             raise ValueError("Cloudflare credentials not configured")
+        
+        # Optional silence trimming before upload to Whisper
+        self.vad_enabled = os.getenv("TRANSCRIBE_VAD_ENABLED", "false").lower() == "true"
+        self.vad_threshold_db = self._float_env("TRANSCRIBE_VAD_THRESHOLD_DB", VAD_DEFAULT_THRESHOLD_DB)
+        self.vad_padding_ms = int(self._float_env("TRANSCRIBE_VAD_PADDING_MS", VAD_DEFAULT_PADDING_MS))
+        self.vad_min_silence_ms = int(self._float_env("TRANSCRIBE_VAD_MIN_SILENCE_MS", VAD_DEFAULT_MIN_SILENCE_MS))
+    
+    @staticmethod
+    def _float_env(name: str, default: float) -> float:
+        """Read a numeric environment variable, falling back to default on bad input."""
+        value = os.getenv(name)
+        if value is None:
+            return default
+        try:
+            parsed = float(value)
+        except ValueError:
+            logger.warning("Invalid %s value %r, using default %s", name, value, default)
+            return default
+        return parsed if math.isfinite(parsed) else default
     
     def extract_audio(self, video_path: Path, output_path: Optional[Path] = None) -> Path:
         """Extract audio from video using ffmpeg."""
@@ -73,8 +164,8 @@ class TranscriptionService:
         try:
             with open(audio_path, 'rb') as f:  # keep handle for streaming
                 timeout = Timeout(connect=10.0, read=60.0, write=None, pool=None)
-                with httpx.Client(timeout=timeout) as client:
-                    response = client.post(url, headers=headers, content=f)
+                client = get_client(url)
+                response = client.post(url, headers=headers, content=f, timeout=timeout)
                 
                 # Handle non-2xx status codes and surface 429 retry hints
                 if response.status_code == 429:
@@ -96,6 +187,81 @@ class TranscriptionService:
         except Exception as e:
             raise RuntimeError(f"Transcription error: {e}")
     
+    def trim_silence(self, audio_path: Path, output_path: Optional[Path] = None) -> Path:
+        """
+        Drop non-speech regions from a 16-bit PCM WAV file.
+        
+        Whisper returns plain text without timestamps, so the trimmed audio
+        doesn't need mapping back to the original timeline.
+        
+        Args:
+            audio_path: WAV file produced by extract_audio
+            output_path: Where to write the trimmed audio (defaults to a sibling file)
+            
+        Returns:
+            Trimmed audio path, or the original path when nothing can be trimmed
+        """
+        try:
+            with wave.open(str(audio_path), 'rb') as wav:
+                params = wav.getparams()
+                raw = wav.readframes(params.nframes)
+        except (wave.Error, EOFError) as e:
+            raise RuntimeError(f"Cannot read audio for silence trimming: {e}")
+        
+        if params.sampwidth != 2 or params.nchannels != 1:
+            logger.warning("Skipping silence trimming for %s: expected 16-bit mono PCM", audio_path)
+            return audio_path
+        
+        samples = array('h')
+        samples.frombytes(raw)
+        segments = detect_speech_segments(
+            samples,
+            params.framerate,
+            threshold_db=self.vad_threshold_db,
+            padding_ms=self.vad_padding_ms,
+            min_silence_ms=self.vad_min_silence_ms,
+        )
+        
+        kept = sum(end - start for start, end in segments)
+        if not segments or kept >= len(samples):
+            # No speech detected or no silence to drop - send the audio as-is
+            return audio_path
+        
+        if output_path is None:
+            output_path = audio_path.with_name(f"{audio_path.stem}_trimmed.wav")
+        
+        trimmed = array('h')
+        for start, end in segments:
+            trimmed.extend(samples[start:end])
+        
+        with wave.open(str(output_path), 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(params.framerate)
+            out.writeframes(trimmed.tobytes())
+        
+        logger.info("Trimmed silence from %s: %.1fs -> %.1fs (%d segments)",
+                    audio_path.name, len(samples) / params.framerate,
+                    kept / params.framerate, len(segments))
+        return output_path
+    
+    def _transcribe_speech(self, audio_path: Path) -> str:
+        """Transcribe audio, applying the silence-trimming pre-pass when enabled."""
+        if not self.vad_enabled:
+            return self.transcribe_audio(audio_path)
+        
+        try:
+            speech_path = self.trim_silence(audio_path)
+        except RuntimeError as e:
+            logger.warning("Silence trimming failed, transcribing full audio: %s", e)
+            return self.transcribe_audio(audio_path)
+        
+        try:
+            return self.transcribe_audio(speech_path)
+        finally:
+            if speech_path != audio_path and speech_path.exists():
+                speech_path.unlink()
+    
     def transcribe_video(self, video_path: Path) -> tuple[str, Path]:
         """Extract audio from video and transcribe it."""
         # Extract audio
@@ -103,7 +269,7 @@ class TranscriptionService:
         
         try:
             # Transcribe audio
-            transcript = self.transcribe_audio(audio_path)
+            transcript = self._transcribe_speech(audio_path)
             return transcript, audio_path
         finally:
             # Clean up temporary audio file
@@ -125,7 +291,7 @@ class TranscriptionService:
             audio_path = self.extract_audio(video_path)
             
             # Transcribe
-            transcript = self.transcribe_audio(audio_path)
+            transcript = self._transcribe_speech(audio_path)
             
             return transcript, video_path, audio_path
             
@@ -223,38 +389,38 @@ class TranscriptionService:
         """Download video using httpx (for non-Twitch URLs)."""
         try:
             timeout = Timeout(connect=10.0, read=30.0, write=None, pool=None)
-            with httpx.Client(timeout=timeout) as client:
-                with client.stream('GET', url) as response:
-                    
-                    # Handle non-2xx status codes and surface 429 retry hints
-                    if response.status_code == 429:
-                        logger.error("Download API rate limit exceeded. Consider reducing request frequency.")
-                        response.raise_for_status()
-                    elif response.status_code >= 400:
-                        logger.error("Download API HTTP %d error: %s", response.status_code, response.text)
-                        response.raise_for_status()
-                    
-                    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
-                    try:
-                        with open(tmp_path, 'wb') as f:
-                            for chunk in response.iter_bytes(chunk_size=8192):
-                                f.write(chunk)
-                            f.flush()
-                            try:
-                                os.fsync(f.fileno())
-                            except (OSError, TypeError):
-                                # Skip fsync if not supported or in test environment
-                                pass
-                        os.replace(tmp_path, output_path)
-                    except Exception:
-                        # Best-effort cleanup; ignore if it doesn't exist
+            client = get_client(url)
+            with client.stream('GET', url, timeout=timeout) as response:
+                
+                # Handle non-2xx status codes and surface 429 retry hints
+                if response.status_code == 429:
+                    logger.error("Download API rate limit exceeded. Consider reducing request frequency.")
+                    response.raise_for_status()
+                elif response.status_code >= 400:
+                    logger.error("Download API HTTP %d error: %s", response.status_code, response.text)
+                    response.raise_for_status()
+                
+                tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_bytes(chunk_size=8192):
+                            f.write(chunk)
+                        f.flush()
                         try:
-                            if tmp_path.exists():
-                                tmp_path.unlink()
-                        except OSError:
+                            os.fsync(f.fileno())
+                        except (OSError, TypeError):
+                            # Skip fsync if not supported or in test environment
                             pass
-                        raise
-                            
+                    os.replace(tmp_path, output_path)
+                except Exception:
+                    # Best-effort cleanup; ignore if it doesn't exist
+                    try:
+                        if tmp_path.exists():
+                            tmp_path.unlink()
+                    except OSError:
+                        pass
+                    raise
+                        
         except httpx.HTTPError as e:
             raise RuntimeError(f"httpx download failed: {e}") from e
         except OSError as e:
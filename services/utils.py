@@ -2,21 +2,87 @@
 Utility functions for caching, deduplication, and file management.
 """
 
-import json
 import os
 import shutil
 import tempfile
 import logging
 import errno
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import hashlib
 
-from models import SeenIds, CacheEntry
+from models import SeenIds, CacheEntry, PollCursor
+from services import serialization
+from services.event_log import EventLog
 
 logger = logging.getLogger(__name__)
 
+# Mode for new files, as open() would create them; reading the umask means setting it, so do it once
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+DEFAULT_FILE_MODE = 0o666 & ~_UMASK
+
+
+class _WriteBatch:
+    """Writes staged by CacheManager.batch() and made durable together at commit."""
+    
+    def __init__(self):
+        self.renames: Dict[Path, Path] = {}  # final path -> staged temp file
+        self.flush_paths: List[Path] = []  # files written in place (event logs)
+        self.cleanup: List[Path] = []  # source files to remove once committed
+        self.dirs = set()
+        self.seen_ids_dirty = False
+        self.seen_added: Dict[str, List[str]] = {}  # item type -> IDs this batch added to seen_ids
+        self.cursors: Dict[str, PollCursor] = {}  # merged into the cursor file at commit
+    
+    def commit(self):
+        """Flush staged files, rename them into place, then fsync each directory once."""
+        _flush_files(list(self.renames.values()) + self.flush_paths)
+        for final_path, tmp_path in self.renames.items():
+            os.replace(tmp_path, final_path)
+            self.dirs.add(final_path.parent)
+        for path in self.flush_paths:
+            self.dirs.add(path.parent)
+        for directory in self.dirs:
+            _fsync_dir(directory)
+        for path in self.cleanup:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def rollback(self):
+        """Discard staged temp files."""
+        for tmp_path in self.renames.values():
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _flush_files(paths: List[Path]):
+    """Flush each staged file's data to disk (one fsync per file)."""
+    for path in paths:
+        with open(path, "rb", buffering=0) as f:
+            os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: Path):
+    """Persist directory entries (renames, new files); a no-op where unsupported."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class CacheManager:
     """Manages caching and deduplication of fetched data."""
@@ -25,6 +91,11 @@ class CacheManager:
         self.data_dir = Path("data")
         self.cache_dir = Path.home() / ".cache" / "my-activity"
         self.seen_ids_file = self.data_dir / "seen_ids.json"
+        self.poll_cursors_file = self.cache_dir / "poll_cursors.json"
+        # Guards seen-ID and cursor files when one manager is shared across threads
+        self._lock = threading.RLock()
+        # Write batches are per thread, so concurrent sync workers commit independently
+        self._local = threading.local()
         
         # Ensure directories exist
         self.data_dir.mkdir(exist_ok=True)
@@ -37,19 +108,116 @@ class CacheManager:
         """Load seen IDs from file or create new."""
         if self.seen_ids_file.exists():
             try:
-                with open(self.seen_ids_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return SeenIds(**data)
+                return SeenIds(**serialization.load_file(self.seen_ids_file))
             except Exception:
                 pass
         
         return SeenIds()
     
     def _save_seen_ids(self):
-        """Save seen IDs to file."""
+        """Save seen IDs to file (deferred to commit inside a write batch)."""
         self.seen_ids.last_updated = datetime.now()
+        write_batch = self._active_batch()
+        if write_batch is not None:
+            write_batch.seen_ids_dirty = True
+            return
         with open(self.seen_ids_file, 'w', encoding='utf-8') as f:
-            f.write(self.seen_ids.model_dump_json(indent=2))
+            f.write(self.seen_ids.model_dump_json(indent=None if serialization.compact_artifacts() else 2))
+    
+    def _active_batch(self) -> Optional[_WriteBatch]:
+        return getattr(self._local, "batch", None)
+    
+    @contextmanager
+    def batch(self, strict: Optional[bool] = None) -> Iterator["CacheManager"]:
+        """
+        Group-commit JSON writes, persisted files, event log appends and seen IDs.
+        
+        Inside the block writes go to temp files without fsync. On exit the data
+        is flushed once, temp files are renamed into place and each touched
+        directory is fsynced once. If the block raises, staged writes are
+        discarded and the IDs this batch marked seen are unmarked again.
+        Nested batches join the outermost one.
+        
+        Args:
+            strict: Keep per-file fsync (no batching). Defaults to
+                CACHE_FSYNC_MODE=strict in the environment.
+        """
+        if strict is None:
+            strict = os.getenv("CACHE_FSYNC_MODE", "batch").lower() == "strict"
+        if strict or self._active_batch() is not None:
+            yield self
+            return
+        
+        write_batch = _WriteBatch()
+        self._local.batch = write_batch
+        try:
+            yield self
+        except BaseException:
+            self._local.batch = None
+            write_batch.rollback()
+            self._forget_seen(write_batch)
+            raise
+        
+        self._local.batch = None
+        try:
+            if write_batch.seen_ids_dirty or write_batch.cursors:
+                # Hold the lock from snapshot to rename so a concurrent batch can't
+                # replace newer seen-ID or cursor files with an older snapshot
+                with self._lock:
+                    if write_batch.seen_ids_dirty:
+                        self._stage_write(write_batch, self.seen_ids_file,
+                                          self.seen_ids.model_dump_json(indent=None if serialization.compact_artifacts() else 2).encode("utf-8"))
+                    if write_batch.cursors:
+                        cursors = self._load_poll_cursors()
+                        cursors.update(write_batch.cursors)
+                        self.poll_cursors_file.parent.mkdir(parents=True, exist_ok=True)
+                        self._stage_write(write_batch, self.poll_cursors_file,
+                                          serialization.dumpb(self._cursor_data(cursors), compact=serialization.compact_artifacts()))
+                    write_batch.commit()
+            else:
+                write_batch.commit()
+        except Exception:
+            write_batch.rollback()
+            self._forget_seen(write_batch)
+            raise
+    
+    def _forget_seen(self, write_batch: _WriteBatch):
+        """Undo a discarded batch's mark_seen calls, leaving IDs other threads added alone."""
+        if not write_batch.seen_added:
+            return
+        with self._lock:
+            for item_type, item_ids in write_batch.seen_added.items():
+                seen = self._seen_list(item_type)
+                dropped = set(item_ids)
+                seen[:] = [item_id for item_id in seen if item_id not in dropped]
+    
+    def _seen_list(self, item_type: str) -> List[str]:
+        if item_type == "twitch_clip":
+            return self.seen_ids.twitch_clips
+        if item_type == "github_event":
+            return self.seen_ids.github_events
+        raise ValueError(f"Unknown item type: {item_type}")
+    
+    def _stage_write(self, write_batch: _WriteBatch, file_path: Path, payload: bytes):
+        """Write payload to a unique temp file next to file_path for renaming at commit."""
+        fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f"{file_path.name}.", suffix=".tmp")
+        try:
+            # mkstemp creates 0600 files; keep the target's mode (or the umask default) across the rename
+            try:
+                mode = file_path.stat().st_mode & 0o7777
+            except FileNotFoundError:
+                mode = DEFAULT_FILE_MODE
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        previous = write_batch.renames.get(file_path)
+        write_batch.renames[file_path] = Path(tmp_name)
+        if previous is not None:
+            # Staged twice in one batch: only the latest write is committed
+            previous.unlink(missing_ok=True)
     
     def is_seen(self, item_id: str, item_type: str) -> bool:
         """Check if an item has been seen before."""
@@ -61,14 +229,66 @@ class CacheManager:
     
     def mark_seen(self, item_id: str, item_type: str):
         """Mark an item as seen."""
-        if item_type == "twitch_clip":
-            if item_id not in self.seen_ids.twitch_clips:
-                self.seen_ids.twitch_clips.append(item_id)
-        elif item_type == "github_event":
-            if item_id not in self.seen_ids.github_events:
-                self.seen_ids.github_events.append(item_id)
+        self.mark_seen_many([item_id], item_type)
+    
+    def mark_seen_many(self, item_ids: List[str], item_type: str):
+        """Mark several items as seen with a single write of the seen-ID file."""
+        with self._lock:
+            try:
+                seen = self._seen_list(item_type)
+            except ValueError:
+                return
+            known = set(seen)
+            added = []
+            for item_id in item_ids:
+                if item_id not in known:
+                    known.add(item_id)
+                    seen.append(item_id)
+                    added.append(item_id)
+            
+            write_batch = self._active_batch()
+            if write_batch is not None:
+                write_batch.seen_added.setdefault(item_type, []).extend(added)
+            self._save_seen_ids()
+    
+    def _load_poll_cursors(self) -> Dict[str, PollCursor]:
+        """Load polling cursors from file, dropping malformed entries."""
+        cursors: Dict[str, PollCursor] = {}
+        if not self.poll_cursors_file.exists():
+            return cursors
+        try:
+            data = serialization.load_file(self.poll_cursors_file)
+        except Exception as e:
+            logger.warning("Failed to load poll cursors from %s: %s", self.poll_cursors_file, e)
+            return cursors
         
-        self._save_seen_ids()
+        for source, entry in (data or {}).items():
+            try:
+                cursors[source] = PollCursor(**entry)
+            except Exception:
+                logger.warning("Ignoring malformed poll cursor for %s", source)
+        return cursors
+    
+    def get_cursor(self, source: str) -> Optional[PollCursor]:
+        """Get the stored polling cursor for a source (e.g. 'github:users/octocat')."""
+        return self._load_poll_cursors().get(source)
+    
+    @staticmethod
+    def _cursor_data(cursors: Dict[str, PollCursor]) -> Dict[str, Any]:
+        return {key: value.model_dump(mode='json') for key, value in cursors.items()}
+    
+    def save_cursor(self, source: str, cursor: PollCursor):
+        """Persist the polling cursor for a source (deferred to commit inside a write batch)."""
+        cursor.last_polled = datetime.now()
+        write_batch = self._active_batch()
+        if write_batch is not None:
+            write_batch.cursors[source] = cursor
+            return
+        with self._lock:
+            cursors = self._load_poll_cursors()
+            cursors[source] = cursor
+            self.atomic_write_json(self.poll_cursors_file, self._cursor_data(cursors), overwrite=True,
+                                   compact=serialization.compact_artifacts())
     
     def get_data_dir(self, date: Optional[datetime] = None) -> Path:
         """Get the data directory for a specific date."""
@@ -172,14 +392,34 @@ class CacheManager:
         file_path = self._resolve_secure_path(filename, date)
         return self.atomic_write_json(file_path, data, overwrite=overwrite)
     
+    def append_records(self, kind: str, records: List[Dict[str, Any]], date: Optional[datetime] = None) -> int:
+        """
+        Append records to the day's event log (see services.event_log).
+        
+        Args:
+            kind: 'twitch_clip' or 'github_event'
+            records: JSON-serializable dicts, each with an 'id' key
+            date: Date whose data directory receives the records
+            
+        Returns:
+            Number of new records written
+        """
+        write_batch = self._active_batch()
+        event_log = EventLog(self.get_data_dir(date))
+        if write_batch is None:
+            return event_log.append(kind, records)
+        written = event_log.append(kind, records, fsync=False)
+        if written:
+            write_batch.flush_paths.append(event_log.active_path(kind))
+        return written
+    
     def load_json(self, filename: str, date: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
         """Load data from JSON file."""
         # Use _resolve_secure_path to get the safe destination path
         file_path = self._resolve_secure_path(filename, date)
         
         if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return serialization.load_file(file_path)
         
         return None
     
@@ -198,9 +438,13 @@ class CacheManager:
         if persistent_path.exists() and not overwrite:
             raise FileExistsError(f"Destination file already exists: {persistent_path}. Set overwrite=True to allow replacement.")
         
+        write_batch = self._active_batch()
+        
         # Perform atomic replace using os.replace
         try:
             os.replace(temp_path, persistent_path)
+            if write_batch is not None:
+                write_batch.dirs.add(persistent_path.parent)
         except OSError as e:
             if getattr(e, "errno", None) == errno.EXDEV:
                 # Files are on different filesystems, use copy + replace strategy
@@ -213,6 +457,12 @@ class CacheManager:
                     # Copy contents to temporary file in same directory
                     shutil.copy2(temp_path, temp_in_same_dir)
                     
+                    if write_batch is not None:
+                        # Group commit: flush, rename and source cleanup happen at commit
+                        write_batch.renames[persistent_path] = temp_in_same_dir
+                        write_batch.cleanup.append(temp_path)
+                        return persistent_path
+                    
                     # Ensure data is flushed to disk before replace
                     with open(temp_in_same_dir, "rb", buffering=0) as _fh:
                         os.fsync(_fh.fileno())
@@ -271,13 +521,14 @@ class CacheManager:
         
         logger.info("Cache cleared successfully")
     
-    def atomic_write_json(self, file_path: Path, data: Dict[str, Any], overwrite: bool = False) -> Path:
+    def atomic_write_json(self, file_path: Path, data: Dict[str, Any], overwrite: bool = False, compact: bool = False) -> Path:
         """Atomically write JSON data to a file with cross-filesystem support.
         
         Args:
             file_path: Path to write the JSON file to
             data: Data to serialize as JSON
             overwrite: Whether to overwrite existing files
+            compact: Write without indentation (for internal artifacts)
             
         Returns:
             Path to the written file
@@ -285,28 +536,25 @@ class CacheManager:
         Raises:
             FileExistsError: If file exists and overwrite=False
             RuntimeError: If writing fails
+        
+        Inside CacheManager.batch() the file only appears once the batch commits.
         """
-        if file_path.exists() and not overwrite:
+        write_batch = self._active_batch()
+        if not overwrite and (file_path.exists() or (write_batch is not None and file_path in write_batch.renames)):
             raise FileExistsError(f"File already exists: {file_path}. Set overwrite=True to allow replacement.")
         
         # Ensure parent directory exists
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
+        if write_batch is not None:
+            # Group commit: fsync and rename happen once for the whole batch
+            self._stage_write(write_batch, file_path, serialization.dumpb(data, compact=compact))
+            return file_path
+        
         tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
         try:
-            with open(tmp_path, 'w', encoding='utf-8') as f:
-                # Use a more robust serialization approach
-                def safe_serializer(obj):
-                    if hasattr(obj, 'model_dump'):
-                        return obj.model_dump(mode='json')
-                    elif hasattr(obj, 'dict'):
-                        return obj.dict()
-                    elif hasattr(obj, '__dict__'):
-                        return obj.__dict__
-                    else:
-                        return str(obj)
-                
-                json.dump(data, f, indent=2, default=safe_serializer)
+            with open(tmp_path, 'wb') as f:
+                f.write(serialization.dumpb(data, compact=compact))
                 f.flush()
                 os.fsync(f.fileno())
             os.replace(tmp_path, file_path)
@@ -2,8 +2,9 @@
 Pydantic models for story packet schema (v2 digest).
 """
 
-from datetime import datetime
-from typing import Optional, Dict, Any, List, Literal
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Literal, Tuple
 from pydantic import BaseModel, Field
 from enum import Enum
 import re
@@ -571,81 +572,143 @@ def _extract_why_and_highlights(pr_event: Dict[str, Any]) -> tuple[str, List[str
     return why, final_highlights[:3]  # Max 3 highlights
 
 
-def pair_with_clip(
-    pr_event: Dict[str, Any],
-    clips: List[Dict[str, Any]],
-    time_window_hours: float = 2.0
-) -> PairingInfo:
-    """Pair a PR with the best matching clip within time window."""
-    # Handle datetime parsing - follow existing pattern from GitHub service
-    created_at = pr_event["created_at"]
-    if isinstance(created_at, str):
-        pr_merged_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-    else:
-        pr_merged_at = created_at
+PAIRING_THRESHOLD = 0.55  # Minimum score for a good pairing
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Parse an ISO timestamp (or pass a datetime through), treating naive values as UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _tokens(*parts: Any) -> frozenset:
+    """Lowercased whitespace tokens of the given text fields."""
+    return frozenset(" ".join(str(part or "") for part in parts).lower().split())
+
+
+class ClipIndex:
+    """
+    Clips prepared once for pairing against many PRs.
     
-    best_clip = None
-    best_score = 0.0
+    Clips are parsed and tokenized up front and sorted by created_at, so each
+    PR only looks at clips inside its time window (found by bisect). Keyword
+    overlap for those candidates comes from an inverted token index: a sparse
+    PR x clip overlap row computed from the PR's tokens' posting lists,
+    instead of intersecting fresh word sets for every pair.
+    """
     
-    for clip in clips:
-        # Handle datetime parsing for clip - follow existing pattern
-        clip_created_at_str = clip["created_at"]
-        if isinstance(clip_created_at_str, str):
-            clip_created_at = datetime.fromisoformat(clip_created_at_str.replace("Z", "+00:00"))
-        else:
-            clip_created_at = clip_created_at_str
+    def __init__(self, clips: List[Dict[str, Any]]):
+        """
+        Args:
+            clips: Clip dicts with id, created_at, title and optional transcript
+        """
+        entries = []
+        for position, clip in enumerate(clips):
+            created_at = _parse_timestamp(clip["created_at"])
+            entries.append((created_at.timestamp(), position, created_at, clip))
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
         
-        # Check time window (± time_window_hours)
-        time_diff = abs((pr_merged_at - clip_created_at).total_seconds() / 3600)
-        if time_diff > time_window_hours:
-            continue
+        self.times = [entry[0] for entry in entries]
+        self.positions = [entry[1] for entry in entries]  # Input order, for tie-breaking
+        self.created_at = [entry[2] for entry in entries]
+        self.clips = [entry[3] for entry in entries]
+        self.token_counts = []
+        self.postings: Dict[str, List[int]] = {}
+        for slot, clip in enumerate(self.clips):
+            tokens = _tokens(clip.get("title", ""), clip.get("transcript", ""))
+            self.token_counts.append(len(tokens))
+            for token in tokens:
+                self.postings.setdefault(token, []).append(slot)
+    
+    def __len__(self) -> int:
+        return len(self.clips)
+    
+    def _window(self, timestamp: float, time_window_hours: float) -> Tuple[int, int]:
+        """Slot range [lo, hi) of clips within ± time_window_hours of timestamp."""
+        window = time_window_hours * 3600
+        return (bisect_left(self.times, timestamp - window),
+                bisect_right(self.times, timestamp + window))
+    
+    def _overlaps(self, pr_tokens: frozenset, lo: int, hi: int) -> Dict[int, int]:
+        """Shared-token counts for clips in [lo, hi) that share any token with the PR."""
+        overlaps: Dict[int, int] = {}
+        for token in pr_tokens:
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            # Postings are in slot order, so the window is a contiguous slice
+            for slot in postings[bisect_left(postings, lo):bisect_left(postings, hi)]:
+                overlaps[slot] = overlaps.get(slot, 0) + 1
+        return overlaps
+    
+    def pair(self, pr_event: Dict[str, Any], time_window_hours: float = 2.0) -> PairingInfo:
+        """Pair a PR with the best matching clip within the time window."""
+        pr_time = _parse_timestamp(pr_event["created_at"]).timestamp()
+        lo, hi = self._window(pr_time, time_window_hours)
+        if lo >= hi:
+            return PairingInfo(needs_broll=True)
         
-        # Calculate pairing score
-        score = _calculate_pairing_score(pr_event, clip, time_diff)
+        pr_tokens = _tokens(pr_event.get("title", ""), pr_event.get("body", ""))
+        overlaps = self._overlaps(pr_tokens, lo, hi) if pr_tokens else {}
         
-        if score > best_score:
-            best_score = score
-            best_clip = clip
-    
-    # Return pairing info
-    if best_clip and best_score >= 0.55:  # Threshold for good pairing
-        # Handle datetime parsing for best clip - follow existing pattern
-        best_clip_created_at_str = best_clip["created_at"]
-        if isinstance(best_clip_created_at_str, str):
-            best_clip_created_at = datetime.fromisoformat(best_clip_created_at_str.replace("Z", "+00:00"))
-        else:
-            best_clip_created_at = best_clip_created_at_str
+        best_slot = None
+        best_score = 0.0
+        for slot in range(lo, hi):
+            time_diff = abs(pr_time - self.times[slot]) / 3600
+            score = _pairing_score(time_diff, overlaps.get(slot, 0), len(pr_tokens), self.token_counts[slot])
+            # Ties go to the clip listed first, as with a linear scan
+            if score > best_score or (
+                score == best_score and best_slot is not None
+                and self.positions[slot] < self.positions[best_slot]
+            ):
+                best_score = score
+                best_slot = slot
         
-        return PairingInfo(
-            clip_id=best_clip["id"],
-            clip_created_at=best_clip_created_at,
-            score=best_score,
-            needs_broll=False
-        )
-    else:
+        if best_slot is not None and best_score >= PAIRING_THRESHOLD:
+            return PairingInfo(
+                clip_id=self.clips[best_slot]["id"],
+                clip_created_at=self.created_at[best_slot],
+                score=best_score,
+                needs_broll=False
+            )
         return PairingInfo(needs_broll=True)
 
 
-def _calculate_pairing_score(pr_event: Dict[str, Any], clip: Dict[str, Any], time_diff: float) -> float:
-    """Calculate pairing score between PR and clip (0.0-1.0)."""
-    score = 0.0
+def pair_with_clip(
+    pr_event: Dict[str, Any],
+    clips: List[Dict[str, Any]],
+    time_window_hours: float = 2.0,
+    index: Optional[ClipIndex] = None
+) -> PairingInfo:
+    """
+    Pair a PR with the best matching clip within time window.
     
+    Pass a prebuilt ClipIndex when pairing many PRs against the same clips;
+    otherwise one is built from clips for this call.
+    """
+    if index is None:
+        index = ClipIndex(clips)
+    return index.pair(pr_event, time_window_hours)
+
+
+def _pairing_score(time_diff: float, overlap: int, pr_token_count: int, clip_token_count: int) -> float:
+    """Pairing score (0.0-1.0) from time distance in hours and token overlap."""
     # Time proximity (closer = better, max 0.4 points)
-    time_score = max(0, 1 - (time_diff / 2.0)) * 0.4
-    score += time_score
-    
-    # Keyword overlap (0.6 points)
-    pr_text = f"{pr_event.get('title', '')} {pr_event.get('body', '')}".lower()
-    clip_text = f"{clip.get('title', '')} {clip.get('transcript', '')}".lower()
-    
-    # Simple keyword matching
-    pr_words = set(pr_text.split())
-    clip_words = set(clip_text.split())
+    score = max(0, 1 - (time_diff / 2.0)) * 0.4
     
-    if pr_words and clip_words:
-        overlap = len(pr_words.intersection(clip_words))
-        total = len(pr_words.union(clip_words))
-        keyword_score = (overlap / total) * 0.6
-        score += keyword_score
+    # Keyword overlap as Jaccard similarity (0.6 points)
+    if pr_token_count and clip_token_count:
+        total = pr_token_count + clip_token_count - overlap
+        score += (overlap / total) * 0.6
     
     return min(1.0, score)
+
+
+def _calculate_pairing_score(pr_event: Dict[str, Any], clip: Dict[str, Any], time_diff: float) -> float:
+    """Calculate pairing score between PR and clip (0.0-1.0)."""
+    pr_words = _tokens(pr_event.get("title", ""), pr_event.get("body", ""))
+    clip_words = _tokens(clip.get("title", ""), clip.get("transcript", ""))
+    return _pairing_score(time_diff, len(pr_words & clip_words), len(pr_words), len(clip_words))
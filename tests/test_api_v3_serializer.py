@@ -5,7 +5,7 @@ Tests for the API v3 serializer to ensure it produces the correct JSON shape.
 import pytest
 import json
 from datetime import datetime, timezone
-from services.serializers.api_v3 import build
+from services.serializers.api_v3 import ApiV3Serializer, build
 
 
 class TestApiV3Serializer:
@@ -263,3 +263,52 @@ class TestApiV3Serializer:
         assert etag.startswith('"')
         assert etag.endswith('"')
         assert len(etag) > 10  # Should be a reasonable length hash
+
+
+class TestApiV3MarkdownProcessing:
+    """Test the markdown formatting passes run over the token stream."""
+    
+    def setup_method(self):
+        """Set up a serializer and a digest with one clip and one PR."""
+        self.serializer = ApiV3Serializer('Paul Chris Luke', 'https://paulchrisluke.com', 'https://media.paulchrisluke.com')
+        self.digest = {
+            'twitch_clips': [{'title': 'Big Fix', 'url': 'https://clips.twitch.tv/BigFix'}],
+            'github_events': [{'type': 'PullRequestEvent', 'details': {'number': 12}, 'url': 'https://github.com/o/r/pull/12'}],
+        }
+    
+    def test_code_and_links_are_never_rewritten(self):
+        """Test existing and generated code and links are left alone by later passes."""
+        body = (
+            'The API uses `API caching` and [the pipeline docs](https://example.com/api/pipeline). '
+            'We call the REST API.\n\n```python\nx = "API pipeline\\n"\n```'
+        )
+        
+        result = self.serializer._process_markdown_content(body, self.digest)
+        
+        assert result.startswith('The **API** uses `API caching` and [the pipeline docs](https://example.com/api/pipeline).')
+        assert 'We call the `REST API`.' in result
+        assert '```python\nx = "API pipeline\\n"\n```' in result
+        assert '__' not in result
+    
+    def test_resource_links_and_headers(self):
+        """Test clip and PR mentions are linked and section headers inserted."""
+        body = 'Intro.\\nAs I start my day, I watched big fix and merged PR #12.'
+        
+        result = self.serializer._process_markdown_content(body, self.digest)
+        
+        assert result.startswith(
+            'Intro.\n\n## What Shipped\n\n'
+            'As I start my day, I watched [big fix](https://clips.twitch.tv/BigFix) '
+            'and merged [PR #12](https://github.com/o/r/pull/12).'
+        )
+    
+    def test_lists_and_blockquotes(self):
+        """Test step sentences become lists and meta-commentary becomes a blockquote."""
+        body = 'I started by fixing the build, adding tests, and shipping. Then I rested. The irony is that it worked.'
+        
+        result = self.serializer._process_markdown_content(body, self.digest)
+        
+        assert result.startswith(
+            'I started by:\n\n- fixing the build\n- adding tests\n- and shipping\n\n'
+            'Then I rested.\n\n> The *irony* is that it worked.'
+        )
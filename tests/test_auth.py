@@ -216,6 +216,75 @@ class TestAuthService:
                 assert token is None
                 mock_print.assert_called_with("⚠️  GitHub token expired. Please refresh your fine-grained token.")
     
+    def test_get_twitch_token_cached_in_memory(self):
+        """Test the Twitch token is read from disk once and then served from memory."""
+        valid_token = TwitchToken(
+            access_token=SecretStr("cached_token"),
+            expires_in=3600,
+            token_type="bearer",
+            expires_at=datetime.now() + timedelta(hours=2)
+        )
+        
+        with patch.object(self.auth_service, '_load_twitch_token', return_value=valid_token) as mock_load:
+            assert self.auth_service.get_twitch_token() == "cached_token"
+            assert self.auth_service.get_twitch_token() == "cached_token"
+            mock_load.assert_called_once()
+    
+    def test_get_twitch_token_single_flight_refresh(self):
+        """Test concurrent callers with an expired token trigger only one refresh."""
+        import threading
+        import time
+        
+        fresh_token = TwitchToken(
+            access_token=SecretStr("fresh_token"),
+            expires_in=3600,
+            token_type="bearer",
+            expires_at=datetime.now() + timedelta(hours=2)
+        )
+        
+        def slow_refresh():
+            time.sleep(0.05)
+            return fresh_token
+        
+        results = []
+        with patch.object(self.auth_service, '_load_twitch_token', return_value=None), \
+             patch.object(self.auth_service, '_refresh_twitch_token', side_effect=slow_refresh) as mock_refresh:
+            threads = [threading.Thread(target=lambda: results.append(self.auth_service.get_twitch_token()))
+                       for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        assert results == ["fresh_token"] * 5
+        mock_refresh.assert_called_once()
+    
+    def test_get_twitch_token_proactive_renewal(self):
+        """Test a token close to expiry is returned while renewal runs in the background."""
+        import time
+        
+        expiring_token = TwitchToken(
+            access_token=SecretStr("old_token"),
+            expires_in=3600,
+            token_type="bearer",
+            expires_at=datetime.now() + timedelta(minutes=20)
+        )
+        fresh_token = TwitchToken(
+            access_token=SecretStr("new_token"),
+            expires_in=3600,
+            token_type="bearer",
+            expires_at=datetime.now() + timedelta(hours=2)
+        )
+        
+        with patch.object(self.auth_service, '_load_twitch_token', return_value=expiring_token), \
+             patch.object(self.auth_service, '_refresh_twitch_token', return_value=fresh_token):
+            assert self.auth_service.get_twitch_token() == "old_token"
+            for _ in range(100):
+                if self.auth_service._cached_twitch_token is fresh_token:
+                    break
+                time.sleep(0.01)
+            assert self.auth_service.get_twitch_token() == "new_token"
+    
     def test_get_github_headers(self):
         """Test GitHub headers generation."""
         with patch.object(self.auth_service, 'get_github_token', return_value="test_github_token"):
@@ -0,0 +1,200 @@
+"""
+Tests for the parallel backfill runner and shared concurrency budgets.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from services import budgets, serialization
+from services.backfill import LEASE_NAME, DateLease, run_backfill
+
+
+def _result(target_date, generated=True):
+    return {
+        "date": target_date,
+        "success": generated,
+        "error": None if generated else "Blog already exists",
+        "story_count": 1,
+        "videos_rendered": 0,
+        "blog_generated": generated,
+        "r2_uploaded": False,
+    }
+
+
+class TestDateLease:
+    """Test cases for DateLease."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_lease_is_exclusive(self):
+        """Test a second worker cannot take a held lease."""
+        first = DateLease(self.temp_dir)
+        second = DateLease(self.temp_dir)
+
+        assert first.acquire()
+        assert not second.acquire()
+
+        first.release()
+        assert not (self.temp_dir / LEASE_NAME).exists()
+        assert second.acquire()
+        second.release()
+
+    def test_expired_lease_is_taken_over(self):
+        """Test an abandoned lease can be reclaimed after its TTL."""
+        stale = DateLease(self.temp_dir, ttl=-1)
+        assert stale.acquire()
+
+        fresh = DateLease(self.temp_dir)
+        assert fresh.acquire()
+
+        # The stale holder must not remove the new owner's lease
+        stale.release()
+        assert (self.temp_dir / LEASE_NAME).exists()
+        fresh.release()
+        assert not (self.temp_dir / LEASE_NAME).exists()
+
+    def test_concurrent_takeover_has_one_winner(self):
+        """Test workers racing to take over an expired lease can't both hold it."""
+        assert DateLease(self.temp_dir, ttl=-1).acquire()
+        contenders = [DateLease(self.temp_dir) for _ in range(8)]
+        barrier = threading.Barrier(len(contenders))
+
+        def take(lease):
+            barrier.wait()
+            return lease.acquire()
+
+        with ThreadPoolExecutor(max_workers=len(contenders)) as executor:
+            won = list(executor.map(take, contenders))
+
+        assert won.count(True) == 1
+        winner = contenders[won.index(True)]
+        assert serialization.load_file(self.temp_dir / LEASE_NAME)["token"] == winner.token
+
+
+class TestRunBackfill:
+    """Test cases for run_backfill."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.dates = ["2025-01-15", "2025-01-14", "2025-01-13"]
+        for target_date in self.dates:
+            (self.temp_dir / target_date).mkdir()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_dates_run_concurrently_and_publish_once(self):
+        """Test dates overlap and R2 is published in a single pass."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        upload_flags = []
+
+        def fake_generate(target_date, upload_to_r2=True):
+            nonlocal active, peak
+            upload_flags.append(upload_to_r2)
+            assert (self.temp_dir / target_date / LEASE_NAME).exists()
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return _result(target_date)
+
+        publisher = MagicMock()
+        publisher.publish_blogs.return_value = {
+            f"{d}/{d}_page.publish.json": True for d in self.dates
+        }
+
+        with patch('services.auto_blog_generator.generate_daily_blog', side_effect=fake_generate), \
+             patch('services.publisher_r2.R2Publisher', return_value=publisher):
+            results = run_backfill(self.dates, max_workers=3, data_dir=self.temp_dir)
+
+        assert list(results) == self.dates
+        assert peak > 1
+        assert upload_flags == [False, False, False]
+        publisher.publish_blogs.assert_called_once_with(self.temp_dir)
+        assert all(r["success"] and r["r2_uploaded"] for r in results.values())
+        assert not any((self.temp_dir / d / LEASE_NAME).exists() for d in self.dates)
+
+    def test_leased_date_is_skipped(self):
+        """Test a date leased by another worker is not generated."""
+        held = DateLease(self.temp_dir / self.dates[0])
+        assert held.acquire()
+
+        with patch('services.auto_blog_generator.generate_daily_blog',
+                   side_effect=lambda d, upload_to_r2=True: _result(d)) as mock_generate:
+            results = run_backfill(self.dates, max_workers=2, upload_to_r2=False, data_dir=self.temp_dir)
+
+        held.release()
+        assert mock_generate.call_count == 2
+        assert results[self.dates[0]]["error"] == "Leased by another worker"
+        assert results[self.dates[1]]["success"]
+
+    def test_no_publish_when_nothing_generated(self):
+        """Test R2 is untouched when every blog already exists."""
+        with patch('services.auto_blog_generator.generate_daily_blog',
+                   side_effect=lambda d, upload_to_r2=True: _result(d, generated=False)), \
+             patch('services.publisher_r2.R2Publisher') as mock_publisher:
+            results = run_backfill(self.dates, data_dir=self.temp_dir)
+
+        mock_publisher.assert_not_called()
+        assert all(r["error"] == "Blog already exists" for r in results.values())
+
+
+class TestBudgets:
+    """Test cases for shared concurrency budgets."""
+
+    def setup_method(self):
+        """Reset the process-wide budgets."""
+        budgets._budgets.clear()
+
+    def teardown_method(self):
+        """Reset the process-wide budgets."""
+        budgets._budgets.clear()
+
+    def test_budget_limit_from_env(self):
+        """Test limits come from {NAME}_CONCURRENCY with sane fallbacks."""
+        with patch.dict(os.environ, {"RENDER_CONCURRENCY": "3", "AI_CONCURRENCY": "bogus"}):
+            assert budgets.budget_limit("render") == 3
+            assert budgets.budget_limit("ai") == budgets.BUDGET_DEFAULTS["ai"]
+
+    def test_budget_bounds_concurrency(self):
+        """Test no more than the configured number of holders run at once."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal active, peak
+            with budgets.budget("render"):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+
+        with patch.dict(os.environ, {"RENDER_CONCURRENCY": "2"}):
+            threads = [threading.Thread(target=work) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert peak == 2
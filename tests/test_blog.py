@@ -307,7 +307,11 @@ class TestBlogDigestBuilder:
         
         # Test that we can access the metadata generation method if it exists
         if hasattr(builder, '_generate_metadata'):
-            metadata = builder._generate_metadata("2025-01-15", [sample_twitch_clip], [sample_github_event])
+            metadata = builder._generate_metadata(
+                "2025-01-15",
+                [sample_twitch_clip.model_dump(mode="json")],
+                [sample_github_event.model_dump(mode="json")]
+            )
             assert metadata["total_clips"] == 1
             assert metadata["total_events"] == 1
             assert "testuser" in metadata["keywords"]
@@ -553,3 +557,56 @@ class TestBlogDigestBuilder:
         digest = builder.build_latest_digest()
         assert digest["date"] == "2025-01-16"
         assert len(digest["twitch_clips"]) == 1
+
+    def test_story_packets_left_pending_when_not_rendering_inline(self, temp_data_dir, temp_blogs_dir):
+        """Test normalization defers rendering to the pipeline when render_inline is off."""
+        builder = BlogDigestBuilder()
+        builder.update_paths(temp_data_dir, temp_blogs_dir)
+        builder.story_packets_enabled = True
+        builder.render_inline = False
+        
+        merged_pr = {
+            "id": "evt_1",
+            "type": "PullRequestEvent",
+            "repo": "testuser/testrepo",
+            "actor": "testuser",
+            "created_at": "2025-01-15T14:30:00Z",
+            "title": "Add feature",
+            "body": "Adds a feature",
+            "details": {"action": "closed", "merged": True, "number": 42},
+            "url": "https://github.com/testuser/testrepo/pull/42",
+        }
+        
+        with patch.object(builder, '_render_video_for_packet') as mock_render:
+            packets = builder._generate_story_packets([merged_pr], [], "2025-01-15")
+        
+        mock_render.assert_not_called()
+        assert len(packets) == 1
+        assert packets[0].video.status == "pending"
+    
+    def test_merge_rendered_videos_joins_background_render(self, temp_data_dir, temp_blogs_dir):
+        """Test videos rendered alongside enrichment are merged into the enriched digest."""
+        builder = BlogDigestBuilder()
+        builder.update_paths(temp_data_dir, temp_blogs_dir)
+        
+        rendered = {"status": "rendered", "path": "blogs/2025-01-15/story_1.mp4", "duration_s": 12.0}
+        normalized = {
+            "meta": {"kind": "NormalizedDigest", "version": 1},
+            "date": "2025-01-15",
+            "story_packets": [
+                {"id": "story_1", "video": rendered},
+                {"id": "story_2", "video": {"status": "pending"}},
+            ],
+        }
+        builder.io.save_normalized_digest(normalized, "2025-01-15")
+        enriched = {
+            "story_packets": [
+                {"id": "story_1", "video": {"status": "pending"}},
+                {"id": "story_2", "video": {"status": "pending"}},
+            ]
+        }
+        
+        builder._merge_rendered_videos(enriched, "2025-01-15")
+        
+        assert enriched["story_packets"][0]["video"] == rendered
+        assert enriched["story_packets"][1]["video"] == {"status": "pending"}
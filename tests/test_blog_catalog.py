@@ -0,0 +1,161 @@
+"""
+Tests for the publish package catalog and the /api/blogs range endpoint.
+"""
+
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from services import serialization
+from services.blog_catalog import CATALOG_NAME, BlogCatalog, package_path
+
+
+def _write_package(data_dir, date, title=None):
+    path = package_path(data_dir, date)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    serialization.dump_file(path, {
+        "_meta": {"kind": "PublishPackage", "version": 1},
+        "datePublished": date,
+        "title": title or f"Devlog {date}",
+        "summary": f"Summary for {date}",
+        "tags": ["devlog"],
+        "content": "Body " * 50,
+        "stories": [{"id": "pr-1"}],
+    })
+    return path
+
+
+class TestBlogCatalog:
+    """Test cases for BlogCatalog."""
+
+    def setup_method(self):
+        """Set up a data directory with three publish packages."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "data"
+        for date in ("2025-01-14", "2025-01-15", "2025-01-16"):
+            _write_package(self.data_dir, date)
+        (self.data_dir / "2025-01-17").mkdir()  # A day without a publish package
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_refresh_filters_range(self):
+        """Test entries are limited to the range and sorted by date."""
+        entries = BlogCatalog(self.data_dir).refresh("2025-01-15", "2025-01-20")
+
+        assert [e["date"] for e in entries] == ["2025-01-15", "2025-01-16"]
+        assert entries[0]["fields"]["title"] == "Devlog 2025-01-15"
+        assert "content" not in entries[0]["fields"]
+        assert (self.data_dir / CATALOG_NAME).exists()
+
+    def test_unchanged_packages_are_not_reread(self):
+        """Test a persisted catalog is reused without opening packages."""
+        BlogCatalog(self.data_dir).refresh()
+
+        with patch("services.blog_catalog.serialization.load_file", wraps=serialization.load_file) as load:
+            entries = BlogCatalog(self.data_dir).refresh()
+
+        # Only the catalog file itself is read
+        assert [call.args[0] for call in load.call_args_list] == [self.data_dir / CATALOG_NAME]
+        assert len(entries) == 3
+
+    def test_changed_and_deleted_packages_are_revalidated(self):
+        """Test rewritten packages are re-read and deleted ones dropped."""
+        catalog = BlogCatalog(self.data_dir)
+        catalog.refresh()
+
+        _write_package(self.data_dir, "2025-01-15", title="A much longer rewritten title")
+        package_path(self.data_dir, "2025-01-16").unlink()
+        entries = catalog.refresh()
+
+        assert [e["date"] for e in entries] == ["2025-01-14", "2025-01-15"]
+        assert entries[1]["fields"]["title"] == "A much longer rewritten title"
+
+    def test_projection_from_catalog_does_not_open_packages(self):
+        """Test summary-field projections are served from the catalog."""
+        catalog = BlogCatalog(self.data_dir)
+        entries = catalog.refresh()
+
+        with patch("services.blog_catalog.serialization.load_file") as load:
+            records = list(catalog.iter_packages(entries, ["title", "tags"]))
+
+        load.assert_not_called()
+        assert records[0] == {"date": "2025-01-14", "title": "Devlog 2025-01-14", "tags": ["devlog"]}
+
+    def test_projection_of_package_fields(self):
+        """Test fields outside the catalog are read from each package."""
+        catalog = BlogCatalog(self.data_dir)
+        entries = catalog.refresh()
+
+        records = list(catalog.iter_packages(entries, ["title", "stories"]))
+        full = list(catalog.iter_packages(entries[:1]))
+
+        assert records[0] == {"date": "2025-01-14", "title": "Devlog 2025-01-14", "stories": [{"id": "pr-1"}]}
+        assert full[0]["content"].startswith("Body")
+
+    def test_ndjson_lines(self):
+        """Test each record is one newline-terminated JSON line."""
+        catalog = BlogCatalog(self.data_dir)
+        lines = list(catalog.iter_ndjson(catalog.refresh(), ["title"]))
+
+        assert len(lines) == 3
+        assert all(line.endswith(b"\n") for line in lines)
+        assert json.loads(lines[2]) == {"date": "2025-01-16", "title": "Devlog 2025-01-16"}
+
+
+class TestBlogsEndpoint:
+    """Test cases for GET /api/blogs."""
+
+    def setup_method(self):
+        """Set up a catalog the webhook server will serve."""
+        self.webhook_server = pytest.importorskip("webhook_server")
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "data"
+        for date in ("2025-01-14", "2025-01-15", "2025-01-16"):
+            _write_package(self.data_dir, date)
+        self.patch = patch.object(self.webhook_server, "_blog_catalog", BlogCatalog(self.data_dir))
+        self.patch.start()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _get(self, path):
+        async def fetch():
+            transport = httpx.ASGITransport(app=self.webhook_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(path)
+        return asyncio.run(fetch())
+
+    def test_streams_range_as_ndjson(self):
+        """Test a range request returns one projected package per line."""
+        response = self._get("/api/blogs?from=2025-01-15&to=2025-01-16&fields=title,summary")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records == [
+            {"date": "2025-01-15", "title": "Devlog 2025-01-15", "summary": "Summary for 2025-01-15"},
+            {"date": "2025-01-16", "title": "Devlog 2025-01-16", "summary": "Summary for 2025-01-16"},
+        ]
+
+    def test_whole_packages_without_fields(self):
+        """Test omitting fields streams complete packages."""
+        response = self._get("/api/blogs?from=2025-01-14&to=2025-01-14")
+
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert len(records) == 1
+        assert records[0]["stories"] == [{"id": "pr-1"}]
+
+    def test_invalid_range_rejected(self):
+        """Test malformed or reversed ranges are 400s."""
+        assert self._get("/api/blogs?from=2025-13-01").status_code == 400
+        assert self._get("/api/blogs?from=2025-01-16&to=2025-01-14").status_code == 400
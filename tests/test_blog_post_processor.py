@@ -148,3 +148,56 @@ class TestBlogPostProcessorDomainValidation:
         
         with pytest.raises(ValueError):
             processor._validate_and_escape_domains(processor.twitch_embed_domains)
+
+
+class TestBlogPostProcessorAnchors:
+    """Test single-pass anchor rewriting."""
+    
+    def setup_method(self):
+        """Set up a processor and a digest with a PR, a push and a clip."""
+        self.processor = BlogPostProcessor()
+        self.processor.twitch_embed_domains = "example.com"
+        self.digest = {
+            "github_events": [
+                {"id": "101", "type": "PullRequestEvent", "details": {"merged": True, "number": 42}},
+                {"id": "102", "type": "PushEvent", "details": {"commit_sha": "abc123"}},
+            ],
+            "twitch_clips": [
+                {"id": "clip1", "title": "Great Clip", "url": "https://clips.twitch.tv/GreatClipSlug"},
+            ],
+        }
+    
+    def test_rewrites_all_anchor_kinds(self):
+        """Test PR, clip and event anchors are resolved and counted."""
+        content = "Merged [PR:42] twice [PR:42], see [CLIP:clip1] and [EVENT:102]. Unknown [PR:7]."
+        
+        result = self.processor._process_anchor_links(content, self.digest)
+        
+        assert result.count("[PR #42](https://github.com/paulchrisluke/pcl-labs/pull/42)") == 2
+        assert 'src="https://clips.twitch.tv/embed?clip=GreatClipSlug&parent=example.com"' in result
+        assert "[Push Event 102](https://github.com/paulchrisluke/pcl-labs/commit/abc123)" in result
+        assert "[PR:7]" in result
+        assert self.processor.anchor_counts == {"PR": 2, "CLIP": 1, "EVENT": 1, "unresolved": 1}
+    
+    def test_invalid_domains_fall_back_to_clip_link(self):
+        """Test clip anchors become plain links when embed domains are invalid."""
+        self.processor.twitch_embed_domains = "<script>"
+        
+        result = self.processor._process_anchor_links("[CLIP:clip1]", self.digest)
+        
+        assert result == "[Clip: Great Clip](https://clips.twitch.tv/GreatClipSlug)"
+    
+    def test_parent_params_computed_once(self):
+        """Test domain validation runs once for many clips."""
+        self.digest["twitch_clips"] = [
+            {"id": f"clip{i}", "title": f"Clip {i}", "url": f"https://clips.twitch.tv/Slug{i}"}
+            for i in range(20)
+        ]
+        content = " ".join(f"[CLIP:clip{i}]" for i in range(20))
+        
+        with patch.object(self.processor, '_validate_and_escape_domains',
+                          wraps=self.processor._validate_and_escape_domains) as mock_validate:
+            result = self.processor._process_anchor_links(content, self.digest)
+        
+        assert mock_validate.call_count == 1
+        assert result.count("<iframe") == 20
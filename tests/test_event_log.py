@@ -0,0 +1,198 @@
+"""
+Tests for the per-day NDJSON event log.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from services.digest_io import DigestIO
+from services.event_log import EventLog
+
+
+def _event(event_id: str) -> dict:
+    """Build a minimal serialized GitHub event."""
+    return {
+        "id": event_id,
+        "type": "PushEvent",
+        "repo": "owner/repo",
+        "actor": "octocat",
+        "created_at": "2025-01-15T10:00:00Z",
+        "details": {"commits": 1},
+    }
+
+
+class TestEventLog:
+    """Test cases for EventLog."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.date_dir = self.temp_dir / "2025-01-15"
+        self.log = EventLog(self.date_dir)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_append_and_iterate(self):
+        """Test a batch is written to one file and read back in order."""
+        written = self.log.append("github_event", [_event("1"), _event("2")])
+
+        assert written == 2
+        assert (self.date_dir / "events.ndjson").exists()
+        assert [r["id"] for r in self.log.iter_records("github_event")] == ["1", "2"]
+        assert list(self.log.iter_records("twitch_clip")) == []
+
+    def test_append_skips_known_ids(self):
+        """Test re-appending an existing ID is a no-op."""
+        self.log.append("github_event", [_event("1")])
+        written = self.log.append("github_event", [_event("1"), _event("2"), _event("2")])
+
+        assert written == 1
+        assert [r["id"] for r in self.log.iter_records("github_event")] == ["1", "2"]
+
+    def test_get_uses_index(self):
+        """Test point lookups return the stored record."""
+        self.log.append("github_event", [_event("1"), _event("2")])
+        self.log.append("github_event", [_event("3")])
+
+        assert self.log.get("github_event", "2")["id"] == "2"
+        assert self.log.get("github_event", "3")["id"] == "3"
+        assert self.log.get("github_event", "missing") is None
+        assert self.log.contains("github_event", "1")
+
+    def test_stale_index_is_rebuilt(self):
+        """Test the index is rebuilt when the log changed underneath it."""
+        self.log.append("github_event", [_event("1")])
+        with open(self.date_dir / "events.ndjson", "a", encoding="utf-8") as f:
+            f.write(json.dumps(_event("2")) + "\n")
+
+        assert self.log.get("github_event", "2")["id"] == "2"
+        assert self.log.append("github_event", [_event("2")]) == 0
+
+    def test_append_adds_index_line_per_batch(self):
+        """Test appends extend the index instead of rewriting it."""
+        self.log.append("github_event", [_event("1"), _event("2")])
+        with patch("services.event_log.os.replace") as mock_replace:
+            self.log.append("github_event", [_event("3")])
+            self.log.append("github_event", [_event("4")])
+
+        mock_replace.assert_not_called()
+        index_lines = (self.date_dir / "events.ndjson.idx").read_bytes().splitlines()
+        assert len(index_lines) == 3
+        assert list(json.loads(index_lines[-1])["ids"]) == ["4"]
+        assert self.log.get("github_event", "1")["id"] == "1"
+        assert self.log.get("github_event", "4")["id"] == "4"
+
+    def test_index_rewrite_uses_unique_temp_file(self):
+        """Test a rebuilt index is replaced via a per-writer temp file."""
+        self.log.append("github_event", [_event("1")])
+        with open(self.date_dir / "events.ndjson", "a", encoding="utf-8") as f:
+            f.write(json.dumps(_event("2")) + "\n")
+
+        with patch("services.event_log.os.replace", wraps=os.replace) as mock_replace:
+            self.log.append("github_event", [_event("3")])
+
+        tmp_path = Path(mock_replace.call_args[0][0])
+        assert tmp_path.name.startswith("events.ndjson.idx.")
+        assert tmp_path.name != "events.ndjson.idx.tmp"
+        assert sorted(p.name for p in self.date_dir.iterdir()) == ["events.ndjson", "events.ndjson.idx"]
+        index_lines = (self.date_dir / "events.ndjson.idx").read_bytes().splitlines()
+        assert len(index_lines) == 1
+        assert self.log.contains("github_event", "2")
+
+    def test_torn_line_is_skipped(self):
+        """Test a partially written final line doesn't hide earlier records."""
+        self.log.append("github_event", [_event("1")])
+        with open(self.date_dir / "events.ndjson", "a", encoding="utf-8") as f:
+            f.write('{"id": "2", "type": "Pu')
+
+        assert [r["id"] for r in self.log.iter_records("github_event")] == ["1"]
+
+    def test_unknown_kind_rejected(self):
+        """Test unknown record kinds raise ValueError."""
+        with pytest.raises(ValueError):
+            self.log.append("slack_message", [{"id": "1"}])
+
+    def test_zstd_compression(self):
+        """Test compressed batches round-trip alongside plain ones."""
+        pytest.importorskip("zstandard")
+        self.log.append("github_event", [_event("1")])
+        with patch.dict("os.environ", {"EVENT_LOG_COMPRESSION": "zstd"}):
+            assert self.log.append("github_event", [_event("1"), _event("2"), _event("3")]) == 2
+            assert self.log.append("github_event", [_event("4")]) == 1
+
+        assert (self.date_dir / "events.ndjson.zst").exists()
+        assert [r["id"] for r in self.log.iter_records("github_event")] == ["1", "2", "3", "4"]
+        assert self.log.get("github_event", "4")["id"] == "4"
+
+        # Index rebuilt from scratch still finds records in any frame
+        (self.date_dir / "events.ndjson.zst.idx").unlink()
+        assert self.log.get("github_event", "2")["id"] == "2"
+
+
+class TestDigestIOEventLog:
+    """Test DigestIO loading from event logs and legacy files."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.date_dir = self.temp_dir / "data" / "2025-01-15"
+        self.date_dir.mkdir(parents=True)
+        self.io = DigestIO(self.temp_dir / "data", self.temp_dir / "blogs")
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_loads_log_and_legacy_files(self):
+        """Test both storage formats are merged and de-duplicated by ID."""
+        EventLog(self.date_dir).append("github_event", [_event("1"), _event("2")])
+        (self.date_dir / "github_event_2_owner_repo_20250115_100000.json").write_text(json.dumps(_event("2")))
+        (self.date_dir / "github_event_3_owner_repo_20250115_100000.json").write_text(json.dumps(_event("3")))
+
+        events = self.io.load_github_events(self.date_dir)
+
+        assert [e.id for e in events] == ["1", "2", "3"]
+        assert events[0].created_at == datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+    def test_loads_clips_from_log(self):
+        """Test Twitch clips are loaded from clips.ndjson."""
+        clip = {
+            "id": "clip1",
+            "title": "Test Clip",
+            "url": "https://clips.twitch.tv/clip1",
+            "broadcaster_name": "streamer",
+            "created_at": "2025-01-15T10:00:00Z",
+            "duration": 30.0,
+            "view_count": 5,
+        }
+        EventLog(self.date_dir).append("twitch_clip", [clip])
+
+        clips = self.io.load_twitch_clips(self.date_dir)
+
+        assert [c.id for c in clips] == ["clip1"]
+
+    def test_trusted_dicts_match_model_dump(self):
+        """Test the trusted dict path matches a validate -> dump round trip."""
+        EventLog(self.date_dir).append("github_event", [_event("1")])
+        (self.date_dir / "github_event_2_owner_repo_20250115_100000.json").write_text(json.dumps(_event("2")))
+
+        trusted = self.io.load_github_event_dicts(self.date_dir)
+        strict = DigestIO(self.temp_dir / "data", self.temp_dir / "blogs", strict_load=True).load_github_event_dicts(self.date_dir)
+        expected = [e.model_dump(mode="json") for e in self.io.load_github_events(self.date_dir)]
+
+        assert trusted == strict == expected
+
+    def test_trusted_dicts_fall_back_to_validation(self):
+        """Test records missing required fields are validated and skipped."""
+        EventLog(self.date_dir).append("github_event", [{"id": "bad", "type": "PushEvent"}, _event("1")])
+
+        assert [e["id"] for e in self.io.load_github_event_dicts(self.date_dir)] == ["1"]
@@ -0,0 +1,164 @@
+"""
+Tests for GitHub service incremental polling.
+"""
+
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+from services.github import GitHubService
+from models import PollCursor
+
+
+def _event(event_id: str, minutes_ago: int) -> dict:
+    """Build a minimal GitHub event payload."""
+    created_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    return {
+        "id": event_id,
+        "type": "CreateEvent",
+        "repo": {"name": "owner/repo"},
+        "actor": {"login": "octocat"},
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "payload": {"ref_type": "branch", "ref": "main"},
+    }
+
+
+def _response(status_code: int = 200, events=None, etag=None, next_url=None) -> MagicMock:
+    """Build a mocked httpx response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = events or []
+    response.headers = {"ETag": etag} if etag else {}
+    response.links = {"next": {"url": next_url}} if next_url else {}
+    return response
+
+
+class TestGitHubIncrementalPolling:
+    """Test cases for cursor-based GitHub polling."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service = GitHubService()
+        self.service.auth_service = MagicMock()
+        self.service.auth_service.get_github_headers.return_value = {"Authorization": "token test"}
+        cache = self.service.cache_manager
+        cache.data_dir = self.temp_dir / "data"
+        cache.data_dir.mkdir()
+        cache.cache_dir = self.temp_dir / "cache"
+        cache.seen_ids_file = self.temp_dir / "seen_ids.json"
+        cache.poll_cursors_file = cache.cache_dir / "poll_cursors.json"
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch('services.github.get_client')
+    def test_first_poll_stores_cursor(self, mock_client):
+        """Test a first poll returns events and records the high-water mark."""
+        client = MagicMock()
+        client.get.return_value = _response(events=[_event("3", 1), _event("2", 2)], etag='W/"abc"')
+        mock_client.return_value = client
+
+        events = self.service.fetch_user_activity("octocat")
+
+        assert [e.id for e in events] == ["3", "2"]
+        # The cursor is only committed with the events
+        assert self.service.cache_manager.get_cursor("github:users/octocat") is None
+        self.service.save_events(events)
+        cursor = self.service.cache_manager.get_cursor("github:users/octocat")
+        assert cursor.newest_event_id == "3"
+        assert cursor.etag == 'W/"abc"'
+
+    @patch('services.github.get_client')
+    def test_unchanged_poll_uses_etag(self, mock_client):
+        """Test stored ETag is sent and a 304 short-circuits the fetch."""
+        self.service.cache_manager.save_cursor(
+            "github:repos/owner/repo",
+            PollCursor(newest_event_id="3", newest_created_at=datetime.now(timezone.utc), etag='W/"abc"',
+                       covered_since=datetime.now(timezone.utc) - timedelta(days=30))
+        )
+        client = MagicMock()
+        client.get.return_value = _response(status_code=304)
+        mock_client.return_value = client
+
+        events = self.service.fetch_repo_activity("owner/repo")
+
+        assert events == []
+        client.get.assert_called_once()
+        assert client.get.call_args[1]["headers"]["If-None-Match"] == 'W/"abc"'
+
+    @patch('services.github.get_client')
+    def test_pagination_stops_at_cursor(self, mock_client):
+        """Test pagination stops once a page reaches the stored cursor."""
+        self.service.cache_manager.save_cursor(
+            "github:users/octocat",
+            PollCursor(newest_event_id="2", newest_created_at=datetime.now(timezone.utc) - timedelta(minutes=30),
+                       covered_since=datetime.now(timezone.utc) - timedelta(days=30))
+        )
+        client = MagicMock()
+        client.get.return_value = _response(
+            events=[_event("4", 1), _event("2", 30), _event("1", 40)],
+            etag='W/"def"',
+            next_url="https://api.github.com/page2"
+        )
+        mock_client.return_value = client
+
+        events = self.service.fetch_user_activity("octocat")
+
+        assert [e.id for e in events] == ["4"]
+        # Second page is never requested
+        client.get.assert_called_once()
+        self.service.save_events(events)
+        assert self.service.cache_manager.get_cursor("github:users/octocat").newest_event_id == "4"
+
+    @patch('services.github.get_client')
+    def test_pagination_stops_at_days_back(self, mock_client):
+        """Test pagination stops once events fall outside the window."""
+        client = MagicMock()
+        client.get.return_value = _response(
+            events=[_event("9", 1), _event("8", 60 * 24 * 10)],
+            next_url="https://api.github.com/page2"
+        )
+        mock_client.return_value = client
+
+        events = self.service.fetch_user_activity("octocat", days_back=7)
+
+        assert [e.id for e in events] == ["9"]
+        client.get.assert_called_once()
+
+    @patch('services.github.get_client')
+    def test_failed_save_keeps_old_cursor(self, mock_client):
+        """Test the cursor doesn't advance past events that weren't persisted."""
+        client = MagicMock()
+        client.get.return_value = _response(events=[_event("3", 1)], etag='W/"abc"')
+        mock_client.return_value = client
+
+        events = self.service.fetch_user_activity("octocat")
+        with patch.object(self.service.cache_manager, "append_records", side_effect=OSError("disk full")):
+            self.service.save_events(events)
+
+        assert self.service.cache_manager.get_cursor("github:users/octocat") is None
+        assert not self.service.cache_manager.is_seen("3", "github_event")
+
+    @patch('services.github.get_client')
+    def test_wider_window_backfills_past_cursor(self, mock_client):
+        """Test a larger days_back ignores a cursor that doesn't cover the window."""
+        self.service.cache_manager.save_cursor(
+            "github:users/octocat",
+            PollCursor(newest_event_id="9", newest_created_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+                       covered_since=datetime.now(timezone.utc) - timedelta(days=7), etag='W/"abc"')
+        )
+        client = MagicMock()
+        client.get.return_value = _response(events=[_event("9", 1), _event("5", 60 * 24 * 10)], etag='W/"def"')
+        mock_client.return_value = client
+
+        events = self.service.fetch_user_activity("octocat", days_back=30)
+
+        assert [e.id for e in events] == ["9", "5"]
+        assert "If-None-Match" not in client.get.call_args[1]["headers"]
+        self.service.save_events(events)
+        cursor = self.service.cache_manager.get_cursor("github:users/octocat")
+        assert cursor.covered_since < datetime.now(timezone.utc) - timedelta(days=29)
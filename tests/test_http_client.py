@@ -0,0 +1,47 @@
+"""
+Tests for the pooled HTTP client registry.
+"""
+
+import pytest
+
+from services import http_client
+
+
+class TestHttpClientRegistry:
+    """Test cases for get_client/close_all."""
+    
+    def teardown_method(self):
+        """Close any clients opened by a test."""
+        http_client.close_all()
+    
+    def test_same_host_shares_client(self):
+        """Test URLs on the same host reuse one pooled client."""
+        first = http_client.get_client("https://api.github.com/users/octocat")
+        second = http_client.get_client("https://api.github.com/repos/owner/repo")
+        assert first is second
+    
+    def test_different_hosts_get_separate_clients(self):
+        """Test each host gets its own connection pool."""
+        github = http_client.get_client("https://api.github.com")
+        twitch = http_client.get_client("https://api.twitch.tv/helix")
+        assert github is not twitch
+    
+    def test_closed_client_is_replaced(self):
+        """Test a client closed elsewhere is transparently reopened."""
+        client = http_client.get_client("https://api.github.com")
+        client.close()
+        replacement = http_client.get_client("https://api.github.com")
+        assert replacement is not client
+        assert not replacement.is_closed
+    
+    def test_close_all(self):
+        """Test close_all closes and forgets every pooled client."""
+        client = http_client.get_client("https://api.github.com")
+        http_client.close_all()
+        assert client.is_closed
+        assert http_client.get_client("https://api.github.com") is not client
+    
+    def test_invalid_url(self):
+        """Test URLs without a host are rejected."""
+        with pytest.raises(ValueError, match="Cannot determine host"):
+            http_client.get_client("https://")
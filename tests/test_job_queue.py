@@ -0,0 +1,237 @@
+"""
+Tests for the SQLite-backed job queue and worker.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from services import job_queue
+from services.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorker
+
+
+class TestJobQueue:
+    """Test cases for JobQueue."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.queue = JobQueue(self.temp_dir / "jobs.sqlite3")
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_enqueue_dedupes_active_jobs_by_key(self):
+        """Test a second enqueue with the same key returns the active job."""
+        first, created = self.queue.enqueue("blog_approval", {"date": "2025-01-15"}, key="blog_approval:2025-01-15")
+        again, created_again = self.queue.enqueue("blog_approval", {"date": "2025-01-15"}, key="blog_approval:2025-01-15")
+        other, created_other = self.queue.enqueue("blog_approval", {"date": "2025-01-16"}, key="blog_approval:2025-01-16")
+
+        assert created and not created_again and created_other
+        assert again.id == first.id
+        assert other.id != first.id
+        assert first.status == QUEUED
+        assert first.payload == {"date": "2025-01-15"}
+
+    def test_finished_job_key_can_be_enqueued_again(self):
+        """Test idempotency only applies while a job is queued or running."""
+        job, _ = self.queue.enqueue("final_digest", {"date": "2025-01-15"}, key="k")
+        claimed = self.queue.claim("w", ["final_digest"])
+        self.queue.complete(claimed.id, "w", {"ok": True})
+
+        rerun, created = self.queue.enqueue("final_digest", {"date": "2025-01-15"}, key="k")
+
+        assert created and rerun.id != job.id
+        finished = self.queue.get(job.id)
+        assert finished.status == SUCCEEDED
+        assert finished.result == {"ok": True}
+        assert finished.progress == 1
+
+    def test_queue_survives_reopen(self):
+        """Test jobs persist across queue instances (e.g. a server restart)."""
+        job, _ = self.queue.enqueue("final_digest", {"date": "2025-01-15"})
+
+        reopened = JobQueue(self.temp_dir / "jobs.sqlite3")
+
+        assert reopened.get(job.id).status == QUEUED
+        assert [j.id for j in reopened.list_jobs(status=QUEUED)] == [job.id]
+
+    def test_claim_respects_per_type_concurrency(self):
+        """Test a type at its concurrency limit is skipped while others still run."""
+        self.queue.enqueue("final_digest", {"n": 1})
+        self.queue.enqueue("final_digest", {"n": 2})
+        self.queue.enqueue("blog_approval", {"n": 3})
+
+        with patch.dict(os.environ, {"JOB_CONCURRENCY_FINAL_DIGEST": "1"}):
+            first = self.queue.claim("w", ["final_digest", "blog_approval"])
+            second = self.queue.claim("w", ["final_digest", "blog_approval"])
+            third = self.queue.claim("w", ["final_digest", "blog_approval"])
+
+        assert first.type == "final_digest" and first.status == RUNNING and first.attempts == 1
+        assert second.type == "blog_approval"
+        assert third is None
+
+    def test_failure_retries_then_fails(self):
+        """Test failed attempts are retried with backoff until max_attempts."""
+        job, _ = self.queue.enqueue("final_digest", max_attempts=2)
+
+        self.queue.fail(self.queue.claim("w", ["final_digest"]).id, "w", "boom")
+        retried = self.queue.get(job.id)
+        assert retried.status == QUEUED
+        assert retried.error == "boom"
+        assert retried.run_after > time.time()
+        assert self.queue.claim("w", ["final_digest"]) is None  # Still backing off
+
+        with patch("services.job_queue.time.time", return_value=retried.run_after + 1):
+            claimed = self.queue.claim("w", ["final_digest"])
+            self.queue.fail(claimed.id, "w", "boom again")
+
+        failed = self.queue.get(job.id)
+        assert failed.status == FAILED
+        assert failed.attempts == 2
+
+    def test_stale_running_jobs_are_requeued(self):
+        """Test jobs whose worker stopped heartbeating go back to the queue."""
+        job, _ = self.queue.enqueue("final_digest")
+        self.queue.claim("dead-worker", ["final_digest"])
+
+        assert self.queue.requeue_stale(stale_after=60) == 0
+        with patch("services.job_queue.time.time", return_value=time.time() + 120):
+            assert self.queue.requeue_stale(stale_after=60) == 1
+
+        requeued = self.queue.get(job.id)
+        assert requeued.status == QUEUED
+        assert requeued.worker is None
+
+    def test_stale_job_without_attempts_left_fails(self):
+        """Test a stale job on its last attempt is failed rather than requeued."""
+        job, _ = self.queue.enqueue("final_digest", max_attempts=1)
+        self.queue.claim("dead-worker", ["final_digest"])
+
+        with patch("services.job_queue.time.time", return_value=time.time() + 120):
+            assert self.queue.requeue_stale(stale_after=60) == 0
+
+        failed = self.queue.get(job.id)
+        assert failed.status == FAILED
+        assert failed.error == "Worker stopped heartbeating"
+        assert self.queue.claim("w", ["final_digest"]) is None
+
+    def test_outcome_ignored_from_worker_that_lost_the_job(self):
+        """Test a requeued job's original worker can't complete or fail it."""
+        job, _ = self.queue.enqueue("final_digest")
+        self.queue.claim("slow-worker", ["final_digest"])
+        with patch("services.job_queue.time.time", return_value=time.time() + 120):
+            self.queue.requeue_stale(stale_after=60)
+            self.queue.claim("new-worker", ["final_digest"])
+
+        assert not self.queue.complete(job.id, "slow-worker", {"stale": True})
+        assert not self.queue.fail(job.id, "slow-worker", "boom")
+        running = self.queue.get(job.id)
+        assert running.status == RUNNING
+        assert running.worker == "new-worker"
+        assert running.result is None
+
+        assert self.queue.complete(job.id, "new-worker", {"ok": True})
+        assert not self.queue.complete(job.id, "new-worker", {"again": True})
+        assert self.queue.get(job.id).result == {"ok": True}
+
+    def test_progress_is_recorded(self):
+        """Test progress and message updates on a running job."""
+        job, _ = self.queue.enqueue("final_digest")
+        self.queue.claim("w", ["final_digest"])
+
+        self.queue.set_progress(job.id, 0.5, "Halfway")
+
+        running = self.queue.get(job.id)
+        assert running.progress == 0.5
+        assert running.message == "Halfway"
+
+
+class TestJobWorker:
+    """Test cases for JobWorker."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.queue = JobQueue(self.temp_dir / "jobs.sqlite3")
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        job_queue._handlers.pop("test_echo", None)
+
+    def test_run_once_executes_handler(self):
+        """Test a claimed job runs its handler and records the result."""
+        @job_queue.job_handler("test_echo")
+        def echo(payload, progress):
+            progress(0.5, "echoing")
+            return {"echo": payload["value"]}
+
+        job, _ = self.queue.enqueue("test_echo", {"value": 42})
+        worker = JobWorker(self.queue, job_types=["test_echo"])
+
+        assert worker.run_once()
+        assert not worker.run_once()
+        done = self.queue.get(job.id)
+        assert done.status == SUCCEEDED
+        assert done.result == {"echo": 42}
+        assert done.message == "echoing"
+
+    def test_run_processes_jobs_until_stopped(self):
+        """Test the worker loop drains the queue in the background."""
+        seen = []
+
+        @job_queue.job_handler("test_echo")
+        def echo(payload, progress):
+            seen.append(payload["n"])
+
+        for n in range(3):
+            self.queue.enqueue("test_echo", {"n": n})
+
+        stop = threading.Event()
+        worker = JobWorker(self.queue, job_types=["test_echo"], poll_interval=0.05)
+        thread = threading.Thread(target=worker.run, args=(stop,))
+        thread.start()
+        try:
+            deadline = time.time() + 5
+            while len(self.queue.list_jobs(status=SUCCEEDED)) < 3 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            stop.set()
+            thread.join(timeout=5)
+
+        assert sorted(seen) == [0, 1, 2]
+
+    def test_blog_approval_handler(self):
+        """Test blog approval creates the FINAL digest and notifies."""
+        job, _ = self.queue.enqueue("blog_approval", {"date": "2025-01-15"}, key="blog_approval:2025-01-15")
+        builder = MagicMock()
+        builder.create_final_digest.return_value = {"date": "2025-01-15"}
+
+        with patch("services.blog.BlogDigestBuilder", return_value=builder), \
+             patch("services.notify.notify_blog_published", return_value=True) as notify:
+            assert JobWorker(self.queue, job_types=["blog_approval"]).run_once()
+
+        builder.create_final_digest.assert_called_once_with("2025-01-15")
+        notify.assert_called_once_with("2025-01-15")
+        assert self.queue.get(job.id).result == {"date": "2025-01-15", "final_digest": True, "notified": True}
+
+    def test_blog_approval_handler_failure_is_retried(self):
+        """Test a missing FINAL digest fails the attempt without notifying."""
+        job, _ = self.queue.enqueue("blog_approval", {"date": "2025-01-15"})
+        builder = MagicMock()
+        builder.create_final_digest.return_value = None
+
+        with patch("services.blog.BlogDigestBuilder", return_value=builder), \
+             patch("services.notify.notify_blog_published") as notify:
+            JobWorker(self.queue, job_types=["blog_approval"]).run_once()
+
+        notify.assert_not_called()
+        failed = self.queue.get(job.id)
+        assert failed.status == QUEUED
+        assert "Failed to create FINAL digest" in failed.error
@@ -0,0 +1,144 @@
+"""
+Tests for the in-process metrics registry and its instrumentation.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from services import metrics
+from services.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry."""
+
+    def setup_method(self):
+        """Set up a fresh registry."""
+        self.registry = MetricsRegistry()
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_counter_render(self):
+        """Test counters render with HELP, TYPE and sorted label sets."""
+        requests = self.registry.counter("requests_total", "Requests", ("route",))
+        requests.inc(route="/b")
+        requests.inc(2, route="/a")
+
+        text = self.registry.render()
+
+        assert "# HELP requests_total Requests\n# TYPE requests_total counter\n" in text
+        assert 'requests_total{route="/a"} 2\nrequests_total{route="/b"} 1\n' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        latency = self.registry.histogram("latency_seconds", "Latency", ("step",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            latency.observe(value, step="outline")
+
+        text = self.registry.render()
+
+        assert 'latency_seconds_bucket{step="outline",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{step="outline",le="1"} 3' in text
+        assert 'latency_seconds_bucket{step="outline",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{step="outline"} 4' in text
+        assert latency.sum(step="outline") == pytest.approx(6.25)
+
+    def test_same_name_is_shared_and_conflicts_rejected(self):
+        """Test metrics are looked up by name and redeclaring with a different shape fails."""
+        first = self.registry.counter("hits_total", "Hits", ("cache",))
+
+        assert self.registry.counter("hits_total", "Hits", ("cache",)) is first
+        with pytest.raises(ValueError):
+            self.registry.gauge("hits_total", "Hits", ("cache",))
+        with pytest.raises(ValueError):
+            first.inc(unknown="x")
+
+    def test_gauge_function_is_read_at_collection(self):
+        """Test callback gauges report current values and survive callback errors."""
+        depth = {"queued": 3}
+        gauge = self.registry.gauge("queue_depth", "Depth", ("status",))
+        gauge.set_function(lambda: {(status,): count for status, count in depth.items()})
+
+        assert 'queue_depth{status="queued"} 3' in self.registry.render()
+        depth["queued"] = 0
+        assert 'queue_depth{status="queued"} 0' in self.registry.render()
+
+        gauge.set_function(lambda: 1 / 0)
+        assert "queue_depth{" not in self.registry.render()
+
+    def test_dump_json_and_text(self):
+        """Test dumps choose JSON or Prometheus text from the file suffix."""
+        self.registry.counter("runs_total", "Runs").inc()
+
+        json_path = self.registry.dump(self.temp_dir / "run" / "metrics.json")
+        text_path = self.registry.dump(self.temp_dir / "metrics.prom")
+
+        snapshot = json.loads(json_path.read_text())["metrics"]
+        assert snapshot["runs_total"]["samples"] == [{"name": "runs_total", "labels": {}, "value": 1}]
+        assert "runs_total 1" in text_path.read_text()
+
+    def test_dump_if_configured_uses_env(self):
+        """Test CLI dumps go to METRICS_FILE and are skipped without it."""
+        target = self.temp_dir / "metrics.prom"
+
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("METRICS_FILE", None)
+            assert metrics.dump_if_configured() is None
+        with patch.dict(os.environ, {"METRICS_FILE": str(target)}):
+            assert metrics.dump_if_configured() == target
+        assert "# TYPE" in target.read_text()
+
+
+class TestInstrumentation:
+    """Test pipeline code records into the default registry."""
+
+    def test_ai_calls_recorded_per_step(self):
+        """Test AI latency and tokens are labelled with the current step."""
+        from services.ai_client import AI_REQUEST_SECONDS, AI_TOKENS, CloudflareAIClient
+
+        env = {"CLOUDFLARE_ACCOUNT_ID": "acct", "CLOUDFLARE_API_TOKEN": "token", "AI_VALIDATE_TOKENS": "false"}
+        with patch.dict(os.environ, env):
+            client = CloudflareAIClient()
+        response = MagicMock()
+        response.json.return_value = {
+            "result": {"response": "ok", "usage": {"input_tokens": 120, "output_tokens": 30}}
+        }
+        before_calls = AI_REQUEST_SECONDS.count(step="test_outline", outcome="ok")
+        before_tokens = AI_TOKENS.value(step="test_outline", direction="input")
+
+        with patch("services.ai_client.requests.post", return_value=response), metrics.ai_step("test_outline"):
+            assert client.generate("prompt", "system") == "ok"
+
+        assert AI_REQUEST_SECONDS.count(step="test_outline", outcome="ok") == before_calls + 1
+        assert AI_TOKENS.value(step="test_outline", direction="input") == before_tokens + 120
+        assert metrics.current_ai_step() == "generate"
+
+    def test_metrics_endpoint_reports_route_templates(self):
+        """Test /metrics exposes request latency keyed by route template."""
+        webhook_server = pytest.importorskip("webhook_server")
+
+        async def fetch():
+            transport = httpx.ASGITransport(app=webhook_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/health")
+                await client.get("/api/blog/not-a-date")
+                return await client.get("/metrics")
+
+        response = asyncio.run(fetch())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_request_seconds_count{route="/health",method="GET",status="200"}' in response.text
+        assert 'route="/api/blog/{date}",method="GET",status="400"' in response.text
+        assert 'executor_queue_depth{pool="api_io"}' in response.text
@@ -0,0 +1,110 @@
+"""
+Tests for the shared OBS websocket session.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import obs_session
+from services.obs_session import OBSSession
+
+
+class TestOBSSession:
+    """Test cases for OBSSession."""
+
+    def setup_method(self):
+        """Patch the obsws-python clients with mocks."""
+        self.req_client = MagicMock()
+        self.req_client.get_record_status.return_value = SimpleNamespace(output_active=False)
+        self.event_client = MagicMock()
+        self.event_client.worker.is_alive.return_value = True
+        self.patches = [
+            patch.object(obs_session, "ReqClient", MagicMock(return_value=self.req_client)),
+            patch.object(obs_session, "EventClient", MagicMock(return_value=self.event_client)),
+        ]
+        for p in self.patches:
+            p.start()
+        self.session = OBSSession("127.0.0.1", 4455, "secret")
+
+    def teardown_method(self):
+        """Stop patches."""
+        for p in self.patches:
+            p.stop()
+
+    def test_connects_once_across_commands(self):
+        """Test repeated requests reuse one authenticated connection."""
+        self.session.call("start_record")
+        self.session.call("stop_record")
+        self.session.connect()
+
+        assert obs_session.ReqClient.call_count == 1
+        assert obs_session.EventClient.call_count == 1
+        self.event_client.callback.register.assert_called_once_with(self.session.on_record_state_changed)
+
+    def test_recording_state_cached_from_events(self):
+        """Test RecordStateChanged events answer is_recording without a status request."""
+        assert self.session.is_recording() is False
+        self.session.on_record_state_changed(
+            SimpleNamespace(output_active=False, output_state="OBS_WEBSOCKET_OUTPUT_STARTING"))
+        assert self.session.is_recording() is True
+        self.session.on_record_state_changed(
+            SimpleNamespace(output_active=False, output_state="OBS_WEBSOCKET_OUTPUT_STOPPED"))
+
+        assert self.session.is_recording() is False
+        # Only the first call, before any event, polled OBS
+        assert self.req_client.get_record_status.call_count == 1
+
+    def test_polls_when_event_subscription_is_down(self):
+        """Test a dead event thread makes the cached state untrusted."""
+        self.session.is_recording()
+        self.event_client.worker.is_alive.return_value = False
+        resubscribed = MagicMock()
+        obs_session.EventClient.return_value = resubscribed
+
+        self.session.is_recording()
+
+        assert self.req_client.get_record_status.call_count == 2
+        self.event_client.disconnect.assert_called_once()
+        resubscribed.callback.register.assert_called_once()
+
+    def test_reconnects_after_dropped_connection(self):
+        """Test a failed send reconnects and retries once."""
+        self.req_client.start_record.side_effect = [BrokenPipeError("closed"), None]
+
+        self.session.call("start_record")
+
+        assert obs_session.ReqClient.call_count == 2
+        assert self.req_client.start_record.call_count == 2
+        self.req_client.disconnect.assert_called_once()
+
+    def test_request_errors_do_not_reconnect(self):
+        """Test errors reported by OBS are raised without reconnecting."""
+        self.req_client.stop_record.side_effect = obs_session.OBSSDKRequestError("StopRecord", 501, "not active")
+
+        with pytest.raises(obs_session.OBSSDKRequestError):
+            self.session.call("stop_record")
+
+        assert obs_session.ReqClient.call_count == 1
+
+    def test_controller_uses_shared_session(self, monkeypatch, tmp_path):
+        """Test OBSController start/stop reuse the session and skip status polls."""
+        from services.obs_controller import OBSController
+
+        monkeypatch.setenv("OBS_DRY_RUN", "false")
+        monkeypatch.setenv("OBS_HOST", "127.0.0.1")
+        monkeypatch.setenv("OBS_PORT", "4455")
+        monkeypatch.setenv("OBS_PASSWORD", "secret")
+        monkeypatch.setenv("OBS_SCENE", "")
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setattr(obs_session, "_sessions", {})
+
+        assert OBSController().start_recording().info == {"started_by_us": True}
+        assert OBSController().stop_recording().ok
+
+        assert obs_session.ReqClient.call_count == 1
+        self.req_client.get_record_status.assert_called_once()
+        self.req_client.start_record.assert_called_once()
+        self.req_client.stop_record.assert_called_once()
+        self.req_client.disconnect.assert_not_called()
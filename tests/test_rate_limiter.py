@@ -0,0 +1,190 @@
+"""
+Tests for the shared provider rate limiter.
+"""
+
+import time
+import tracemalloc
+from unittest.mock import patch, MagicMock
+
+from services.rate_limiter import (
+    RateLimiter,
+    SlidingWindowLimiter,
+    get_rate_limiter,
+    retry_delay,
+    send_with_rate_limit,
+)
+
+
+def _response(status_code=200, headers=None):
+    """Build a mocked httpx response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+    
+    def test_acquire_within_budget_does_not_wait(self):
+        """Test requests within the bucket are sent immediately."""
+        limiter = RateLimiter("test", limit=5, window=60.0)
+        with patch('services.rate_limiter.time.sleep') as mock_sleep:
+            for _ in range(5):
+                limiter.acquire()
+            mock_sleep.assert_not_called()
+    
+    def test_acquire_waits_when_bucket_empty(self):
+        """Test the limiter paces requests once the bucket is drained."""
+        limiter = RateLimiter("test", limit=100, window=1.0)
+        limiter.tokens = 0.0
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start >= 0.005
+    
+    def test_learns_from_twitch_headers(self):
+        """Test Ratelimit-* headers update capacity and remaining tokens."""
+        limiter = RateLimiter("twitch", limit=800, window=60.0)
+        limiter.update_from_headers({"Ratelimit-Limit": "120", "Ratelimit-Remaining": "3"})
+        assert limiter.capacity == 120
+        assert limiter.tokens <= 3
+    
+    def test_exhausted_budget_blocks_until_reset(self):
+        """Test X-RateLimit-Remaining of zero blocks until the reset time."""
+        limiter = RateLimiter("github", limit=5000, window=3600.0)
+        limiter.update_from_headers({
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(time.time() + 30),
+        })
+        wait = limiter._try_acquire()
+        assert 25 < wait <= 30
+    
+    def test_registry_shares_limiter_per_provider(self):
+        """Test all callers of a provider share one limiter."""
+        assert get_rate_limiter("twitch") is get_rate_limiter("twitch")
+        assert get_rate_limiter("twitch") is not get_rate_limiter("github")
+
+
+class TestSendWithRateLimit:
+    """Test cases for request helpers."""
+    
+    def test_retry_delay_prefers_retry_after(self):
+        """Test Retry-After wins over reset and backoff."""
+        response = _response(429, {"Retry-After": "7", "Ratelimit-Reset": str(time.time() + 100)})
+        assert retry_delay(response, attempt=0) == 7.0
+    
+    def test_retry_delay_backoff(self):
+        """Test exponential backoff is used without server hints."""
+        response = _response(429)
+        assert 3.6 <= retry_delay(response, attempt=2) <= 4.4
+    
+    def test_retries_429_then_succeeds(self):
+        """Test a 429 is retried after backing off."""
+        limiter = RateLimiter("test", limit=10, window=1.0)
+        send = MagicMock(side_effect=[_response(429, {"Retry-After": "0.01"}), _response(200)])
+        
+        response = send_with_rate_limit(limiter, send)
+        
+        assert response.status_code == 200
+        assert send.call_count == 2
+    
+    def test_gives_up_after_max_attempts(self):
+        """Test the last 429 response is returned after max attempts."""
+        limiter = RateLimiter("test", limit=10, window=1.0)
+        send = MagicMock(return_value=_response(429, {"Retry-After": "0"}))
+        
+        response = send_with_rate_limit(limiter, send, max_attempts=2)
+        
+        assert response.status_code == 429
+        assert send.call_count == 2
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestSlidingWindowLimiter:
+    """Test cases for SlidingWindowLimiter."""
+
+    def setup_method(self):
+        """Set up a 5-per-60s limiter on a fake clock."""
+        self.clock = FakeClock(now=60.0 * 100)  # Start of a window
+        self.limiter = SlidingWindowLimiter(5, 60.0, max_keys=100, clock=self.clock)
+
+    def test_limit_enforced_per_key(self):
+        """Test the sixth request in a window is refused, independently per key."""
+        assert all(self.limiter.hit("1.1.1.1")[0] for _ in range(5))
+
+        allowed, retry_after = self.limiter.hit("1.1.1.1")
+
+        assert not allowed
+        assert 0 < retry_after <= 60
+        assert self.limiter.hit("2.2.2.2") == (True, 0.0)
+
+    def test_previous_window_slides_out(self):
+        """Test requests from the previous window count in proportion to their overlap."""
+        for _ in range(5):
+            self.limiter.hit("ip")
+
+        self.clock.now += 60 + 6  # 10% into the next window: 5 * 0.9 = 4.5 still counted
+        assert self.limiter.hit("ip")[0]
+        allowed, retry_after = self.limiter.hit("ip")
+        assert not allowed
+
+        self.clock.now += retry_after + 0.01
+        assert self.limiter.hit("ip")[0]
+
+    def test_idle_keys_reset(self):
+        """Test a key idle for more than a window starts with a full budget."""
+        for _ in range(5):
+            self.limiter.hit("ip")
+
+        self.clock.now += 125
+        assert all(self.limiter.hit("ip")[0] for _ in range(5))
+
+    def test_lru_eviction_bounds_keys(self):
+        """Test the key table never exceeds max_keys and keeps recent clients."""
+        for i in range(1000):
+            self.limiter.hit(f"10.0.{i // 256}.{i % 256}")
+            self.limiter.hit("busy")
+
+        assert len(self.limiter) == 100
+        assert "busy" in self.limiter._entries
+
+    def test_idle_keys_expire_without_pressure(self):
+        """Test keys unseen for two windows are dropped as new traffic arrives."""
+        for i in range(10):
+            self.limiter.hit(f"old-{i}")
+
+        self.clock.now += 180
+        for i in range(10):
+            self.limiter.hit(f"new-{i}")
+
+        assert len(self.limiter) == 10
+
+    def test_memory_constant_under_unique_clients(self):
+        """Load test: memory stays flat as the number of distinct clients grows."""
+        limiter = SlidingWindowLimiter(5, 60.0, max_keys=1000, clock=self.clock)
+
+        def flood(start, count):
+            for i in range(start, start + count):
+                limiter.hit(f"client-{i}")
+
+        tracemalloc.start()
+        try:
+            flood(0, 5_000)
+            baseline, _ = tracemalloc.get_traced_memory()
+            flood(5_000, 50_000)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert len(limiter) == 1000
+        # Ten times the clients, same footprint (allow slack for allocator noise)
+        assert after - baseline < 64 * 1024
@@ -0,0 +1,90 @@
+"""
+Tests for in-process story recording control.
+"""
+
+import time
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.recording import RecordingError, record_story
+from services.story_state import StoryState
+
+
+def _result(ok=True, error=None):
+    res = MagicMock()
+    res.ok = ok
+    res.error = error
+    return res
+
+
+class TestRecordStory:
+    """Test cases for record_story."""
+
+    def setup_method(self):
+        """Set up mocked OBS and story state."""
+        self.state = MagicMock(spec=StoryState)
+        self.obs = MagicMock()
+        self.obs.start_recording.return_value = _result()
+        self.obs.stop_recording.return_value = _result()
+        self.date = datetime(2025, 1, 15, tzinfo=timezone.utc)
+
+    def test_start_records_state(self):
+        """Test starting begins OBS recording and persists the story state."""
+        message = record_story("pr-1", "start", self.date, obs=self.obs, state=self.state)
+
+        assert message == "recording started for pr-1"
+        self.obs.start_recording.assert_called_once()
+        self.state.begin_recording.assert_called_once_with(self.date, "pr-1", assume_utc=True)
+
+    def test_start_rolls_back_obs_on_state_failure(self):
+        """Test OBS is stopped again if the story state can't be updated."""
+        self.state.begin_recording.side_effect = KeyError("pr-1")
+
+        with pytest.raises(RecordingError, match="Failed to begin recording"):
+            record_story("pr-1", "start", self.date, obs=self.obs, state=self.state)
+
+        self.obs.stop_recording.assert_called_once()
+
+    def test_obs_failure_is_reported(self):
+        """Test OBS errors surface as RecordingError without touching state."""
+        self.obs.stop_recording.return_value = _result(ok=False, error="not recording")
+
+        with pytest.raises(RecordingError, match="not recording"):
+            record_story("pr-1", "stop", self.date, obs=self.obs, state=self.state)
+
+        self.state.end_recording.assert_not_called()
+
+    def test_stop_missing_story(self):
+        """Test stopping an unknown story is a RecordingError."""
+        self.state.end_recording.side_effect = FileNotFoundError("no digest")
+
+        with pytest.raises(RecordingError, match="Failed to end recording"):
+            record_story("pr-1", "stop", self.date, obs=self.obs, state=self.state)
+
+    def test_unexpected_errors_become_recording_errors(self):
+        """Test OBS exceptions and any state failure on stop are RecordingErrors."""
+        self.obs.start_recording.side_effect = ConnectionRefusedError("OBS closed")
+        with pytest.raises(RecordingError, match="OBS start failed"):
+            record_story("pr-1", "start", self.date, obs=self.obs, state=self.state)
+
+        self.state.end_recording.side_effect = PermissionError("read-only")
+        with pytest.raises(RecordingError, match="Failed to end recording"):
+            record_story("pr-1", "stop", self.date, obs=self.obs, state=self.state)
+
+    def test_expired_deadline_skips_obs(self):
+        """Test a command that waited past its caller's timeout never touches OBS."""
+        with pytest.raises(RecordingError, match="OBS was not touched"):
+            record_story("pr-1", "start", self.date, obs=self.obs, state=self.state,
+                         deadline=time.monotonic() - 1)
+
+        self.obs.start_recording.assert_not_called()
+        self.state.begin_recording.assert_not_called()
+
+    def test_invalid_action(self):
+        """Test unknown actions are rejected before OBS is touched."""
+        with pytest.raises(ValueError):
+            record_story("pr-1", "pause", self.date, obs=self.obs, state=self.state)
+
+        self.obs.start_recording.assert_not_called()
@@ -541,3 +541,23 @@ class TestRelatedPostsService:
             
             # Should filter out invalid posts
             assert len(related_posts) == 0  # Both posts are invalid (empty title, empty tags)
+    
+    def test_remote_fetch_uses_shared_github_limiter(self, related_service, monkeypatch):
+        """Test every remote posts request goes through the process-wide GitHub limiter."""
+        from unittest.mock import MagicMock
+        from services.rate_limiter import get_rate_limiter
+        
+        monkeypatch.setenv("GITHUB_TOKEN", "token")
+        listing = MagicMock(status_code=200, headers={})
+        listing.json.return_value = [{"type": "dir", "name": "2025-01-10"}, {"type": "dir", "name": "2025-01-11"}]
+        digest = MagicMock(status_code=404, headers={})
+        client = MagicMock()
+        client.get.side_effect = [listing, digest, digest]
+        
+        assert related_service.rate_limiter is get_rate_limiter("github")
+        with patch("services.related.get_client", return_value=client), \
+             patch.object(related_service.rate_limiter, "acquire") as acquire:
+            assert related_service._fetch_published_posts_from_remote("test/repo") == []
+        
+        assert client.get.call_count == 3
+        assert acquire.call_count == 3
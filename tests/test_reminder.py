@@ -0,0 +1,130 @@
+"""
+Tests for the incremental explainer reminder index.
+"""
+
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from services import serialization
+from services.reminder import REMINDER_INDEX_NAME, ReminderIndex
+from services.story_state import StoryState
+
+NOW = datetime(2025, 8, 28, 12, 0, tzinfo=timezone.utc)
+
+
+def _write_digest(data_dir, date_str, packets):
+    day_dir = data_dir / date_str
+    day_dir.mkdir(parents=True, exist_ok=True)
+    path = day_dir / f"PRE-CLEANED-{date_str}_digest.json"
+    path.write_text(json.dumps({"date": date_str, "story_packets": packets}))
+    return path
+
+
+def _packet(story_id, merged_at, required=True, status="missing"):
+    return {
+        "id": story_id,
+        "title_human": f"Story {story_id}",
+        "merged_at": merged_at.isoformat(),
+        "explainer": {"required": required, "status": status},
+    }
+
+
+class TestReminderIndex:
+    """Test cases for ReminderIndex."""
+
+    def setup_method(self):
+        """Set up a data directory with one digest."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.data_dir = self.temp_dir / "blogs"
+        self.digest = _write_digest(self.data_dir, "2025-08-27", [
+            _packet("overdue", NOW - timedelta(hours=30)),
+            _packet("recent", NOW - timedelta(hours=2)),
+            _packet("optional", NOW - timedelta(hours=30), required=False),
+            _packet("recorded", NOW - timedelta(hours=30), status="recorded"),
+        ])
+        self.sent = []
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_reminds_overdue_stories_once(self):
+        """Test only overdue required explainers are reminded, and only once."""
+        index = ReminderIndex(self.data_dir)
+
+        assert index.tick(NOW, self.sent.append) == 1
+        assert index.tick(NOW + timedelta(minutes=30), self.sent.append) == 0
+
+        assert len(self.sent) == 1
+        assert "`overdue`" in self.sent[0]
+        assert [entry["id"] for entry in index.pending()] == ["recent"]
+
+    def test_pending_story_comes_due_later(self):
+        """Test pending stories are sent when their due time passes."""
+        index = ReminderIndex(self.data_dir)
+        index.tick(NOW, self.sent.append)
+
+        assert index.tick(NOW + timedelta(hours=23), self.sent.append) == 1
+        assert "`recent`" in self.sent[-1]
+
+    def test_unchanged_digests_are_not_parsed(self):
+        """Test a tick with no changes only stats the digests."""
+        index = ReminderIndex(self.data_dir)
+        index.tick(NOW, self.sent.append)
+
+        with patch("services.reminder.serialization.load_file") as load:
+            index.tick(NOW, self.sent.append)
+
+        load.assert_not_called()
+
+    def test_changed_digest_is_reindexed(self):
+        """Test rewritten digests are re-parsed and their stories replaced."""
+        index = ReminderIndex(self.data_dir)
+        index.tick(NOW, self.sent.append)
+
+        _write_digest(self.data_dir, "2025-08-27", [
+            _packet("overdue", NOW - timedelta(hours=30)),
+            _packet("recent", NOW - timedelta(hours=2), status="recorded"),
+            _packet("new", NOW - timedelta(hours=26)),
+        ])
+        sent = index.tick(NOW, self.sent.append)
+
+        assert sent == 1
+        assert "`new`" in self.sent[-1]
+        assert index.pending() == []
+
+    def test_recording_state_removes_pending_story(self):
+        """Test starting a recording clears the reminder via the story state store."""
+        index = ReminderIndex(self.data_dir)
+        index.tick(NOW, self.sent.append)
+
+        StoryState(str(self.data_dir)).begin_recording(datetime(2025, 8, 27, tzinfo=timezone.utc), "recent")
+
+        assert index.tick(NOW + timedelta(hours=23), self.sent.append) == 0
+        assert index.pending() == []
+
+    def test_index_survives_restart(self):
+        """Test a new index loaded from disk doesn't re-notify or re-parse."""
+        ReminderIndex(self.data_dir).tick(NOW, self.sent.append)
+        assert (self.data_dir / REMINDER_INDEX_NAME).exists()
+
+        restarted = ReminderIndex(self.data_dir)
+        with patch("services.reminder.serialization.load_file", wraps=serialization.load_file) as load:
+            assert restarted.tick(NOW, self.sent.append) == 0
+
+        assert [call.args[0] for call in load.call_args_list] == [self.data_dir / REMINDER_INDEX_NAME]
+        assert [entry["id"] for entry in restarted.pending()] == ["recent"]
+
+    def test_deleted_digest_is_forgotten(self):
+        """Test stories from a removed digest are no longer pending."""
+        index = ReminderIndex(self.data_dir)
+        index.tick(NOW, self.sent.append)
+
+        self.digest.unlink()
+        index.tick(NOW, self.sent.append)
+
+        assert index.pending() == []
@@ -0,0 +1,167 @@
+"""
+Tests for the blog API conditional-GET response cache.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.response_cache import ResponseCache, stat_fingerprint
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.source = self.temp_dir / "2025-01-15_page.publish.json"
+        self.source.write_text('{"title": "Post"}')
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fingerprint_tracks_changes_and_missing_files(self):
+        """Test the fingerprint changes when a source changes or appears."""
+        missing = self.temp_dir / "draft.md"
+        before, last_modified = stat_fingerprint([self.source, missing])
+        assert last_modified == self.source.stat().st_mtime
+
+        missing.write_text("draft")
+        with_draft = stat_fingerprint([self.source, missing])[0]
+        assert with_draft != before
+
+        self.source.write_text('{"title": "Edited post"}')
+        os.utime(self.source, ns=(1, 1))
+        assert stat_fingerprint([self.source, missing])[0] != with_draft
+
+    def test_get_requires_matching_fingerprint(self):
+        """Test entries are only reused for unchanged sources."""
+        cache = ResponseCache(max_entries=4)
+        entry = cache.put(("blog", "2025-01-15"), "fp1", b'{"a":1}', 0.0)
+
+        assert cache.get(("blog", "2025-01-15"), "fp1") is entry
+        assert cache.get(("blog", "2025-01-15"), "fp2") is None
+        assert entry.etag.startswith('"') and entry.etag.endswith('"')
+        assert entry.last_modified == "Thu, 01 Jan 1970 00:00:00 GMT"
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "fp", b"a", None)
+        cache.put("b", "fp", b"b", None)
+        cache.get("a", "fp")
+        cache.put("c", "fp", b"c", None)
+
+        assert len(cache) == 2
+        assert cache.get("b", "fp") is None
+        assert cache.get("a", "fp") is not None
+
+    def test_if_none_match(self):
+        """Test If-None-Match handling, including lists, weak tags and '*'."""
+        entry = ResponseCache(max_entries=1).put("a", "fp", b"body", None)
+
+        assert entry.matches(entry.etag)
+        assert entry.matches(f'"other", W/{entry.etag}')
+        assert entry.matches("*")
+        assert not entry.matches('"other"')
+        assert not entry.matches(None)
+
+
+class TestBlogApiConditionalGet:
+    """Test the webhook server's blog API serves cached, conditional responses."""
+
+    def setup_method(self):
+        """Set up a data dir with a publish package and a test client."""
+        fastapi_testclient = pytest.importorskip("fastapi.testclient")
+        import webhook_server
+
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.date = "2025-01-15"
+        day_dir = self.temp_dir / "data" / self.date
+        day_dir.mkdir(parents=True)
+        self.package_path = day_dir / f"{self.date}_page.publish.json"
+        self.package_path.write_text('{"title": "Post"}')
+
+        self.builder = MagicMock()
+        self.builder.data_dir = self.temp_dir / "data"
+        self.builder.blogs_dir = self.temp_dir / "blogs"
+        self.builder.io.load_publish_package.side_effect = lambda d: {"title": "Post"}
+
+        self.patches = [
+            patch.object(webhook_server, "_blog_builder", self.builder),
+            patch.object(webhook_server, "_blog_response_cache", ResponseCache(max_entries=8)),
+        ]
+        for p in self.patches:
+            p.start()
+        self.client = fastapi_testclient.TestClient(webhook_server.app)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeat_requests_hit_cache_and_304(self):
+        """Test hot posts come from memory and If-None-Match gets a 304."""
+        first = self.client.get(f"/api/blog/{self.date}")
+        assert first.status_code == 200
+        assert first.json() == {"title": "Post"}
+        etag = first.headers["etag"]
+        assert first.headers["last-modified"]
+
+        second = self.client.get(f"/api/blog/{self.date}")
+        assert second.headers["etag"] == etag
+
+        not_modified = self.client.get(f"/api/blog/{self.date}", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+
+        assert self.builder.io.load_publish_package.call_count == 1
+
+    def test_source_change_rebuilds(self):
+        """Test a changed publish package invalidates the cached response."""
+        etag = self.client.get(f"/api/blog/{self.date}").headers["etag"]
+
+        self.package_path.write_text('{"title": "Edited"}')
+        os.utime(self.package_path, ns=(1, 1))
+        self.builder.io.load_publish_package.side_effect = lambda d: {"title": "Edited"}
+        response = self.client.get(f"/api/blog/{self.date}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json() == {"title": "Edited"}
+        assert response.headers["etag"] != etag
+
+    def test_story_state_change_rebuilds_digest(self):
+        """Test recording a story invalidates the cached digest it is overlaid onto."""
+        from datetime import datetime, timezone
+
+        from services.story_state import StoryState
+
+        day_dir = self.builder.blogs_dir / self.date
+        day_dir.mkdir(parents=True)
+        (day_dir / f"PRE-CLEANED-{self.date}_digest.json").write_text(
+            '{"date": "2025-01-15", "story_packets": [{"id": "pr-1", "explainer": {"status": "missing"}}]}'
+        )
+        self.builder.build_normalized_digest.side_effect = lambda d: {"date": d}
+        etag = self.client.get(f"/api/blog/{self.date}/digest").headers["etag"]
+
+        StoryState(str(self.builder.blogs_dir)).begin_recording(datetime(2025, 1, 15, tzinfo=timezone.utc), "pr-1")
+        self.builder.build_normalized_digest.side_effect = lambda d: {"date": d, "recording": True}
+        response = self.client.get(f"/api/blog/{self.date}/digest", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["digest"] == {"date": self.date, "recording": True}
+        assert self.builder.build_normalized_digest.call_count == 2
+
+    def test_invalid_date_and_missing_post(self):
+        """Test invalid dates are 400 and missing posts are 404."""
+        self.builder.io.load_publish_package.side_effect = FileNotFoundError("missing")
+
+        assert self.client.get("/api/blog/not-a-date").status_code == 400
+        assert self.client.get("/api/blog/2025-01-16").status_code == 404
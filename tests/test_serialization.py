@@ -0,0 +1,73 @@
+"""
+Tests for the central JSON serialization module.
+"""
+
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from models import GitHubEvent
+from services import serialization
+
+
+SAMPLE = {
+    "title": "Café ☕",
+    "when": datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc),
+    "day": date(2025, 1, 15),
+    "path": Path("blogs/2025-01-15"),
+    "tags": ("a", "b"),
+    "nested": {"count": 3, "ratio": 0.5, "empty": [], "none": None},
+    "event": GitHubEvent(
+        id="1", type="PushEvent", repo="owner/repo", actor="octocat",
+        created_at=datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
+    ),
+}
+
+
+class TestSerialization:
+    """Test cases for services.serialization."""
+
+    def test_default_hook_converts_types(self):
+        """Test datetimes, paths, tuples and pydantic models are serialized."""
+        data = serialization.loads(serialization.dumps(SAMPLE))
+
+        assert data["when"] == "2025-01-15T10:00:00+00:00"
+        assert data["day"] == "2025-01-15"
+        assert data["path"] == "blogs/2025-01-15"
+        assert data["tags"] == ["a", "b"]
+        assert data["event"]["created_at"] == "2025-01-15T10:00:00Z"
+        assert data["title"] == "Café ☕"
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_stdlib_fallback_matches(self, compact):
+        """Test the stdlib fallback produces the same text as the fast path."""
+        fast = serialization.dumps(SAMPLE, compact=compact)
+        with patch.object(serialization, "orjson", None):
+            fallback = serialization.dumps(SAMPLE, compact=compact)
+            assert serialization.loads(fallback) == json.loads(fast)
+
+        assert fast == fallback
+
+    def test_pretty_output_matches_indent_2(self):
+        """Test the default output matches json.dumps(indent=2)."""
+        data = {"a": [1, 2], "b": {"c": "d"}}
+        assert serialization.dumps(data) == json.dumps(data, indent=2)
+        assert serialization.dumps(data, compact=True) == '{"a":[1,2],"b":{"c":"d"}}'
+
+    def test_loads_raises_json_decode_error(self):
+        """Test invalid input raises json.JSONDecodeError on both paths."""
+        with pytest.raises(json.JSONDecodeError):
+            serialization.loads(b'{"a": ')
+        with patch.object(serialization, "orjson", None):
+            with pytest.raises(json.JSONDecodeError):
+                serialization.loads('{"a": ')
+
+    def test_compact_artifacts_flag(self):
+        """Test JSON_COMPACT_ARTIFACTS toggles compact internal artifacts."""
+        with patch.dict("os.environ", {"JSON_COMPACT_ARTIFACTS": "true"}):
+            assert serialization.compact_artifacts()
+        with patch.dict("os.environ", {"JSON_COMPACT_ARTIFACTS": "false"}):
+            assert not serialization.compact_artifacts()
@@ -0,0 +1,188 @@
+"""
+Tests for the pipeline stage graph.
+"""
+
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from services.stage_graph import Stage, StageGraph, source_fingerprint
+
+
+class TestStageGraph:
+    """Test cases for StageGraph."""
+
+    def setup_method(self):
+        """Set up a raw -> normalized -> (videos, enriched) -> publish graph."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.date = "2025-01-15"
+        self.day_dir = self.temp_dir / self.date
+        self.day_dir.mkdir()
+        (self.day_dir / "events.ndjson").write_text('{"id": "1"}\n')
+        self.calls = []
+
+        def stage(name, deps=()):
+            def run(target_date):
+                self.calls.append(name)
+                (self.day_dir / f"{name}.json").write_text("{}")
+                return name
+            return Stage(
+                name=name,
+                deps=deps,
+                run=run,
+                outputs=lambda d: [self.day_dir / f"{name}.json"],
+                load=lambda d: f"{name} (cached)",
+            )
+
+        self.graph = StageGraph(
+            [
+                stage("publish", ("enriched", "videos")),
+                stage("raw"),
+                stage("normalized", ("raw",)),
+                stage("videos", ("normalized",)),
+                stage("enriched", ("normalized",)),
+            ],
+            manifest_dir=lambda d: self.day_dir,
+            sources=lambda d: source_fingerprint(self.day_dir),
+        )
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_dependency_order(self):
+        """Test stages run after their dependencies."""
+        order = self.graph.order
+        assert order.index("raw") < order.index("normalized") < order.index("enriched") < order.index("publish")
+        assert order.index("videos") < order.index("publish")
+
+    def test_second_run_is_all_cache_hits(self):
+        """Test unchanged inputs and code skip every stage."""
+        first = self.graph.run(self.date)
+        assert {r.status for r in first.values()} == {"ran"}
+        assert first["publish"].value == "publish"
+
+        self.calls.clear()
+        second = self.graph.run(self.date)
+
+        assert self.calls == []
+        assert {r.status for r in second.values()} == {"hit"}
+        assert second["publish"].value == "publish (cached)"
+
+    def test_new_source_data_reruns_everything_downstream(self):
+        """Test a late-arriving event invalidates every stage fed by raw data."""
+        self.graph.run(self.date)
+        self.calls.clear()
+
+        with open(self.day_dir / "events.ndjson", "a") as f:
+            f.write('{"id": "2"}\n')
+        results = self.graph.run(self.date)
+
+        assert {r.status for r in results.values()} == {"ran"}
+        assert len(self.calls) == 5
+
+    def test_missing_output_reruns_stage_and_dependents(self):
+        """Test only a stage with a missing artifact and its dependents rerun."""
+        self.graph.run(self.date)
+        self.calls.clear()
+
+        (self.day_dir / "videos.json").unlink()
+        results = self.graph.run(self.date)
+
+        assert sorted(self.calls) == ["publish", "videos"]
+        assert results["enriched"].status == "hit"
+
+    def test_code_change_invalidates_stage(self):
+        """Test a changed code version reruns the stage."""
+        self.graph.run(self.date)
+        self.calls.clear()
+
+        self.graph.stages["enriched"].code = ("services.serialization",)
+        results = self.graph.run(self.date)
+
+        assert sorted(self.calls) == ["enriched", "publish"]
+        assert results["videos"].status == "hit"
+
+    def test_until_runs_only_ancestors(self):
+        """Test partial runs stop at the requested stage."""
+        results = self.graph.run(self.date, until="normalized")
+
+        assert list(results) == ["raw", "normalized"]
+        assert self.calls == ["raw", "normalized"]
+
+    def test_prior_results_propagate_to_dependents(self):
+        """Test a follow-up run reuses a partial run and reruns what depends on it."""
+        self.graph.run(self.date)
+        self.calls.clear()
+
+        (self.day_dir / "normalized.json").unlink()
+        ingest = self.graph.run(self.date, until="normalized")
+        results = self.graph.run(self.date, prior=ingest)
+
+        assert self.calls.count("normalized") == 1
+        assert sorted(self.calls) == ["enriched", "normalized", "publish", "videos"]
+        assert list(results) == self.graph.order
+        assert results["raw"].status == "hit"
+        assert {results[name].status for name in ("normalized", "videos", "enriched", "publish")} == {"ran"}
+
+    def test_failure_skips_dependents(self):
+        """Test a failing stage is reported and its dependents are skipped."""
+        def fail(target_date):
+            raise RuntimeError("AI unavailable")
+        self.graph.stages["enriched"].run = fail
+
+        results = self.graph.run(self.date)
+
+        assert results["enriched"].status == "failed"
+        assert results["enriched"].error == "AI unavailable"
+        assert results["publish"].status == "skipped"
+        assert results["videos"].status == "ran"
+
+    def test_adopt_existing_artifacts(self):
+        """Test artifacts produced without a manifest are adopted as fresh."""
+        for name in self.graph.order:
+            (self.day_dir / f"{name}.json").write_text("{}")
+
+        self.graph.adopt(self.date)
+        results = self.graph.run(self.date)
+
+        assert self.calls == []
+        assert {r.status for r in results.values()} == {"hit"}
+
+    def test_independent_stages_overlap(self):
+        """Test sibling stages run concurrently and their dependent waits for both."""
+        self.graph.max_parallel = 2
+        barrier = threading.Barrier(2, timeout=5)
+
+        def branch(name):
+            def run(target_date):
+                barrier.wait()  # Deadlocks (and times out) if the branches run serially
+                self.calls.append(name)
+                (self.day_dir / f"{name}.json").write_text("{}")
+                return name
+            return run
+
+        self.graph.stages["videos"].run = branch("videos")
+        self.graph.stages["enriched"].run = branch("enriched")
+
+        results = self.graph.run(self.date)
+
+        assert {r.status for r in results.values()} == {"ran"}
+        assert list(results) == self.graph.order
+        assert sorted(self.calls[2:4]) == ["enriched", "videos"]
+        assert self.calls[-1] == "publish"
+
+        self.calls.clear()
+        assert {r.status for r in self.graph.run(self.date).values()} == {"hit"}
+
+    def test_cycle_rejected(self):
+        """Test cyclic graphs are rejected."""
+        with pytest.raises(ValueError):
+            StageGraph(
+                [Stage("a", run=lambda d: None, deps=("b",)), Stage("b", run=lambda d: None, deps=("a",))],
+                manifest_dir=lambda d: self.day_dir,
+                sources=lambda d: "",
+            )
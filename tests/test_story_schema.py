@@ -0,0 +1,95 @@
+"""
+Tests for PR to clip pairing in story_schema.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from story_schema import ClipIndex, _calculate_pairing_score, pair_with_clip, PAIRING_THRESHOLD
+
+
+def _linear_pair(pr_event, clips, time_window_hours=2.0):
+    """Reference implementation: score every clip in input order."""
+    pr_time = datetime.fromisoformat(pr_event["created_at"].replace("Z", "+00:00"))
+    best_clip, best_score = None, 0.0
+    for clip in clips:
+        clip_time = datetime.fromisoformat(clip["created_at"].replace("Z", "+00:00"))
+        time_diff = abs((pr_time - clip_time).total_seconds() / 3600)
+        if time_diff > time_window_hours:
+            continue
+        score = _calculate_pairing_score(pr_event, clip, time_diff)
+        if score > best_score:
+            best_clip, best_score = clip, score
+    if best_clip and best_score >= PAIRING_THRESHOLD:
+        return best_clip["id"], best_score
+    return None, None
+
+
+class TestClipIndex:
+    """Test cases for ClipIndex pairing."""
+
+    def setup_method(self):
+        """Set up a day of clips and merged PRs."""
+        self.base = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+        words = ["auth", "cache", "login", "render", "video", "fix", "bug", "api", "blog", "deploy"]
+        rng = random.Random(7)
+        self.clips = [
+            {
+                "id": f"clip_{i}",
+                "created_at": (self.base + timedelta(minutes=rng.randint(-600, 600))).isoformat().replace("+00:00", "Z"),
+                "title": " ".join(rng.sample(words, 3)),
+                "transcript": " ".join(rng.sample(words, 4)),
+            }
+            for i in range(120)
+        ]
+        self.prs = [
+            {
+                "id": f"pr_{i}",
+                "created_at": (self.base + timedelta(minutes=rng.randint(-600, 600))).isoformat().replace("+00:00", "Z"),
+                "title": " ".join(rng.sample(words, 3)),
+                "body": " ".join(rng.sample(words, 2)),
+            }
+            for i in range(80)
+        ]
+
+    def test_matches_linear_scan(self):
+        """Test the indexed pairing picks the same clip and score as scoring every clip."""
+        index = ClipIndex(self.clips)
+        paired = 0
+        for pr in self.prs:
+            expected_id, expected_score = _linear_pair(pr, self.clips)
+            pairing = index.pair(pr)
+            assert pairing.clip_id == expected_id
+            if expected_id is not None:
+                paired += 1
+                assert abs(pairing.score - expected_score) < 1e-9
+                assert not pairing.needs_broll
+            else:
+                assert pairing.needs_broll
+        assert paired > 0
+
+    def test_window_excludes_distant_clips(self):
+        """Test clips outside the time window are never paired."""
+        pr = {"created_at": "2025-01-15T12:00:00Z", "title": "fix auth", "body": ""}
+        clips = [
+            {"id": "far", "created_at": "2025-01-15T15:00:00Z", "title": "fix auth", "transcript": ""},
+            {"id": "near", "created_at": "2025-01-15T12:10:00Z", "title": "fix auth", "transcript": ""},
+        ]
+
+        assert pair_with_clip(pr, clips).clip_id == "near"
+        assert pair_with_clip(pr, clips[:1]).needs_broll
+
+    def test_ties_go_to_first_listed_clip(self):
+        """Test equal scores keep the clip listed first, regardless of time order."""
+        pr = {"created_at": "2025-01-15T12:00:00Z", "title": "fix auth", "body": ""}
+        clips = [
+            {"id": "later", "created_at": "2025-01-15T12:30:00Z", "title": "fix auth", "transcript": ""},
+            {"id": "earlier", "created_at": "2025-01-15T11:30:00Z", "title": "fix auth", "transcript": ""},
+        ]
+
+        assert pair_with_clip(pr, clips).clip_id == "later"
+
+    def test_empty_clips(self):
+        """Test pairing without clips needs b-roll."""
+        pr = {"created_at": "2025-01-15T12:00:00Z", "title": "fix auth", "body": ""}
+        assert pair_with_clip(pr, []).needs_broll
@@ -20,7 +20,7 @@ def test_state_roundtrip(tmp_path: Path):
     s = StoryState(data_dir=str(tmp_path/"data"))
     s.begin_recording(date, "story_1")
     s.end_recording(date, "story_1", raw_path="raw/foo.mkv")
-    obj = json.loads(p.read_text())
+    obj, _ = s.load_digest(date)
     pkt = obj["story_packets"][0]
     assert pkt["explainer"]["status"] == "recorded"
     assert pkt["video"]["status"] == "pending"
@@ -70,7 +70,7 @@ def test_naive_datetime_with_assume_utc(tmp_path: Path):
     s.end_recording(naive_date, "story_1", assume_utc=True)
     
     # Verify the state was updated
-    obj = json.loads(p.read_text())
+    obj, _ = s.load_digest(naive_date.replace(tzinfo=timezone.utc))
     pkt = obj["story_packets"][0]
     assert pkt["explainer"]["status"] == "recorded"
     assert pkt["video"]["status"] == "pending"
@@ -101,7 +101,7 @@ def test_bounded_recording_completion(tmp_path: Path):
     s.complete_bounded_recording(date, "story_1", duration)
     
     # Verify the state was updated correctly
-    obj = json.loads(p.read_text())
+    obj, _ = s.load_digest(date)
     pkt = obj["story_packets"][0]
     
     # Check explainer status
@@ -120,3 +120,99 @@ def test_bounded_recording_completion(tmp_path: Path):
     iso_pattern = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}.\d{6}\+\d{2}:\d{2}$'
     assert re.match(iso_pattern, pkt["video"]["started_at"])
     assert re.match(iso_pattern, pkt["video"]["ended_at"])
+
+
+def _seed_digest(tmp_path: Path, date_str: str, story_ids) -> Path:
+    ddir = tmp_path / "data" / date_str
+    ddir.mkdir(parents=True)
+    p = ddir / f"PRE-CLEANED-{date_str}_digest.json"
+    p.write_text(json.dumps({
+        "version": "2", "date": date_str,
+        "story_packets": [{"id": sid, "explainer": {"status": "missing", "required": True}} for sid in story_ids]
+    }))
+    return p
+
+
+def test_updates_do_not_rewrite_digest(tmp_path: Path):
+    """Test state is stored as rows and merged on read, leaving the digest file alone."""
+    date = datetime(2025, 8, 27, tzinfo=timezone.utc)
+    p = _seed_digest(tmp_path, "2025-08-27", ["story_1", "story_2"])
+    before = p.read_bytes()
+    s = StoryState(data_dir=str(tmp_path / "data"))
+
+    packet = s.begin_recording(date, "story_1")
+
+    assert p.read_bytes() == before
+    assert packet["explainer"] == {"status": "recording", "required": True, "started_at": packet["explainer"]["started_at"]}
+    obj, path = s.load_digest(date)
+    assert path == p
+    assert [pkt["explainer"]["status"] for pkt in obj["story_packets"]] == ["recording", "missing"]
+
+
+def test_concurrent_updates_are_not_lost(tmp_path: Path):
+    """Test simultaneous recordings for different stories all persist."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    date = datetime(2025, 8, 27, tzinfo=timezone.utc)
+    story_ids = [f"story_{i}" for i in range(16)]
+    _seed_digest(tmp_path, "2025-08-27", story_ids)
+
+    def record(story_id):
+        s = StoryState(data_dir=str(tmp_path / "data"))
+        s.begin_recording(date, story_id)
+        s.end_recording(date, story_id, raw_path=f"raw/{story_id}.mkv")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(record, story_ids))
+
+    obj, _ = StoryState(data_dir=str(tmp_path / "data")).load_digest(date)
+    assert all(pkt["explainer"]["status"] == "recorded" for pkt in obj["story_packets"])
+    assert [pkt["video"]["raw_recording_path"] for pkt in obj["story_packets"]] == [f"raw/{sid}.mkv" for sid in story_ids]
+
+
+def test_rendered_video_in_digest_wins(tmp_path: Path):
+    """Test a video the renderer marked rendered in the digest isn't masked by stored state."""
+    date = datetime(2025, 8, 27, tzinfo=timezone.utc)
+    p = _seed_digest(tmp_path, "2025-08-27", ["story_1"])
+    s = StoryState(data_dir=str(tmp_path / "data"))
+    s.end_recording(date, "story_1")
+
+    obj = json.loads(p.read_text())
+    obj["story_packets"][0]["video"] = {"status": "rendered", "path": "out/story_1.mp4"}
+    p.write_text(json.dumps(obj))
+
+    merged, _ = s.load_digest(date)
+    assert merged["story_packets"][0]["video"] == {"status": "rendered", "path": "out/story_1.mp4"}
+    assert merged["story_packets"][0]["explainer"]["status"] == "recorded"
+
+
+def test_missing_story_and_digest(tmp_path: Path):
+    """Test unknown stories and dates raise like before."""
+    date = datetime(2025, 8, 27, tzinfo=timezone.utc)
+    _seed_digest(tmp_path, "2025-08-27", ["story_1"])
+    s = StoryState(data_dir=str(tmp_path / "data"))
+
+    with pytest.raises(KeyError):
+        s.begin_recording(date, "story_9")
+    with pytest.raises(FileNotFoundError):
+        s.begin_recording(datetime(2025, 8, 28, tzinfo=timezone.utc), "story_1")
+
+
+def test_blog_builder_reads_overlaid_state(tmp_path: Path, monkeypatch):
+    """Test digests served by the blog builder include state recorded after they were written."""
+    from services.blog import BlogDigestBuilder
+
+    monkeypatch.chdir(tmp_path)
+    date = datetime(2025, 8, 27, tzinfo=timezone.utc)
+    p = _seed_digest(tmp_path, "2025-08-27", ["story_1"])
+    obj = json.loads(p.read_text())
+    obj["frontmatter"] = {"schema": {"@type": "BlogPosting"}}
+    p.write_text(json.dumps(obj))
+    StoryState(data_dir=str(tmp_path / "data")).begin_recording(date, "story_1")
+
+    builder = BlogDigestBuilder()
+    builder.update_paths(tmp_path / "raw", tmp_path / "data")
+    digest = builder.build_normalized_digest("2025-08-27")
+
+    assert digest["story_packets"][0]["explainer"]["status"] == "recording"
+    assert json.loads(p.read_text())["story_packets"][0]["explainer"]["status"] == "missing"
@@ -0,0 +1,71 @@
+"""
+Tests for concurrent multi-source sync.
+"""
+
+import time
+from unittest.mock import patch
+
+from services.sync import SyncConfig, SyncSource, load_sync_config, sync_sources
+
+
+class TestSyncConfig:
+    """Test cases for building sync configuration."""
+    
+    def test_sources_deduplicated(self):
+        """Test duplicate sources are collapsed and order preserved."""
+        config = SyncConfig(broadcasters=["a", "a", " b "], github_repos=["o/r"])
+        assert [s.label for s in config.sources()] == ["twitch:a", "twitch:b", "github_repo:o/r"]
+    
+    def test_env_lists(self):
+        """Test comma-separated environment lists are used when no options are given."""
+        with patch.dict('os.environ', {
+            'TWITCH_BROADCASTERS': 'one, two',
+            'GITHUB_USER': 'octocat',
+        }, clear=True):
+            config = load_sync_config()
+        assert config.broadcasters == ["one", "two"]
+        assert config.github_users == ["octocat"]
+        assert config.github_repos == []
+    
+    def test_explicit_values_override_env(self):
+        """Test explicit sources take precedence over the environment."""
+        with patch.dict('os.environ', {'GITHUB_REPOS': 'env/repo'}, clear=True):
+            config = load_sync_config(github_repos=["cli/repo"])
+        assert config.github_repos == ["cli/repo"]
+
+
+class TestSyncSources:
+    """Test cases for running sources concurrently."""
+    
+    def test_runs_concurrently(self):
+        """Test total time tracks the slowest source, not the sum."""
+        def slow_sync(source, cache_manager, result):
+            time.sleep(0.2)
+            result.fetched = 1
+        
+        sources = [SyncSource("github_repo", f"owner/repo{i}") for i in range(4)]
+        with patch('services.sync._sync_github', side_effect=slow_sync), \
+             patch('services.sync.CacheManager'):
+            start = time.perf_counter()
+            results = sync_sources(sources, max_workers=4)
+            elapsed = time.perf_counter() - start
+        
+        assert elapsed < 0.6
+        assert all(r.ok and r.fetched == 1 for r in results)
+        assert all(r.duration_s >= 0.2 for r in results)
+    
+    def test_failure_is_isolated(self):
+        """Test one failing source does not affect the others."""
+        def sync(source, cache_manager, result):
+            if source.name == "bad":
+                raise RuntimeError("boom")
+            result.fetched = 2
+        
+        sources = [SyncSource("twitch", "bad"), SyncSource("twitch", "good")]
+        with patch('services.sync._sync_twitch', side_effect=sync), \
+             patch('services.sync.CacheManager'):
+            results = sync_sources(sources)
+        
+        assert [r.source.name for r in results] == ["bad", "good"]
+        assert results[0].error == "boom"
+        assert results[1].ok and results[1].fetched == 2
@@ -2,13 +2,36 @@
 Tests for transcription service.
 """
 
+import math
 import pytest
 import tempfile
 import subprocess
+import wave
+from array import array
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 
-from services.transcribe import TranscriptionService
+from services.transcribe import TranscriptionService, detect_speech_segments
+
+
+def _write_wav(path: Path, samples: array, sample_rate: int = 16000) -> None:
+    """Write 16-bit mono PCM samples to a WAV file."""
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
+
+
+def _tone(seconds: float, sample_rate: int = 16000) -> array:
+    """Generate a loud 440 Hz tone."""
+    return array('h', (int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+                       for i in range(int(seconds * sample_rate))))
+
+
+def _silence(seconds: float, sample_rate: int = 16000) -> array:
+    """Generate digital silence."""
+    return array('h', [0] * int(seconds * sample_rate))
 
 
 class TestTranscriptionService:
@@ -89,7 +112,7 @@ class TestTranscriptionService:
         with pytest.raises(RuntimeError, match="ffmpeg not found"):
             self.transcribe_service.extract_audio(video_path)
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_transcribe_audio_success(self, mock_client):
         """Test successful audio transcription."""
         mock_response = MagicMock()
@@ -102,7 +125,7 @@ class TestTranscriptionService:
         
         mock_client_instance = MagicMock()
         mock_client_instance.post.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         # Create temporary audio file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
@@ -129,7 +152,7 @@ class TestTranscriptionService:
         finally:
             audio_path.unlink()
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_transcribe_audio_api_error(self, mock_client):
         """Test audio transcription with API error."""
         mock_response = MagicMock()
@@ -142,7 +165,7 @@ class TestTranscriptionService:
         
         mock_client_instance = MagicMock()
         mock_client_instance.post.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         # Create temporary audio file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
@@ -155,7 +178,7 @@ class TestTranscriptionService:
         finally:
             audio_path.unlink()
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_transcribe_audio_http_error(self, mock_client):
         """Test audio transcription with HTTP error."""
         from httpx import HTTPStatusError
@@ -165,7 +188,7 @@ class TestTranscriptionService:
         
         mock_client_instance = MagicMock()
         mock_client_instance.post.side_effect = HTTPStatusError("400", request=None, response=mock_response)
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         # Create temporary audio file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
@@ -178,7 +201,7 @@ class TestTranscriptionService:
         finally:
             audio_path.unlink()
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_transcribe_audio_rate_limit_error(self, mock_client):
         """Test audio transcription with rate limit error (429)."""
         mock_response = MagicMock()
@@ -188,7 +211,7 @@ class TestTranscriptionService:
         
         mock_client_instance = MagicMock()
         mock_client_instance.post.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         # Create temporary audio file
         with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
@@ -259,7 +282,7 @@ class TestTranscriptionService:
         mock_extract.assert_called_once_with(video_path)
         mock_transcribe.assert_called_once_with(audio_path)
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_download_video_success(self, mock_client):
         """Test successful video download."""
         mock_response = MagicMock()
@@ -269,7 +292,7 @@ class TestTranscriptionService:
         
         mock_client_instance = MagicMock()
         mock_client_instance.stream.return_value.__enter__.return_value = mock_response
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         video_url = "https://example.com/video.mp4"
         output_path = Path("/tmp/video.mp4")
@@ -293,12 +316,12 @@ class TestTranscriptionService:
                 open_args, _ = mock_file.call_args
                 assert open_args[1] == "wb"
     
-    @patch('httpx.Client')
+    @patch('services.transcribe.get_client')
     def test_download_video_error(self, mock_client):
         """Test video download with error."""
         mock_client_instance = MagicMock()
         mock_client_instance.stream.side_effect = Exception("Download failed")
-        mock_client.return_value.__enter__.return_value = mock_client_instance
+        mock_client.return_value = mock_client_instance
         
         video_url = "https://example.com/video.mp4"
         output_path = Path("/tmp/video.mp4")
@@ -310,6 +333,70 @@ class TestTranscriptionService:
             mock_replace.assert_not_called()
             mock_file.assert_not_called()
     
+    def test_trim_silence_drops_dead_air(self, tmp_path):
+        """Test silence trimming keeps only the padded speech regions."""
+        audio_path = tmp_path / "audio.wav"
+        _write_wav(audio_path, _silence(2.0) + _tone(1.0) + _silence(3.0) + _tone(1.0) + _silence(1.0))
+        
+        trimmed_path = self.transcribe_service.trim_silence(audio_path)
+        
+        assert trimmed_path != audio_path
+        with wave.open(str(trimmed_path), 'rb') as wav:
+            trimmed_seconds = wav.getnframes() / wav.getframerate()
+        # Two 1s tones plus padding on either side
+        assert 2.0 <= trimmed_seconds < 3.0
+    
+    def test_trim_silence_no_speech_keeps_original(self, tmp_path):
+        """Test trimming is skipped when no speech is detected."""
+        audio_path = tmp_path / "audio.wav"
+        _write_wav(audio_path, _silence(2.0))
+        
+        trimmed_path = self.transcribe_service.trim_silence(audio_path)
+        
+        assert trimmed_path == audio_path
+    
+    def test_detect_speech_segments_bridges_short_gaps(self):
+        """Test short pauses between speech are not cut."""
+        samples = _tone(0.5) + _silence(0.3) + _tone(0.5)
+        segments = detect_speech_segments(samples, 16000, padding_ms=0, min_silence_ms=500)
+        assert len(segments) == 1
+    
+    def test_detect_speech_segments_without_audioop(self):
+        """Test the pure-Python frame RMS fallback finds the same segments."""
+        samples = _silence(1.0) + _tone(0.5) + _silence(1.0) + _tone(0.5)
+        expected = detect_speech_segments(samples, 16000)
+        
+        with patch('services.transcribe.audioop', None):
+            assert detect_speech_segments(samples, 16000) == expected
+        assert len(expected) == 2
+    
+    @patch.object(TranscriptionService, 'transcribe_audio')
+    def test_transcribe_speech_uses_trimmed_audio(self, mock_transcribe, tmp_path):
+        """Test the VAD pre-pass uploads trimmed audio and cleans it up."""
+        audio_path = tmp_path / "audio.wav"
+        _write_wav(audio_path, _silence(2.0) + _tone(1.0) + _silence(2.0))
+        mock_transcribe.return_value = "hello"
+        self.transcribe_service.vad_enabled = True
+        
+        transcript = self.transcribe_service._transcribe_speech(audio_path)
+        
+        assert transcript == "hello"
+        uploaded = mock_transcribe.call_args[0][0]
+        assert uploaded != audio_path
+        assert not uploaded.exists()
+        assert audio_path.exists()
+    
+    @patch.object(TranscriptionService, 'trim_silence')
+    @patch.object(TranscriptionService, 'transcribe_audio')
+    def test_transcribe_speech_disabled(self, mock_transcribe, mock_trim):
+        """Test the VAD pre-pass is skipped by default."""
+        mock_transcribe.return_value = "hello"
+        audio_path = Path("/tmp/audio.wav")
+        
+        assert self.transcribe_service._transcribe_speech(audio_path) == "hello"
+        mock_trim.assert_not_called()
+        mock_transcribe.assert_called_once_with(audio_path)
+    
     def test_cleanup_temp_files(self):
         """Test cleanup of temporary files."""
         with tempfile.NamedTemporaryFile(delete=False) as f1:
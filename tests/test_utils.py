@@ -322,6 +322,112 @@ class TestCacheManager:
         with pytest.raises(ValueError, match="Path traversal detected"):
             self.cache_manager.load_json("../evil.json")
 
+    def test_batch_defers_writes_until_commit(self):
+        """Test batched writes appear together at commit with one sync."""
+        with patch('services.utils.os.fsync') as mock_fsync:
+            with self.cache_manager.batch():
+                path1 = self.cache_manager.save_json("a.json", {"a": 1})
+                path2 = self.cache_manager.save_json("b.json", {"b": 2})
+                self.cache_manager.mark_seen("clip1", "twitch_clip")
+                self.cache_manager.mark_seen("event1", "github_event")
+                
+                # Nothing visible before commit
+                assert not path1.exists() and not path2.exists()
+                assert not self.cache_manager.seen_ids_file.exists()
+            
+            # One fsync per staged file (a.json, b.json, seen IDs) plus one per directory
+            assert mock_fsync.call_count == 3 + len({path1.parent, self.cache_manager.seen_ids_file.parent})
+        
+        assert json.loads(path1.read_text()) == {"a": 1}
+        assert json.loads(path2.read_text()) == {"b": 2}
+        saved = SeenIds(**json.loads(self.cache_manager.seen_ids_file.read_text()))
+        assert saved.twitch_clips == ["clip1"]
+        assert saved.github_events == ["event1"]
+        assert not list(path1.parent.glob("*.tmp"))
+    
+    def test_batch_rollback_discards_writes(self):
+        """Test an exception inside a batch discards staged writes and seen IDs."""
+        with pytest.raises(RuntimeError):
+            with self.cache_manager.batch():
+                path = self.cache_manager.save_json("a.json", {"a": 1})
+                self.cache_manager.mark_seen("clip1", "twitch_clip")
+                raise RuntimeError("boom")
+        
+        assert not path.exists()
+        assert not list(path.parent.glob("*.tmp"))
+        assert not self.cache_manager.is_seen("clip1", "twitch_clip")
+    
+    def test_rollback_keeps_other_threads_seen_ids(self):
+        """Test a failed batch only unmarks its own IDs, not those of a concurrent batch."""
+        import threading
+
+        marked, failed = threading.Event(), threading.Event()
+
+        def other_source():
+            with self.cache_manager.batch():
+                self.cache_manager.mark_seen("other", "twitch_clip")
+                marked.set()
+                failed.wait(5)
+
+        thread = threading.Thread(target=other_source)
+        thread.start()
+        marked.wait(5)
+        with pytest.raises(RuntimeError):
+            with self.cache_manager.batch():
+                self.cache_manager.mark_seen_many(["mine", "other"], "twitch_clip")
+                raise RuntimeError("boom")
+        failed.set()
+        thread.join(5)
+
+        saved = SeenIds(**json.loads(self.cache_manager.seen_ids_file.read_text()))
+        assert saved.twitch_clips == ["other"]
+        assert not self.cache_manager.is_seen("mine", "twitch_clip")
+
+    def test_batch_writes_keep_file_mode(self):
+        """Test staged files get the existing file's mode (or the umask default), not mkstemp's 0600."""
+        import os
+        from services.utils import DEFAULT_FILE_MODE
+
+        with self.cache_manager.batch():
+            path = self.cache_manager.save_json("a.json", {"a": 1})
+            self.cache_manager.mark_seen("clip1", "twitch_clip")
+        assert path.stat().st_mode & 0o777 == DEFAULT_FILE_MODE
+
+        os.chmod(self.cache_manager.seen_ids_file, 0o640)
+        with self.cache_manager.batch():
+            self.cache_manager.mark_seen("clip2", "twitch_clip")
+        assert self.cache_manager.seen_ids_file.stat().st_mode & 0o777 == 0o640
+
+    def test_batch_rejects_duplicate_staged_file(self):
+        """Test overwrite=False also applies to files staged in the same batch."""
+        with self.cache_manager.batch():
+            self.cache_manager.save_json("a.json", {"a": 1})
+            with pytest.raises(FileExistsError):
+                self.cache_manager.save_json("a.json", {"a": 2})
+    
+    def test_concurrent_batches_commit_independently(self):
+        """Test batches on several threads sharing one manager all commit."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def worker(n):
+            for i in range(50):
+                with self.cache_manager.batch():
+                    self.cache_manager.mark_seen(f"clip-{n}-{i}", "twitch_clip")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(worker, range(4)))
+
+        saved = SeenIds(**json.loads(self.cache_manager.seen_ids_file.read_text()))
+        assert len(saved.twitch_clips) == 200
+        assert not list(self.cache_manager.seen_ids_file.parent.glob("*.tmp"))
+
+    def test_strict_mode_writes_immediately(self):
+        """Test strict mode keeps per-file fsync and immediate visibility."""
+        with patch.dict('os.environ', {'CACHE_FSYNC_MODE': 'strict'}):
+            with self.cache_manager.batch():
+                path = self.cache_manager.save_json("a.json", {"a": 1})
+                assert path.exists()
+
 
 class TestUtilityFunctions:
     """Test cases for utility functions."""
@@ -0,0 +1,169 @@
+"""
+Tests that the webhook server keeps blocking work off the event loop.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+webhook_server = pytest.importorskip("webhook_server")
+
+from services import job_queue
+from services.job_queue import JobQueue
+from services.response_cache import ResponseCache
+
+SLOW_SECONDS = 0.3
+
+
+class TestBlockingWorkOffLoop:
+    """Concurrent requests to slow endpoints must overlap, not serialize."""
+
+    def setup_method(self):
+        """Set up a builder whose digest build blocks, and an ASGI client."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+        def slow_digest(date):
+            time.sleep(SLOW_SECONDS)  # Blocking, like parsing and building from raw data
+            return {"date": date}
+
+        self.builder = MagicMock()
+        self.builder.data_dir = self.temp_dir / "data"
+        self.builder.blogs_dir = self.temp_dir / "blogs"
+        self.builder.build_normalized_digest.side_effect = slow_digest
+
+        self.patches = [
+            patch.object(webhook_server, "_blog_builder", self.builder),
+            patch.object(webhook_server, "_blog_response_cache", ResponseCache(max_entries=0)),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _timed_get(self, client, path):
+        start = time.perf_counter()
+        response = await client.get(path)
+        return response, time.perf_counter() - start
+
+    async def _run_concurrently(self):
+        transport = httpx.ASGITransport(app=webhook_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(self._timed_get(client, f"/api/blog/2025-01-{day:02d}/digest") for day in range(10, 14)),
+                self._timed_get(client, "/health"),
+            )
+            return results, time.perf_counter() - start
+
+    def test_concurrent_requests_do_not_serialize(self):
+        """Test four slow digest requests overlap and /health stays fast."""
+        results, elapsed = asyncio.run(self._run_concurrently())
+
+        digests, (health, health_latency) = results[:4], results[4]
+        assert all(response.status_code == 200 for response, _ in digests)
+        assert health.status_code == 200
+
+        # Serialized on the loop this would take 4 x SLOW_SECONDS
+        assert elapsed < 2.5 * SLOW_SECONDS
+        assert health_latency < SLOW_SECONDS
+
+    def test_story_packets_listed_off_loop(self):
+        """Test /stories/{date} reads packets through the I/O pool."""
+        story_dir = self.temp_dir / "story_packets"
+        (story_dir / "2025-01-15").mkdir(parents=True)
+        (story_dir / "2025-01-15" / "story_1.json").write_text('{"id": "story_1"}')
+
+        async def fetch():
+            transport = httpx.ASGITransport(app=webhook_server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/stories/2025-01-15")
+
+        with patch.object(webhook_server, "STORY_DIR", story_dir), \
+             patch.object(webhook_server, "_load_story_packets_sync",
+                          wraps=webhook_server._load_story_packets_sync) as mock_load:
+            response = asyncio.run(fetch())
+
+        assert response.json() == {"stories": [{"id": "story_1"}]}
+        mock_load.assert_called_once()
+
+
+class TestJobQueueEndpoints:
+    """Blog approval is queued as a persistent job and exposed through /jobs."""
+
+    def setup_method(self):
+        """Set up a job queue without an embedded worker."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.queue = JobQueue(self.temp_dir / "jobs.sqlite3")
+        self.patches = [
+            patch.object(webhook_server, "_job_queue", self.queue),
+            patch.object(webhook_server, "JOB_WORKER_EMBEDDED", False),
+            patch.dict(os.environ, {"CONTROL_API_TOKEN": "secret"}),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def _get(self, path):
+        transport = httpx.ASGITransport(app=webhook_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers={"Authorization": "Bearer secret"})
+
+    def test_approval_is_queued_once_per_date(self):
+        """Test repeated approval clicks for a date share one job."""
+        first = asyncio.run(webhook_server._handle_blog_approval({}, "2025-01-15"))
+        second = asyncio.run(webhook_server._handle_blog_approval({}, "2025-01-15"))
+
+        jobs = self.queue.list_jobs()
+        assert len(jobs) == 1
+        assert jobs[0].idempotency_key == "blog_approval:2025-01-15"
+        assert "Queued" in first["data"]["content"]
+        assert "Already In Progress" in second["data"]["content"]
+        assert jobs[0].id in second["data"]["content"]
+
+    def test_job_status_endpoint(self):
+        """Test /jobs/{id} reports a job and /jobs lists by status."""
+        job, _ = self.queue.enqueue("final_digest", {"date": "2025-01-15"})
+
+        response = asyncio.run(self._get(f"/jobs/{job.id}"))
+        listed = asyncio.run(self._get("/jobs?status=queued&type=final_digest"))
+        missing = asyncio.run(self._get("/jobs/unknown"))
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
+        assert response.json()["payload"] == {"date": "2025-01-15"}
+        assert [j["id"] for j in listed.json()["jobs"]] == [job.id]
+        assert missing.status_code == 404
+
+    def test_embedded_worker_starts_with_server(self):
+        """Test the embedded worker runs queued jobs from startup, before any job request."""
+        fastapi_testclient = pytest.importorskip("fastapi.testclient")
+        job, _ = self.queue.enqueue("test_echo", {"value": 1})
+        job_queue._handlers["test_echo"] = lambda payload, progress: payload
+
+        try:
+            with patch.object(webhook_server, "JOB_WORKER_EMBEDDED", True), \
+                 fastapi_testclient.TestClient(webhook_server.app):
+                deadline = time.time() + 5
+                while self.queue.get(job.id).status != "succeeded" and time.time() < deadline:
+                    time.sleep(0.05)
+            assert webhook_server._job_worker_thread is None
+        finally:
+            job_queue._handlers.pop("test_echo", None)
+
+        assert self.queue.get(job.id).result == {"value": 1}
@@ -15,7 +15,10 @@ from typing import List, Dict, Any, Optional
 import logging
 import re
 
+from services import metrics, serialization
+from services.budgets import budget
 from services.media import probe_duration, file_exists
+from services.story_state import overlay_digest
 
 try:
     from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
@@ -25,6 +28,8 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+RENDER_SECONDS = metrics.histogram("render_seconds", "Video render time by phase (slide or stitch)", ("phase",))
+
 # Default placeholder for short text
 DEFAULT_PLACEHOLDER = "Content placeholder text for display purposes"
 
@@ -238,6 +243,7 @@ def render_html_to_png(html_str: str, out_path: Path) -> None:
         logger.exception(f"Unexpected error during HTML to PNG rendering after {render_time:.0f}ms")
         raise RuntimeError(f"HTML rendering failed: {e}") from e
     finally:
+        RENDER_SECONDS.observe(time.time() - start_time, phase="slide")
         # Clean up resources even if browser crashes
         if temp_html_path:
             Path(temp_html_path).unlink(missing_ok=True)
@@ -415,7 +421,8 @@ class VideoComposer:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
+            with RENDER_SECONDS.time(phase="stitch"):
+                subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=300)
             logger.info(f"Created video: {out_path}")
         except subprocess.TimeoutExpired as e:
             raise RuntimeError(f"ffmpeg timed out after 300 seconds while creating video") from e
@@ -442,35 +449,37 @@ def render_for_packet(packet: Dict[str, Any], out_dir: Path) -> str:
         logger.info(f"Skipping render for {story_id} - video already exists")
         return str(out_mp4)
     
-    # Initialize renderer and composer
-    renderer = HtmlSlideRenderer()
-    composer = VideoComposer()
+    # Chromium and ffmpeg are heavy; share the process-wide render budget
+    with budget("render"):
+        # Initialize renderer and composer
+        renderer = HtmlSlideRenderer()
+        composer = VideoComposer()
     
-    # Generate image sequence
-    images = []
+        # Generate image sequence
+        images = []
     
-    # 1. Intro card with title
-    intro = out_dir / f"{story_id}_01_intro.png"
-    renderer.render_intro(validated_packet, intro)
-    images.append(intro)
+        # 1. Intro card with title
+        intro = out_dir / f"{story_id}_01_intro.png"
+        renderer.render_intro(validated_packet, intro)
+        images.append(intro)
     
-    # 2. Why card (if available)
-    if validated_packet.get("why"):
-        why_card = out_dir / f"{story_id}_02_why.png"
-        renderer.render_why(validated_packet, why_card)
-        images.append(why_card)
+        # 2. Why card (if available)
+        if validated_packet.get("why"):
+            why_card = out_dir / f"{story_id}_02_why.png"
+            renderer.render_why(validated_packet, why_card)
+            images.append(why_card)
     
-    # 3. Highlights cards (up to 3 slides)
-    highlight_images = renderer.render_highlights(validated_packet, out_dir, story_id)
-    images.extend(highlight_images)
+        # 3. Highlights cards (up to 3 slides)
+        highlight_images = renderer.render_highlights(validated_packet, out_dir, story_id)
+        images.extend(highlight_images)
     
-    # 4. Outro card
-    outro = out_dir / f"{story_id}_99_outro.png"
-    renderer.render_outro(validated_packet, outro)
-    images.append(outro)
+        # 4. Outro card
+        outro = out_dir / f"{story_id}_99_outro.png"
+        renderer.render_outro(validated_packet, outro)
+        images.append(outro)
     
-    # Create final video
-    composer.stitch(images, out_mp4)
+        # Create final video
+        composer.stitch(images, out_mp4)
     
     return str(out_mp4)
 
@@ -487,11 +496,16 @@ def render_from_digest(digest_path: Path, out_dir: Path) -> bool:
     
     # Load digest data
     try:
-        with open(digest_path, 'r') as f:
-            data = json.load(f)
+        data = serialization.load_file(digest_path)
     except (json.JSONDecodeError, FileNotFoundError) as e:
         raise RuntimeError(f"Could not load digest {digest_path}: {e}")
     
+    # Merge recording state; the store lives next to the per-date digest directories
+    try:
+        data = overlay_digest(digest_path.parent.parent, data.get("date") or digest_path.parent.name, data)
+    except ValueError as e:
+        logger.warning(f"Could not apply story state to {digest_path}: {e}")
+    
     story_packets = data.get("story_packets", [])
     if not story_packets:
         logger.info("No story packets found in digest")
@@ -573,8 +587,7 @@ def render_from_digest(digest_path: Path, out_dir: Path) -> bool:
     # Save updated digest if changed
     if changed:
         try:
-            with open(digest_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            serialization.dump_file(digest_path, data)
             logger.info(f"Updated digest: {digest_path}")
         except Exception as e:
             logger.error(f"Failed to save updated digest: {e}")
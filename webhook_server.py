@@ -4,30 +4,39 @@ FastAPI webhook server for GitHub PR merge events.
 """
 
 import asyncio
+import functools
 import hashlib
 import hmac
 import json
 import logging
+import math
 import os
 import re
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 import nacl.encoding
 import nacl.signing
 from dotenv import load_dotenv
 from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, ConfigDict, field_validator
 
 from story_schema import StoryPacket, make_story_packet, pair_with_clip
 from services.utils import validate_story_id
 from services.blog import BlogDigestBuilder
-from services.notify import notify_blog_published
+from services.blog_catalog import BlogCatalog
+from services import metrics, serialization
+from services.event_log import LOG_FILES, ZSTD_SUFFIX
+from services.job_queue import Job, JobQueue, JobWorker
+from services.rate_limiter import SlidingWindowLimiter
+from services.response_cache import ResponseCache, stat_fingerprint
+from services.story_state import DB_NAME as STORY_STATE_DB
 from discord_bot import validate_and_canonicalize_date
 
 # Load environment variables
@@ -37,7 +46,20 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Story Pipeline Webhook Server", version="1.0.0")
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start the embedded job worker with the server so queued jobs resume without a request."""
+    if JOB_WORKER_EMBEDDED:
+        await _run_blocking(_start_job_worker)
+    try:
+        yield
+    finally:
+        await _run_blocking(_stop_job_worker)
+
+
+app = FastAPI(title="Story Pipeline Webhook Server", version="1.0.0", lifespan=_lifespan)
 
 # Configuration
 WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
@@ -55,32 +77,150 @@ DISCORD_RATE_LIMIT_WINDOW = 60  # Time window in seconds
 DISCORD_INTERACTION_TIMEOUT = 2.5  # 2.5 seconds (under Discord's 3s limit)
 DISCORD_DEFERRED_RESPONSE_TIMEOUT = 15  # 15 minutes for deferred responses
 
-# Rate limiting store (IP -> list of timestamps)
-_discord_rate_limit_store = {}
-_discord_rate_limit_lock = threading.Lock()
+# Per-IP sliding-window limiter; tracks at most DISCORD_RATE_LIMIT_MAX_KEYS clients
+_discord_rate_limiter = SlidingWindowLimiter(
+    DISCORD_RATE_LIMIT_COUNT,
+    DISCORD_RATE_LIMIT_WINDOW,
+    max_keys=int(os.getenv("DISCORD_RATE_LIMIT_MAX_KEYS", "10000")),
+)
+
+# Bounded pool for blocking file, digest and R2 work done by read-only API handlers,
+# so a slow request never stalls the event loop (API_IO_WORKERS)
+_api_io_pool = ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv("API_IO_WORKERS", "8"))), thread_name_prefix="api_io"
+)
+
+# App-scoped services for the read-only API: one shared builder and publisher,
+# and a conditional-GET response cache (BLOG_API_CACHE_SIZE)
+_blog_builder: Optional[BlogDigestBuilder] = None
+_blog_builder_lock = threading.Lock()
+_publisher = None
+_publisher_lock = threading.Lock()
+_blog_catalog: Optional[BlogCatalog] = None
+_blog_catalog_lock = threading.Lock()
+_blog_response_cache = ResponseCache()
+EVENT_LOG_FILES = [*LOG_FILES.values(), *(name + ZSTD_SUFFIX for name in LOG_FILES.values())]
+
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds", "Request latency by route template, method and status", ("route", "method", "status")
+)
+EXECUTOR_QUEUE_DEPTH = metrics.gauge("executor_queue_depth", "Tasks waiting for a thread, by pool", ("pool",))
+EXECUTOR_QUEUE_DEPTH.set_function(lambda: {("api_io",): _api_io_pool._work_queue.qsize()})
+
+
+class _RequestMetricsMiddleware:
+    """Record per-route request latency, including streamed response bodies."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
 
-# Thread pool for blocking operations
-_thread_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="blog_ops")
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope; use its
+            # template so /api/blog/2025-01-15 and /api/blog/2025-01-16 share a series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, route=route, method=scope["method"], status=status_code
+            )
 
-def _create_final_digest_sync(date: str) -> bool:
-    """Synchronous version of create_final_digest for thread execution."""
-    try:
-        builder = BlogDigestBuilder()
-        final_digest = builder.create_final_digest(date)
-        return final_digest is not None
-    except Exception as e:
-        logger.error(f"Error creating final digest for {date}: {e}")
-        return False
 
+app.add_middleware(_RequestMetricsMiddleware)
 
-def _notify_blog_published_sync(date: str) -> bool:
-    """Synchronous version of notify_blog_published for thread execution."""
-    try:
-        return notify_blog_published(date)
-    except Exception as e:
-        logger.error(f"Error sending blog published notification for {date}: {e}")
-        return False
+
+async def _run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking work on the API I/O pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_api_io_pool, functools.partial(func, *args, **kwargs))
+
+
+async def _iterate_blocking(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """Drive a blocking iterator on the API I/O pool, one item at a time."""
+    done = object()
+    while True:
+        item = await _run_blocking(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+# Persistent queue for long-running operations (blog approval, final digests).
+# Jobs run on a worker embedded in this process unless JOB_WORKER_EMBEDDED=false,
+# in which case `python main.py run-jobs` must be running.
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "true").lower() == "true"
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+_job_worker_thread: Optional[threading.Thread] = None
+_job_worker_stop = threading.Event()
+JOB_QUEUE_DEPTH = metrics.gauge("job_queue_depth", "Queued and running background jobs", ("type", "status"))
+JOB_QUEUE_DEPTH.set_function(lambda: _job_queue.depths() if _job_queue is not None else {})
+
+
+def _get_job_queue() -> JobQueue:
+    """Get the shared job queue."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
+
+
+def _start_job_worker():
+    """Start the embedded job worker thread (called at server startup)."""
+    global _job_worker_thread
+    queue = _get_job_queue()
+    with _job_queue_lock:
+        if _job_worker_thread is not None and _job_worker_thread.is_alive():
+            return
+        _job_worker_stop.clear()
+        worker = JobWorker(queue)
+        _job_worker_thread = threading.Thread(
+            target=worker.run, args=(_job_worker_stop,), name="job_worker", daemon=True
+        )
+        _job_worker_thread.start()
+
+
+def _stop_job_worker(timeout: float = 10.0):
+    """Stop the embedded job worker, letting in-flight jobs finish (called at shutdown)."""
+    global _job_worker_thread
+    with _job_queue_lock:
+        thread, _job_worker_thread = _job_worker_thread, None
+    if thread is None:
+        return
+    _job_worker_stop.set()
+    thread.join(timeout)
+
+
+def _enqueue_blog_approval_sync(date: str) -> Tuple[Job, bool]:
+    """Enqueue approval for a date, deduplicated on date+action."""
+    return _get_job_queue().enqueue("blog_approval", {"date": date}, key=f"blog_approval:{date}")
+
+
+def _blog_approval_message(job: Job, created: bool, date: str) -> str:
+    if not created:
+        return (
+            f"⏳ **Approval Already In Progress** — {date}\n\n"
+            f"Job `{job.id}` is {job.status}. You'll get a published notification when it's done."
+        )
+    return (
+        f"⏳ **Blog Approval Queued** — {date}\n\n"
+        f"Creating the FINAL digest in the background (job `{job.id}`). "
+        f"You'll get a published notification when it's done."
+    )
 
 
 def _validate_story_id(story_id: str) -> bool:
@@ -303,6 +443,13 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for requests, AI calls, renders, uploads, caches and queues."""
+    body = await _run_blocking(metrics.REGISTRY.render)
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/stories/{date}")
 async def list_stories(date: str):
     """List story packets for a given date."""
@@ -329,19 +476,22 @@ async def list_stories(date: str):
         logger.warning(f"Path traversal attempt detected: {date} -> {resolved_path}")
         return JSONResponse(status_code=400, content={"error": "Invalid date parameter."})
     
+    stories = await _run_blocking(_load_story_packets_sync, date_dir)
+    return JSONResponse({"stories": stories})
+
+
+def _load_story_packets_sync(date_dir: Path) -> List[Dict[str, Any]]:
+    """Read every story packet JSON file in a date directory."""
     if not date_dir.exists():
-        return JSONResponse({"stories": []})
+        return []
     
     stories = []
     for packet_file in date_dir.glob("*.json"):
         try:
-            with open(packet_file, 'r') as f:
-                story_data = json.load(f)
-                stories.append(story_data)
+            stories.append(serialization.load_file(packet_file))
         except Exception as e:
             logger.error(f"Error reading {packet_file}: {e}")
-    
-    return JSONResponse({"stories": stories})
+    return stories
 
 
 @app.post("/control/record/start")
@@ -435,12 +585,160 @@ async def control_record_stop(
         raise HTTPException(status_code=500, detail="Failed to stop recording")
 
 
+@app.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="Filter by status (queued, running, succeeded, failed)"),
+    job_type: Optional[str] = Query(None, alias="type", description="Filter by job type"),
+    limit: int = Query(50, ge=1, le=500),
+    _: None = Depends(verify_control_auth),
+):
+    """List recent background jobs, newest first."""
+    jobs = await _run_blocking(_get_job_queue().list_jobs, status=status, job_type=job_type, limit=limit)
+    return {"jobs": [job.to_dict() for job in jobs]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, _: None = Depends(verify_control_auth)):
+    """Get a background job's status, progress and result."""
+    job = await _run_blocking(_get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
 # ============================================================================
 # Blog API Endpoints for Cloudflare Integration
 # ============================================================================
 
+def _get_blog_builder() -> BlogDigestBuilder:
+    """Shared BlogDigestBuilder for the read-only blog API (built on first use)."""
+    global _blog_builder
+    with _blog_builder_lock:
+        if _blog_builder is None:
+            _blog_builder = BlogDigestBuilder()
+        return _blog_builder
+
+
+def _get_publisher():
+    """Shared Publisher for asset lookups (built on first use; reuses its S3 client)."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            from services.publisher import Publisher
+            _publisher = Publisher()
+        return _publisher
+
+
+def _get_blog_catalog() -> BlogCatalog:
+    """Shared catalog of publish packages under the builder's data directory."""
+    global _blog_catalog
+    with _blog_catalog_lock:
+        if _blog_catalog is None:
+            _blog_catalog = BlogCatalog(_get_blog_builder().data_dir)
+        return _blog_catalog
+
+
+def _digest_sources(builder: BlogDigestBuilder, date: str) -> List[Path]:
+    """Files build_normalized_digest reads for a date (the data dir covers new legacy files)."""
+    day_dir = builder.data_dir / date
+    state_db = builder.blogs_dir / STORY_STATE_DB
+    return [
+        builder.blogs_dir / date / f"FINAL-{date}_digest.json",
+        builder.blogs_dir / date / f"PRE-CLEANED-{date}_digest.json",
+        # Recording state is overlaid onto the packets; WAL writes only touch the -wal file
+        state_db,
+        state_db.with_name(state_db.name + "-wal"),
+        day_dir,
+        *(day_dir / name for name in EVENT_LOG_FILES),
+    ]
+
+
+def _cached_blog_response(
+    if_none_match: Optional[str],
+    endpoint: str,
+    date: str,
+    sources: Callable[[BlogDigestBuilder], List[Path]],
+    produce: Callable[[BlogDigestBuilder], Any],
+) -> Response:
+    """
+    Serve a blog API response from the conditional-GET cache.
+    
+    The body is rebuilt only when the source files' mtimes change; a matching
+    If-None-Match gets a 304 without building anything. Blocking: run it
+    through _run_blocking from handlers.
+    
+    Args:
+        if_none_match: The request's If-None-Match header, if any
+        endpoint: Cache key prefix for the endpoint
+        date: Validated YYYY-MM-DD date
+        sources: Maps the builder to the files the response is built from
+        produce: Builds the response data on a cache miss
+        
+    Returns:
+        200 with the JSON body, or 304 with validators only
+    """
+    builder = _get_blog_builder()
+    fingerprint, last_modified = stat_fingerprint(sources(builder))
+    entry = _blog_response_cache.get((endpoint, date), fingerprint)
+    if entry is None:
+        body = serialization.dumpb(produce(builder), compact=True)
+        entry = _blog_response_cache.put((endpoint, date), fingerprint, body, last_modified)
+    
+    if entry.matches(if_none_match):
+        return Response(status_code=304, headers=entry.headers)
+    return Response(content=entry.body, media_type="application/json", headers=entry.headers)
+
+
+def _validate_blog_date(date: str):
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+@app.get("/api/blogs")
+async def list_blog_posts(
+    start: Optional[str] = Query(None, alias="from", description="First date (YYYY-MM-DD), inclusive"),
+    end: Optional[str] = Query(None, alias="to", description="Last date (YYYY-MM-DD), inclusive"),
+    fields: Optional[str] = Query(None, description="Comma-separated top-level fields, e.g. title,summary,tags"),
+):
+    """
+    Stream publish packages for a date range as NDJSON.
+    
+    Each line is {"date": ..., **package}, oldest first. With fields, each
+    package is projected onto those fields; summary fields (title, summary,
+    tags, url, ...) come straight from the precomputed catalog.
+    
+    Args:
+        start: First date in YYYY-MM-DD format (defaults to the earliest post)
+        end: Last date in YYYY-MM-DD format (defaults to the latest post)
+        fields: Comma-separated fields to keep (defaults to whole packages)
+        
+    Returns:
+        Chunked application/x-ndjson response, one package per line
+    """
+    for date in (start, end):
+        if date is not None:
+            _validate_blog_date(date)
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    projection = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    
+    try:
+        catalog = await _run_blocking(_get_blog_catalog)
+        entries = await _run_blocking(catalog.refresh, start, end)
+    except Exception as e:
+        logger.error(f"Error reading blog catalog for {start}..{end}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    return StreamingResponse(
+        _iterate_blocking(catalog.iter_ndjson(entries, projection)),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.get("/api/blog/{date}")
-async def get_blog_post(date: str):
+async def get_blog_post(date: str, request: Request):
     """
     Get complete blog post data for a specific date.
     
@@ -450,20 +748,14 @@ async def get_blog_post(date: str):
     Returns:
         Complete blog data including digest, markdown, and assets
     """
+    _validate_blog_date(date)
     try:
-        from services.blog import BlogDigestBuilder
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
         # Get blog data from publish package
-        builder = BlogDigestBuilder()
-        blog_data = builder.io.load_publish_package(date)
-        
-        return blog_data
+        return await _run_blocking(
+            _cached_blog_response, request.headers.get("if-none-match"), "blog", date,
+            sources=lambda builder: [builder.data_dir / date / f"{date}_page.publish.json"],
+            produce=lambda builder: builder.io.load_publish_package(date),
+        )
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No blog post found for date: {date}")
@@ -473,7 +765,7 @@ async def get_blog_post(date: str):
 
 
 @app.get("/api/blog/{date}/markdown")
-async def get_blog_markdown(date: str):
+async def get_blog_markdown(date: str, request: Request):
     """
     Get raw markdown content for a specific date.
     
@@ -483,20 +775,14 @@ async def get_blog_markdown(date: str):
     Returns:
         Raw markdown content
     """
+    _validate_blog_date(date)
     try:
-        from services.blog import BlogDigestBuilder
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
-        # Get markdown
-        builder = BlogDigestBuilder()
-        markdown = builder.get_blog_markdown(date)
-        
-        return {"date": date, "markdown": markdown}
+        # Get markdown (a draft if one exists, otherwise generated from the digest)
+        return await _run_blocking(
+            _cached_blog_response, request.headers.get("if-none-match"), "markdown", date,
+            sources=lambda builder: [Path("drafts") / f"{date}.md", *_digest_sources(builder, date)],
+            produce=lambda builder: {"date": date, "markdown": builder.get_blog_markdown(date)},
+        )
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No blog post found for date: {date}")
@@ -506,7 +792,7 @@ async def get_blog_markdown(date: str):
 
 
 @app.get("/api/blog/{date}/digest")
-async def get_blog_digest(date: str):
+async def get_blog_digest(date: str, request: Request):
     """
     Get digest data for a specific date.
     
@@ -516,20 +802,14 @@ async def get_blog_digest(date: str):
     Returns:
         Digest data
     """
+    _validate_blog_date(date)
     try:
-        from services.blog import BlogDigestBuilder
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
         # Get digest
-        builder = BlogDigestBuilder()
-        digest = builder.build_normalized_digest(date)
-        
-        return {"date": date, "digest": digest}
+        return await _run_blocking(
+            _cached_blog_response, request.headers.get("if-none-match"), "digest", date,
+            sources=lambda builder: _digest_sources(builder, date),
+            produce=lambda builder: {"date": date, "digest": builder.build_normalized_digest(date)},
+        )
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No blog post found for date: {date}")
@@ -538,8 +818,19 @@ async def get_blog_digest(date: str):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+async def _blog_assets_response(request: Request, date: str) -> Response:
+    return await _run_blocking(
+        _cached_blog_response, request.headers.get("if-none-match"), "assets", date,
+        sources=lambda builder: [
+            *_digest_sources(builder, date),
+            Path("public/stories") / date.replace("-", "/"),
+        ],
+        produce=lambda builder: {"date": date, "assets": builder.get_blog_assets(date)},
+    )
+
+
 @app.get("/api/assets/stories/{date}")
-async def list_story_assets(date: str):
+async def list_story_assets(date: str, request: Request):
     """
     List all story assets for a date.
     
@@ -549,20 +840,10 @@ async def list_story_assets(date: str):
     Returns:
         List of story assets for the date
     """
+    _validate_blog_date(date)
     try:
-        from services.blog import BlogDigestBuilder
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
         # Get assets
-        builder = BlogDigestBuilder()
-        assets = builder.get_blog_assets(date)
-        
-        return {"date": date, "assets": assets}
+        return await _blog_assets_response(request, date)
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No assets found for date: {date}")
@@ -583,22 +864,16 @@ async def get_story_assets(date: str, story_id: str):
     Returns:
         All assets for the story
     """
+    _validate_blog_date(date)
+    
+    # Validate story ID
+    if not _validate_story_id(story_id):
+        raise HTTPException(status_code=400, detail="Invalid story ID")
+    
     try:
-        from services.publisher import Publisher
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
-        # Validate story ID
-        if not _validate_story_id(story_id):
-            raise HTTPException(status_code=400, detail="Invalid story ID")
-        
-        # Get story assets
-        publisher = Publisher()
-        assets = publisher.list_story_assets(date, story_id)
+        # Get story assets (R2 HEAD requests run on the API I/O pool)
+        publisher = await _run_blocking(_get_publisher)
+        assets = await _run_blocking(publisher.list_story_assets, date, story_id)
         
         return {"date": date, "story_id": story_id, "assets": assets}
         
@@ -608,7 +883,7 @@ async def get_story_assets(date: str, story_id: str):
 
 
 @app.get("/api/assets/blog/{date}")
-async def get_blog_assets(date: str):
+async def get_blog_assets(date: str, request: Request):
     """
     Get all assets for a blog post.
     
@@ -618,20 +893,10 @@ async def get_blog_assets(date: str):
     Returns:
         All assets for the blog post
     """
+    _validate_blog_date(date)
     try:
-        from services.blog import BlogDigestBuilder
-        
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
         # Get blog assets
-        builder = BlogDigestBuilder()
-        assets = builder.get_blog_assets(date)
-        
-        return {"date": date, "assets": assets}
+        return await _blog_assets_response(request, date)
         
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"No blog post found for date: {date}")
@@ -658,30 +923,15 @@ def _verify_discord_signature(request: Request, body: bytes) -> bool:
     client_ip = request.client.host if request.client else "unknown"
     
     # Rate limiting check
-    current_time = time.time()
-    with _discord_rate_limit_lock:
-        # Clean up old entries outside the time window
-        cutoff_time = current_time - DISCORD_RATE_LIMIT_WINDOW
-        if client_ip in _discord_rate_limit_store:
-            _discord_rate_limit_store[client_ip] = [
-                timestamp for timestamp in _discord_rate_limit_store[client_ip]
-                if timestamp > cutoff_time
-            ]
-        else:
-            _discord_rate_limit_store[client_ip] = []
-        
-        # Check if client has exceeded rate limit
-        if len(_discord_rate_limit_store[client_ip]) >= DISCORD_RATE_LIMIT_COUNT:
-            logger.warning(f"Discord rate limit exceeded for IP {client_ip}: {len(_discord_rate_limit_store[client_ip])} requests in {DISCORD_RATE_LIMIT_WINDOW}s")
-            # Return HTTP 429 response instead of False
-            raise HTTPException(
-                status_code=429,
-                detail="Too Many Requests",
-                headers={"Retry-After": str(DISCORD_RATE_LIMIT_WINDOW)}
-            )
-        
-        # Add current request timestamp
-        _discord_rate_limit_store[client_ip].append(current_time)
+    allowed, retry_after = _discord_rate_limiter.hit(client_ip)
+    if not allowed:
+        logger.warning(f"Discord rate limit exceeded for IP {client_ip}: over {DISCORD_RATE_LIMIT_COUNT} requests in {DISCORD_RATE_LIMIT_WINDOW}s")
+        # Return HTTP 429 response instead of False
+        raise HTTPException(
+            status_code=429,
+            detail="Too Many Requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
     
     signature = request.headers.get("X-Signature-Ed25519")
     timestamp = request.headers.get("X-Signature-Timestamp")
@@ -852,22 +1102,10 @@ async def handle_deferred_discord_response(request: Request):
 
 
 async def _process_deferred_blog_approval(date: str) -> str:
-    """Process blog approval as a deferred operation."""
+    """Queue blog approval as a deferred operation."""
     try:
-        # Run blocking operations in thread pool
-        loop = asyncio.get_event_loop()
-        final_digest_created = await loop.run_in_executor(_thread_pool, _create_final_digest_sync, date)
-        
-        if final_digest_created:
-            # Send published notification in thread pool
-            notification_sent = await loop.run_in_executor(_thread_pool, _notify_blog_published_sync, date)
-            if notification_sent:
-                return f"✅ **Blog Approved & Published** — {date}\n\nBlog has been approved and published successfully!"
-            else:
-                return f"✅ **Blog Approved** — {date}\n\nBlog approved but failed to send published notification."
-        else:
-            return f"❌ **Approval Failed** — {date}\n\nFailed to create FINAL digest. Check logs for details."
-            
+        job, created = await _run_blocking(_enqueue_blog_approval_sync, date)
+        return _blog_approval_message(job, created, date)
     except Exception as e:
         logger.error(f"Error in deferred blog approval for {date}: {e}")
         return f"❌ **Approval Error** — {date}\n\nError: {str(e)}"
@@ -890,25 +1128,12 @@ async def _process_deferred_blog_edit(date: str) -> str:
 
 
 async def _handle_blog_approval(interaction_data: dict, date: str) -> dict:
-    """Handle blog approval button click."""
+    """Handle blog approval button click by queueing the approval job."""
     try:
-        # Run blocking operations in thread pool
-        loop = asyncio.get_event_loop()
-        final_digest_created = await loop.run_in_executor(_thread_pool, _create_final_digest_sync, date)
-        
-        if final_digest_created:
-            # Send published notification in thread pool
-            notification_sent = await loop.run_in_executor(_thread_pool, _notify_blog_published_sync, date)
-            if notification_sent:
-                content = f"✅ **Blog Approved & Published** — {date}\n\nBlog has been approved and published successfully!"
-            else:
-                content = f"✅ **Blog Approved** — {date}\n\nBlog approved but failed to send published notification."
-        else:
-            content = f"❌ **Approval Failed** — {date}\n\nFailed to create FINAL digest. Check logs for details."
-        
+        job, created = await _run_blocking(_enqueue_blog_approval_sync, date)
         return {
             "type": 4,  # CHANNEL_MESSAGE_WITH_SOURCE
-            "data": {"content": content}
+            "data": {"content": _blog_approval_message(job, created, date)}
         }
         
     except Exception as e: